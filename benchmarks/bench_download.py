@@ -0,0 +1,97 @@
+"""
+Throughput of the ranged downloader against today's single-stream path.
+
+    python benchmarks/bench_download.py [--size-mib 64] [--mib-per-conn 16]
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+import urllib.request
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from downloader import RangedDownloader  # noqa: E402
+import range_server  # noqa: E402
+
+
+def single_stream(url, dest):
+    # What `_install_game_impl` used to do
+    resp = urllib.request.urlopen(url)
+    with open(dest, mode="wb") as f:
+        f.write(resp.read())
+
+
+def timed(label, size, fn):
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(
+        "{:<28} {:>8.2f}s {:>10.1f} MiB/s".format(
+            label, elapsed, size / elapsed / (1024 * 1024)
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mib", type=int, default=64)
+    parser.add_argument("--mib-per-conn", type=float, default=16)
+    parser.add_argument("--connections", type=int, default=4)
+    args = parser.parse_args()
+
+    size = args.size_mib * 1024 * 1024
+    payload = range_server.random_payload(size)
+    digest = hashlib.sha256(payload).hexdigest()
+    server = range_server.serve(
+        {"/asset.tar.gz": payload},
+        bytes_per_second=args.mib_per_conn * 1024 * 1024,
+    )
+    url = range_server.base_url(server) + "/asset.tar.gz"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = os.path.join(tmp, "asset.tar.gz")
+        timed("single stream (urlopen)", size, lambda: single_stream(url, dest))
+        os.remove(dest)
+
+        downloader = RangedDownloader(connections=args.connections)
+        timed(
+            "ranged x{}".format(args.connections),
+            size,
+            lambda: downloader.download(url, dest),
+        )
+        with open(dest, "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == digest
+        os.remove(dest)
+
+        # Simulate an interrupted download by dropping half of the chunk records
+        downloader.download(url, dest)
+        os.rename(dest, dest + ".part")
+        chunk_count = (size + downloader.chunk_size - 1) // downloader.chunk_size
+        downloader._save_state(
+            dest + ".part.json",
+            {
+                "url": url,
+                "size": size,
+                "etag": '"{}"'.format(size),
+                "chunk_size": downloader.chunk_size,
+                "done": list(range(chunk_count // 2)),
+            },
+        )
+        timed(
+            "ranged resume from 50%", size // 2, lambda: downloader.download(url, dest)
+        )
+        with open(dest, "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == digest
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
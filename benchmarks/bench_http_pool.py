@@ -0,0 +1,158 @@
+"""
+Per-request latency of plain `urlopen` against the keep-alive `HTTPPool`.
+
+Runs two local TLS stand-in servers, one for the API and one for the asset
+CDN that the API redirects to, with a throwaway self-signed certificate
+(needs the `openssl` binary).
+
+    python benchmarks/bench_http_pool.py [--requests 50]
+"""
+
+import argparse
+import http.server
+import json
+import os
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+
+from http_pool import HTTPPool  # noqa: E402
+
+RELEASE = json.dumps({"tag_name": "v0.2.0", "assets": []}).encode()
+ASSET = os.urandom(64 * 1024)
+
+
+def make_certificate(directory):
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl",
+            "req",
+            "-x509",
+            "-newkey",
+            "rsa:2048",
+            "-nodes",
+            "-days",
+            "1",
+            "-subj",
+            "/CN=127.0.0.1",
+            "-addext",
+            "subjectAltName=IP:127.0.0.1",
+            "-keyout",
+            key,
+            "-out",
+            cert,
+        ],
+        check=True,
+        capture_output=True,
+    )
+    return cert, key
+
+
+def serve_tls(cert, key, routes):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Like a real server, don't let Nagle hold back small keep-alive bodies
+        disable_nagle_algorithm = True
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.headers.get("User-Agent"):
+                status, headers, body = routes(self.path)
+            else:
+                # GitHub refuses requests without one
+                status, headers, body = 403, {}, b"User-Agent required"
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def report(label, samples):
+    samples = sorted(samples)
+    print(
+        "{:<34} median {:>7.2f} ms   p95 {:>7.2f} ms".format(
+            label,
+            statistics.median(samples) * 1000,
+            samples[int(len(samples) * 0.95) - 1] * 1000,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cert, key = make_certificate(tmp)
+        cdn = serve_tls(cert, key, lambda path: (200, {}, ASSET))
+        cdn_url = "https://127.0.0.1:{}/asset".format(cdn.server_address[1])
+
+        def api_routes(path):
+            if path == "/download":
+                return 302, {"Location": cdn_url}, b""
+            return 200, {"Content-Type": "application/json"}, RELEASE
+
+        api = serve_tls(cert, key, api_routes)
+        api_base = "https://127.0.0.1:{}".format(api.server_address[1])
+
+        def client_context():
+            # Mirrors `helpers.get_ssl_context()` being called per request
+            return ssl.create_default_context(cafile=cert)
+
+        def timed_requests(fetch, path):
+            samples = []
+            for _ in range(args.requests):
+                started = time.perf_counter()
+                fetch(api_base + path)
+                samples.append(time.perf_counter() - started)
+            return samples
+
+        def urlopen_fetch(url):
+            with urllib.request.urlopen(url, context=client_context()) as resp:
+                resp.read()
+
+        pool = HTTPPool(ssl_context=client_context)
+
+        def pool_fetch(url):
+            with pool.get(url) as resp:
+                resp.read()
+                assert resp.status == 200, "{} returned {}".format(url, resp.status)
+
+        report("urlopen  releases/latest", timed_requests(urlopen_fetch, "/latest"))
+        report("HTTPPool releases/latest", timed_requests(pool_fetch, "/latest"))
+        report(
+            "urlopen  asset via redirect", timed_requests(urlopen_fetch, "/download")
+        )
+        report("HTTPPool asset via redirect", timed_requests(pool_fetch, "/download"))
+        print("HTTPPool connections opened: {}".format(pool.connections_opened))
+
+        api.shutdown()
+        cdn.shutdown()
+
+
+if __name__ == "__main__":
+    main()
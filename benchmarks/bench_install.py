@@ -0,0 +1,324 @@
+"""
+End-to-end install, update check and update of a game, fully offline.
+
+A local server stands in for GitHub, serving a `releases/latest` JSON and a
+generated `opengoal-linux-*.tar.gz` whose `extractor` is a small shell script
+that prints the real extractor's phase markers and writes some output. `main`
+runs against a temporary home directory through the `decky_plugin` stub in
+this directory, while the server runs in a separate process. Every phase of
+each scenario reports its wall time, the plugin process's peak RSS and the
+bytes it read and wrote, including the extractor's once it has exited (all
+from `/proc/self`, so Linux only).
+
+    python benchmarks/bench_install.py [--asset-mib 64] [--mib-per-conn 0]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import range_server  # noqa: E402
+
+RELEASE_PATH = "/repos/open-goal/jak-project/releases/latest"
+
+EXTRACTOR_SCRIPT = """#!/bin/sh
+set -e
+mkdir -p data/iso_data data/decompiler_out out
+echo "Extracting ISO $1"
+head -c {output_bytes} /dev/urandom > data/iso_data/game.iso.bin
+echo "[1/2] extracting 50%"
+echo "Validating extracted files 100%"
+echo "Decompiling 10%"
+head -c {output_bytes} /dev/urandom > data/decompiler_out/all.gc
+echo "Decompiling 100%"
+echo "goalc: building [1/2]"
+head -c {output_bytes} /dev/urandom > out/game.cgo
+echo "Compiling done 100%"
+"""
+
+
+class DirectoryFiles:
+    # `files` for the range server, read from disk so the server process
+    # always serves what was last published
+    def __init__(self, root):
+        self.root = root
+
+    def get(self, path):
+        try:
+            with open(os.path.join(self.root, path.lstrip("/")), mode="rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+
+def run_server(root, bytes_per_second, port_queue):
+    server = range_server.serve(DirectoryFiles(root), bytes_per_second=bytes_per_second)
+    port_queue.put(server.server_address[1])
+    threading.Event().wait()
+
+
+def write_tarball(dest, tag, asset_bytes, output_bytes):
+    # Random filler so the archive really is `asset_bytes` after gzip, written
+    # in blocks to keep it out of this process's peak RSS
+    filler = dest + ".filler"
+    with open(filler, mode="wb") as f:
+        for offset in range(0, asset_bytes, 1024 * 1024):
+            f.write(os.urandom(min(1024 * 1024, asset_bytes - offset)))
+    script = EXTRACTOR_SCRIPT.format(output_bytes=output_bytes).encode("utf-8")
+    with tarfile.open(dest, mode="w:gz", compresslevel=1) as tar:
+        for name, data, mode in (
+            ("extractor", script, 0o755),
+            ("gk", b"#!/bin/sh\n", 0o755),
+            ("data/version.txt", tag.encode("utf-8"), 0o644),
+        ):
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = mode
+            info.mtime = time.time()
+            tar.addfile(info, io.BytesIO(data))
+        tar.add(filler, arcname="data/filler.bin")
+    os.remove(filler)
+
+
+def publish(root, base_url, tag, asset_bytes, output_bytes):
+    # Serve `tag` as the latest release
+    name = "opengoal-linux-{}.tar.gz".format(tag)
+    asset_path = "/download/{}/{}".format(tag, name)
+    asset_file = os.path.join(root, asset_path.lstrip("/"))
+    os.makedirs(os.path.dirname(asset_file), exist_ok=True)
+    write_tarball(asset_file, tag, asset_bytes, output_bytes)
+    release = {
+        "tag_name": tag,
+        "assets": [
+            {"name": "opengoal-windows-{}.zip".format(tag)},
+            {
+                "name": name,
+                "size": os.path.getsize(asset_file),
+                "browser_download_url": base_url + asset_path,
+            },
+        ],
+    }
+    release_file = os.path.join(root, RELEASE_PATH.lstrip("/"))
+    os.makedirs(os.path.dirname(release_file), exist_ok=True)
+    with open(release_file + ".tmp", mode="w") as f:
+        f.write(json.dumps(release))
+    os.replace(release_file + ".tmp", release_file)
+
+
+def read_proc_io():
+    counters = {}
+    with open("/proc/self/io", mode="r") as f:
+        for line in f:
+            key, value = line.split(":")
+            counters[key] = int(value)
+    return counters["rchar"], counters["wchar"]
+
+
+def read_peak_rss():
+    with open("/proc/self/status", mode="r") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def reset_peak_rss():
+    # Writing 5 resets VmHWM to the current RSS (Linux 4.0+)
+    try:
+        with open("/proc/self/clear_refs", mode="w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+class PhaseMeter:
+    def __init__(self):
+        self.phases = []
+        self._current = None
+
+    def enter(self, phase):
+        self.close()
+        reset_peak_rss()
+        read, written = read_proc_io()
+        self._current = (phase, time.perf_counter(), read, written)
+
+    def close(self):
+        if self._current is None:
+            return
+        phase, started, read, written = self._current
+        now_read, now_written = read_proc_io()
+        self.phases.append(
+            {
+                "phase": phase,
+                "seconds": time.perf_counter() - started,
+                "peak_rss": read_peak_rss(),
+                "read": now_read - read,
+                "written": now_written - written,
+            }
+        )
+        self._current = None
+
+
+def measured_job(kind, game, meter):
+    from jobs import Job
+
+    class MeasuredJob(Job):
+        def set_phase(self, phase):
+            meter.enter(phase)
+            super().set_phase(phase)
+
+    return MeasuredJob(kind, game)
+
+
+def run_job(meter, impl, kind, game):
+    job = measured_job(kind, game, meter)
+    meter.enter("start")
+    result = impl(game, job)
+    meter.close()
+    return result
+
+
+def run_call(meter, label, fn):
+    meter.enter(label)
+    result = fn()
+    meter.close()
+    return result
+
+
+def print_report(report):
+    mib = 1024 * 1024
+    print(
+        "{:<28} {:<14} {:>9} {:>10} {:>10} {:>10}".format(
+            "scenario", "phase", "wall", "peak RSS", "read", "written"
+        )
+    )
+    for scenario in report["scenarios"]:
+        for phase in scenario["phases"]:
+            print(
+                "{:<28} {:<14} {:>8.3f}s {:>6.1f} MiB {:>6.1f} MiB {:>6.1f} MiB".format(
+                    scenario["name"],
+                    phase["phase"],
+                    phase["seconds"],
+                    phase["peak_rss"] / mib,
+                    phase["read"] / mib,
+                    phase["written"] / mib,
+                )
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--asset-mib", type=float, default=64)
+    parser.add_argument("--output-mib", type=float, default=8)
+    parser.add_argument(
+        "--mib-per-conn", type=float, default=0, help="throttle, 0 for unlimited"
+    )
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args()
+
+    asset_bytes = int(args.asset_mib * 1024 * 1024)
+    output_bytes = int(args.output_mib * 1024 * 1024)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = os.path.join(tmp, "home")
+        os.environ["DECKY_USER_HOME"] = home
+        os.environ["DECKY_HOME"] = os.path.join(home, "homebrew")
+        os.environ["DECKY_PLUGIN_LOG"] = os.path.join(tmp, "plugin.log")
+
+        # The server runs in its own process so its memory and socket I/O
+        # don't count against the plugin
+        root = os.path.join(tmp, "github")
+        port_queue = multiprocessing.Queue()
+        server = multiprocessing.Process(
+            target=run_server,
+            args=(root, args.mib_per_conn * 1024 * 1024 or None, port_queue),
+            daemon=True,
+        )
+        server.start()
+        base_url = "http://127.0.0.1:{}".format(port_queue.get())
+        publish(root, base_url, "v0.2.0", asset_bytes, output_bytes)
+
+        import main as plugin
+
+        plugin.release_client.url = base_url + RELEASE_PATH
+        for game in plugin.GAMES:
+            os.makedirs(os.path.join(home, "OpenGOAL", "games", game), exist_ok=True)
+        os.makedirs(os.path.join(home, "OpenGOAL", "isos"), exist_ok=True)
+
+        def out_of_date(game):
+            return asyncio.run(plugin.Plugin().is_game_out_of_date(game))
+
+        scenarios = []
+
+        def scenario(name, fn, check):
+            meter = PhaseMeter()
+            result = fn(meter)
+            assert check(result), "{} returned {!r}".format(name, result)
+            scenarios.append({"name": name, "phases": meter.phases})
+
+        scenario(
+            "install jak1 (download)",
+            lambda m: run_job(m, plugin._install_game_impl, "install", "jak1"),
+            lambda result: result is True,
+        )
+        scenario(
+            "install jak2 (cached asset)",
+            lambda m: run_job(m, plugin._install_game_impl, "install", "jak2"),
+            lambda result: result is True,
+        )
+        scenario(
+            "is_game_out_of_date",
+            lambda m: run_call(m, "rpc", lambda: out_of_date("jak1")),
+            lambda result: result is False,
+        )
+
+        publish(root, base_url, "v0.2.1", asset_bytes, output_bytes)
+        # As if the release TTL had run out since the last check
+        ttl, plugin.release_client.ttl = plugin.release_client.ttl, 0
+        scenario(
+            "refresh after new release",
+            lambda m: run_call(m, "refresh", plugin._refresh_state),
+            lambda result: True,
+        )
+        plugin.release_client.ttl = ttl
+        scenario(
+            "is_game_out_of_date",
+            lambda m: run_call(m, "rpc", lambda: out_of_date("jak1")),
+            lambda result: result is True,
+        )
+        scenario(
+            "update jak1 (download)",
+            lambda m: run_job(m, plugin._update_game_impl, "update", "jak1"),
+            lambda result: result is True,
+        )
+
+        plugin.http_pool.close()
+        server.terminate()
+        server.join()
+
+    report = {
+        "asset_bytes": asset_bytes,
+        "scenarios": scenarios,
+    }
+    print_report(report)
+    if args.json:
+        with open(args.json, mode="w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
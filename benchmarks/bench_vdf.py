@@ -0,0 +1,97 @@
+"""
+Binary VDF parsing and scanning speed on a generated `shortcuts.vdf`. The
+differential tests against the original stream parser are in
+`tests/test_vdf.py`.
+
+    python benchmarks/bench_vdf.py [--entries 5000] [--repeat 5]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import vdf  # noqa: E402
+import vdf_reference  # noqa: E402
+
+
+def make_shortcuts(count, seed=0):
+    # Roughly what Steam writes for a non-Steam shortcut
+    rng = random.Random(seed)
+    shortcuts = {}
+    for i in range(count):
+        name = "Game {} {}".format(i, "é" * rng.randint(0, 3))
+        shortcuts[str(i)] = {
+            "appid": rng.randint(-(2**31), 2**31 - 1),
+            "AppName": name,
+            "Exe": '"/home/deck/Games/{}/game.exe"'.format(i),
+            "StartDir": '"/home/deck/Games/{}/"'.format(i),
+            "icon": "",
+            "ShortcutPath": "",
+            "LaunchOptions": "--fullscreen" * rng.randint(0, 2),
+            "IsHidden": 0,
+            "AllowDesktopConfig": 1,
+            "AllowOverlay": 1,
+            "OpenVR": 0,
+            "Devkit": 0,
+            "DevkitGameID": "",
+            "DevkitOverrideAppID": 0,
+            "LastPlayTime": rng.randint(0, 2**31 - 1),
+            "FlatpakAppID": "",
+            "tags": {str(t): "tag{}".format(t) for t in range(rng.randint(0, 3))},
+        }
+    return {"shortcuts": shortcuts}
+
+
+def timed(label, repeat, fn):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<28} {:>10.2f} ms".format(label, best * 1000))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    data = vdf.binary_dumps(make_shortcuts(args.entries))
+    print(
+        "shortcuts.vdf with {} entries, {:.1f} KiB".format(
+            args.entries, len(data) / 1024
+        )
+    )
+    assert vdf_reference.binary_load(io.BytesIO(data)) == vdf.binary_load(
+        io.BytesIO(data)
+    )
+    before = timed(
+        "reference binary_load",
+        args.repeat,
+        lambda: vdf_reference.binary_load(io.BytesIO(data)),
+    )
+    after = timed("binary_load", args.repeat, lambda: vdf.binary_load(io.BytesIO(data)))
+    print("speedup: {:.1f}x".format(before / after))
+
+    def scan(prefix):
+        for _, _, value in vdf.binary_scan(data, "AppName"):
+            if value.startswith(prefix):
+                return
+
+    timed("binary_scan, no match", args.repeat, lambda: scan("missing"))
+    timed("binary_scan, first entry", args.repeat, lambda: scan("Game 0 "))
+
+
+if __name__ == "__main__":
+    main()
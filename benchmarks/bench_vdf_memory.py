@@ -0,0 +1,78 @@
+"""
+Memory held by a parsed `shortcuts.vdf` with the default `dict` mapper versus
+`vdf.CompactMapping`, measured with tracemalloc.
+
+    python benchmarks/bench_vdf_memory.py [--entries 5000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import vdf  # noqa: E402
+from bench_vdf import make_shortcuts  # noqa: E402
+
+
+def retained(fn):
+    # Bytes still allocated by whatever `fn` returns
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+
+def best_time(fn, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    args = parser.parse_args()
+
+    data = vdf.binary_dumps(make_shortcuts(args.entries))
+    print(
+        "shortcuts.vdf with {} entries, {:.1f} KiB".format(
+            args.entries, len(data) / 1024
+        )
+    )
+
+    results = {}
+    for label, mapper in (("dict", dict), ("CompactMapping", vdf.CompactMapping)):
+
+        def load():
+            return vdf.binary_loads(data, mapper=mapper)
+
+        results[label], size = retained(load)
+        elapsed = best_time(load)
+        print(
+            "{:<16} {:>8.1f} KiB {:>7.0f} B/entry {:>8.1f} ms".format(
+                label, size / 1024, size / args.entries, elapsed * 1000
+            )
+        )
+    assert results["dict"] == results["CompactMapping"]
+    del results
+
+    count = 10000
+    ints, size = retained(lambda: [vdf.UINT_64(2**40 + i) for i in range(count)])
+    print("UINT_64 instance {:>8.0f} B".format(size / count - 8))
+
+
+if __name__ == "__main__":
+    main()
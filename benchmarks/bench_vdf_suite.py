@@ -0,0 +1,161 @@
+"""
+Time and peak memory of the `vdf` operations the plugin depends on, at 10, 1k
+and 10k entries, checked against a baseline saved on the same machine.
+
+    python benchmarks/bench_vdf_suite.py --save        # record a baseline
+    python benchmarks/bench_vdf_suite.py               # compare against it
+
+Timings are the best of `--repeat` runs per call, peak memory is what
+tracemalloc saw during one call. An operation that got slower or needs more
+memory than the baseline by more than `--tolerance` is reported as a
+regression and makes the script exit with status 1.
+"""
+
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import vdf  # noqa: E402
+from bench_vdf import make_shortcuts  # noqa: E402
+from bench_vdf_text import make_localconfig  # noqa: E402
+
+SIZES = (10, 1000, 10000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "vdf_baseline.json")
+
+
+def operations(entries):
+    shortcuts = make_shortcuts(entries)
+    binary = vdf.binary_dumps(shortcuts)
+    text = make_localconfig(entries)
+    parsed_text = vdf.loads(text)
+    vbkv = vdf.vbkv_dumps(shortcuts)
+    return (
+        ("binary_load", len(binary), lambda: vdf.binary_load(io.BytesIO(binary))),
+        (
+            "binary_dump",
+            len(binary),
+            lambda: vdf.binary_dump(shortcuts, io.BytesIO()),
+        ),
+        ("parse", len(text), lambda: vdf.parse(io.StringIO(text))),
+        ("dumps", len(text), lambda: vdf.dumps(parsed_text, pretty=True)),
+        ("vbkv_loads", len(vbkv), lambda: vdf.vbkv_loads(vbkv)),
+    )
+
+
+def best_time(fn, repeat, number):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = (time.perf_counter() - started) / number
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(fn):
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(sizes, repeat):
+    results = {}
+    for entries in sizes:
+        # Repeat the small cases enough to rise above timer noise
+        number = max(1, 1000 // entries)
+        for name, size, fn in operations(entries):
+            results["{}/{}".format(name, entries)] = {
+                "bytes": size,
+                "seconds": best_time(fn, repeat, number),
+                "peak_bytes": peak_memory(fn),
+            }
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(
+        "{:<20} {:>12} {:>8} {:>12} {:>8}".format(
+            "operation", "time", "vs base", "peak", "vs base"
+        )
+    )
+    for key, result in results.items():
+        base = baseline.get(key)
+        row = [
+            "{:.3f} ms".format(result["seconds"] * 1000),
+            "",
+            "{:.1f} KiB".format(result["peak_bytes"] / 1024),
+            "",
+        ]
+        if base is not None:
+            for i, field in ((1, "seconds"), (3, "peak_bytes")):
+                ratio = result[field] / base[field] if base[field] else 1.0
+                row[i] = "{:.2f}x".format(ratio)
+                if ratio > 1 + tolerance:
+                    row[i] += " !"
+                    regressions.append((key, field, ratio))
+        print("{:<20} {:>12} {:>8} {:>12} {:>8}".format(key, *row))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save", action="store_true", help="store the results as the baseline"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat)
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline, mode="r") as f:
+            saved = json.load(f)
+        if saved.get("python") != platform.python_version():
+            print(
+                "baseline was recorded on Python {}, this is {}".format(
+                    saved.get("python"), platform.python_version()
+                )
+            )
+        baseline = saved["results"]
+
+    regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        with open(args.baseline, mode="w") as f:
+            json.dump(
+                {"python": platform.python_version(), "results": results},
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+        print("baseline saved to {}".format(args.baseline))
+    elif not baseline:
+        print("no baseline at {}, run with --save to record one".format(args.baseline))
+    elif regressions:
+        for key, field, ratio in regressions:
+            print("regression: {} {} is {:.2f}x the baseline".format(key, field, ratio))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
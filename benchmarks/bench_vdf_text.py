@@ -0,0 +1,117 @@
+"""
+Text VDF parsing and serializing speed on a generated `localconfig.vdf`. The
+differential tests against the original line based parser and generator based
+serializer are in `tests/test_vdf.py`.
+
+    python benchmarks/bench_vdf_text.py [--apps 20000] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import vdf  # noqa: E402
+import vdf_reference  # noqa: E402
+
+
+def make_localconfig(apps, seed=0):
+    # Roughly the shape of userdata/<id>/config/localconfig.vdf
+    rng = random.Random(seed)
+    lines = [
+        '"UserLocalConfigStore"',
+        "{",
+        '\t"Software"',
+        "\t{",
+        '\t\t"Valve"',
+        "\t\t{",
+        '\t\t\t"Steam"',
+        "\t\t\t{",
+        '\t\t\t\t"apps"',
+        "\t\t\t\t{",
+    ]
+    for i in range(apps):
+        indent = "\t" * 5
+        lines += [
+            '{}"{}"'.format(indent, 10 + i * 10),
+            indent + "{",
+            '{}\t"LastPlayed"\t\t"{}"'.format(indent, rng.randint(0, 2**31)),
+            '{}\t"Playtime"\t\t"{}"'.format(indent, rng.randint(0, 10**5)),
+            '{}\t"LaunchOptions"\t\t"{}"'.format(
+                indent, rng.choice(["", "-novid", 'PROTON_LOG=1 \\"%command%\\"'])
+            ),
+            '{}\t"cloud"'.format(indent),
+            indent + "\t{",
+            '{}\t\t"last_sync_state"\t\t"synchronized"'.format(indent),
+            indent + "\t}",
+            indent + "}",
+        ]
+    lines += ["\t\t\t\t}", "\t\t\t}", "\t\t}", "\t}", "}", ""]
+    return "\n".join(lines)
+
+
+def make_multiline_value(lines):
+    # One quoted value spanning many lines, quadratic for the old parser
+    value = "\n".join("line {} of a long note".format(i) for i in range(lines))
+    return '"notes"\n{\n\t"text"\t"' + value + '"\n}\n'
+
+
+def timed(label, repeat, fn):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:>10.2f} ms".format(label, best * 1000))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--apps", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, text in (
+        ("localconfig.vdf", make_localconfig(args.apps)),
+        ("multi-line value", make_multiline_value(2000)),
+    ):
+        print("{}, {:.1f} MiB".format(label, len(text) / (1024 * 1024)))
+        assert vdf_reference.parse(io.StringIO(text)) == vdf.loads(text)
+        before = timed(
+            "  reference parse",
+            args.repeat,
+            lambda: vdf_reference.parse(io.StringIO(text)),
+        )
+        after = timed("  loads", args.repeat, lambda: vdf.loads(text))
+        print("  speedup: {:.1f}x".format(before / after))
+
+        obj = vdf.loads(text)
+        for pretty in (False, True):
+            assert "".join(vdf_reference._dump_gen(obj, pretty)) == vdf.dumps(
+                obj, pretty=pretty
+            )
+        before = timed(
+            "  reference dumps",
+            args.repeat,
+            lambda: "".join(vdf_reference._dump_gen(obj, True)),
+        )
+        after = timed("  dumps", args.repeat, lambda: vdf.dumps(obj, pretty=True))
+        print("  speedup: {:.1f}x".format(before / after))
+        timed(
+            "  dump to file",
+            args.repeat,
+            lambda: vdf.dump(obj, io.StringIO(), pretty=True),
+        )
+
+
+if __name__ == "__main__":
+    main()
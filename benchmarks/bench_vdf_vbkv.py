@@ -0,0 +1,102 @@
+"""
+VBKV loading speed and peak memory on multi-MB generated files, comparing
+`vdf.vbkv_loads` / `vdf.vbkv_load` with the original loader, which copied the
+payload twice (once for the checksum and once more for the parser).
+
+    python benchmarks/bench_vdf_vbkv.py [--entries 5000 20000 60000] [--repeat 3]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import vdf  # noqa: E402
+import vdf_reference  # noqa: E402
+from bench_vdf import make_shortcuts  # noqa: E402
+
+
+def make_vbkv(entries):
+    data = make_shortcuts(entries)
+    for padding in range(64):
+        data["padding"] = padding
+        encoded = vdf.vbkv_dumps(data)
+        # The original loader read the checksum as signed and rejected files
+        # whose CRC has the top bit set, keep to ones it can load
+        if encoded[7] < 0x80:
+            return data, encoded
+    raise RuntimeError("no fixture with a loadable checksum")
+
+
+def timed(label, repeat, fn):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print("{:<32} {:>10.2f} ms".format(label, best * 1000))
+    return best
+
+
+def transient_peak(fn):
+    # Bytes allocated at the peak on top of what the result keeps
+    gc.collect()
+    tracemalloc.start()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak - current
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="+", default=[5000, 20000, 60000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for entries in args.entries:
+        data, encoded = make_vbkv(entries)
+        mib = len(encoded) / (1024 * 1024)
+        print("VBKV with {} entries, {:.1f} MiB".format(entries, mib))
+
+        with tempfile.NamedTemporaryFile(suffix=".vbkv") as f:
+            f.write(encoded)
+            f.flush()
+
+            def load_file():
+                with open(f.name, "rb") as fp:
+                    return vdf.vbkv_load(fp)
+
+            assert vdf_reference.vbkv_loads(encoded) == data
+            assert vdf.vbkv_loads(encoded) == data
+            assert vdf.vbkv_loads(memoryview(encoded)) == data
+            assert load_file() == data
+
+            candidates = (
+                ("reference vbkv_loads", lambda: vdf_reference.vbkv_loads(encoded)),
+                ("vbkv_loads", lambda: vdf.vbkv_loads(encoded)),
+                ("vbkv_load", load_file),
+            )
+            for label, fn in candidates:
+                timed("  " + label, args.repeat, fn)
+            for label, fn in candidates:
+                peak = transient_peak(fn)
+                print(
+                    "  {:<30} {:>10.2f} MiB transient ({:.1f}x file)".format(
+                        label, peak / (1024 * 1024), peak / len(encoded)
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
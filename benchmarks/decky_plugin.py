@@ -0,0 +1,89 @@
+"""
+Stand-in for the `decky_plugin` module decky-loader provides at runtime, with
+the names from `decky_plugin.pyi`, so `main.py` can be imported outside of
+the loader. Paths come from the same environment variables the loader sets,
+defaulting to directories under the system temp dir.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+
+__version__ = "0.1.0"
+
+_root = os.path.join(tempfile.gettempdir(), "decky-plugin-stub")
+
+HOME = os.environ.get("HOME", _root)
+USER = os.environ.get("USER", "deck")
+DECKY_VERSION = os.environ.get("DECKY_VERSION", "v0.0.0-stub")
+DECKY_USER = os.environ.get("DECKY_USER", USER)
+DECKY_USER_HOME = os.environ.get("DECKY_USER_HOME", os.path.join(_root, "home"))
+DECKY_HOME = os.environ.get("DECKY_HOME", os.path.join(DECKY_USER_HOME, "homebrew"))
+DECKY_PLUGIN_NAME = os.environ.get("DECKY_PLUGIN_NAME", "OpenGOAL")
+DECKY_PLUGIN_DIR = os.environ.get(
+    "DECKY_PLUGIN_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "defaults"),
+)
+DECKY_PLUGIN_SETTINGS_DIR = os.environ.get(
+    "DECKY_PLUGIN_SETTINGS_DIR",
+    os.path.join(DECKY_HOME, "settings", DECKY_PLUGIN_NAME),
+)
+DECKY_PLUGIN_RUNTIME_DIR = os.environ.get(
+    "DECKY_PLUGIN_RUNTIME_DIR", os.path.join(DECKY_HOME, "data", DECKY_PLUGIN_NAME)
+)
+DECKY_PLUGIN_LOG_DIR = os.environ.get(
+    "DECKY_PLUGIN_LOG_DIR", os.path.join(DECKY_HOME, "logs", DECKY_PLUGIN_NAME)
+)
+DECKY_PLUGIN_VERSION = os.environ.get("DECKY_PLUGIN_VERSION", "0.0.0")
+DECKY_PLUGIN_AUTHOR = os.environ.get("DECKY_PLUGIN_AUTHOR", "stub")
+DECKY_PLUGIN_LOG = os.environ.get(
+    "DECKY_PLUGIN_LOG", os.path.join(DECKY_PLUGIN_LOG_DIR, "plugin.log")
+)
+
+# Created automatically, like the loader does
+for _directory in (
+    DECKY_PLUGIN_SETTINGS_DIR,
+    DECKY_PLUGIN_RUNTIME_DIR,
+    DECKY_PLUGIN_LOG_DIR,
+):
+    os.makedirs(_directory, exist_ok=True)
+
+
+def migrate_any(target_dir, *files_or_directories):
+    moved = {}
+    os.makedirs(target_dir, exist_ok=True)
+    for source in files_or_directories:
+        if not os.path.exists(source):
+            continue
+        if os.path.isdir(source):
+            for name in os.listdir(source):
+                moved.update(migrate_any(target_dir, os.path.join(source, name)))
+            shutil.rmtree(source)
+        else:
+            target = os.path.join(target_dir, os.path.basename(source))
+            shutil.move(source, target)
+            moved[source] = target
+    return moved
+
+
+def migrate_settings(*files_or_directories):
+    return migrate_any(DECKY_PLUGIN_SETTINGS_DIR, *files_or_directories)
+
+
+def migrate_runtime(*files_or_directories):
+    return migrate_any(DECKY_PLUGIN_RUNTIME_DIR, *files_or_directories)
+
+
+def migrate_logs(*files_or_directories):
+    return migrate_any(DECKY_PLUGIN_LOG_DIR, *files_or_directories)
+
+
+logger = logging.getLogger(DECKY_PLUGIN_NAME)
+logger.setLevel(logging.INFO)
+if not logger.handlers:
+    _handler = logging.FileHandler(DECKY_PLUGIN_LOG)
+    _handler.setFormatter(
+        logging.Formatter("[%(asctime)s][%(levelname)s]: %(message)s")
+    )
+    logger.addHandler(_handler)
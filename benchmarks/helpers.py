@@ -0,0 +1,9 @@
+"""
+Stand-in for decky-loader's `helpers` module, only what `main.py` imports.
+"""
+
+import ssl
+
+
+def get_ssl_context():
+    return ssl.create_default_context()
@@ -0,0 +1,103 @@
+"""
+Local HTTP stand-in for the GitHub asset CDN, supporting `Range` requests.
+
+Each connection can be throttled to `bytes_per_second` to mimic a per-flow
+bandwidth cap, which is what makes several connections faster in practice.
+Like GitHub, requests without a `User-Agent` get a 403.
+"""
+
+import http.server
+import os
+import re
+import threading
+import time
+
+_range_re = re.compile(r"bytes=(\d+)-(\d*)")
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Like a real server, don't let Nagle hold back small bodies on keep-alive
+    disable_nagle_algorithm = True
+
+    # Populated per server via `serve`
+    files = {}
+    bytes_per_second = None
+    support_ranges = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if not self.headers.get("User-Agent"):
+            self.send_error(403, "User-Agent required")
+            return
+        data = self.files.get(self.path)
+        if data is None:
+            self.send_error(404)
+            return
+        start, end = 0, len(data) - 1
+        status = 200
+        range_header = self.headers.get("Range")
+        if range_header and self.support_ranges:
+            match = _range_re.match(range_header)
+            if match:
+                start = int(match.group(1))
+                if match.group(2):
+                    end = min(int(match.group(2)), len(data) - 1)
+                status = 206
+        self.send_response(status)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.send_header("ETag", '"{}"'.format(len(data)))
+        if status == 206:
+            self.send_header(
+                "Content-Range", "bytes {}-{}/{}".format(start, end, len(data))
+            )
+        self.end_headers()
+        try:
+            self._write_throttled(memoryview(data)[start : end + 1])
+        except (BrokenPipeError, ConnectionResetError):
+            # Clients (e.g. a range probe that got a 200) may hang up early
+            self.close_connection = True
+
+    def _write_throttled(self, view):
+        block = 64 * 1024
+        started = time.monotonic()
+        for offset in range(0, len(view), block):
+            self.wfile.write(view[offset : offset + block])
+            if self.bytes_per_second:
+                expected = (offset + block) / self.bytes_per_second
+                delay = expected - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+
+def serve(files, bytes_per_second=None, support_ranges=True, handler=None):
+    """
+    Start a server on a free localhost port in a background thread.
+
+    ``files`` maps request paths to their ``bytes`` content. Returns the
+    server, call ``shutdown()`` on it when done.
+    """
+    handler = type(
+        "Handler",
+        (handler or RangeRequestHandler,),
+        {
+            "files": files,
+            "bytes_per_second": bytes_per_second,
+            "support_ranges": support_ranges,
+        },
+    )
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def base_url(server):
+    return "http://127.0.0.1:{}".format(server.server_address[1])
+
+
+def random_payload(size):
+    return os.urandom(size)
@@ -0,0 +1,359 @@
+"""
+The vdf 3.4 parsers, VBKV loader and text serializer exactly as vendored
+before they were rewritten, kept only as the reference for the differential
+tests in `tests/test_vdf.py` and the VDF benchmarks.
+"""
+
+import re
+import struct
+from binascii import crc32
+from collections.abc import Mapping
+from io import BytesIO
+
+from vdf import (
+    BIN_COLOR,
+    BIN_END,
+    BIN_END_ALT,
+    BIN_FLOAT32,
+    BIN_INT32,
+    BIN_INT64,
+    BIN_NONE,
+    BIN_POINTER,
+    BIN_STRING,
+    BIN_UINT64,
+    BIN_WIDESTRING,
+    COLOR,
+    INT_64,
+    POINTER,
+    UINT_64,
+    _re_escape_match,
+    _re_unescape_match,
+    string_type,
+    strip_bom,
+)
+
+
+def binary_load(
+    fp,
+    mapper=dict,
+    merge_duplicate_keys=True,
+    alt_format=False,
+    raise_on_remaining=False,
+):
+    """
+    Deserialize ``fp`` (a ``.read()``-supporting file-like object containing
+    binary VDF) to a Python object.
+
+    ``mapper`` specifies the Python object used after deserializetion. ``dict` is
+    used by default. Alternatively, ``collections.OrderedDict`` can be used if you
+    wish to preserve key order. Or any object that acts like a ``dict``.
+
+    ``merge_duplicate_keys`` when ``True`` will merge multiple KeyValue lists with the
+    same key into one instead of overwriting. You can se this to ``False`` if you are
+    using ``VDFDict`` and need to preserve the duplicates.
+    """
+    if not hasattr(fp, "read") or not hasattr(fp, "tell") or not hasattr(fp, "seek"):
+        raise TypeError(
+            "Expected fp to be a file-like object with tell()/seek() and read() returning bytes"
+        )
+    if not issubclass(mapper, Mapping):
+        raise TypeError("Expected mapper to be subclass of dict, got %s" % type(mapper))
+
+    # helpers
+    int32 = struct.Struct("<i")
+    uint64 = struct.Struct("<Q")
+    int64 = struct.Struct("<q")
+    float32 = struct.Struct("<f")
+
+    def read_string(fp, wide=False):
+        buf, end = b"", -1
+        offset = fp.tell()
+
+        # locate string end
+        while end == -1:
+            chunk = fp.read(64)
+
+            if chunk == b"":
+                raise SyntaxError("Unterminated cstring (offset: %d)" % offset)
+
+            buf += chunk
+            end = buf.find(b"\x00\x00" if wide else b"\x00")
+
+        if wide:
+            end += end % 2
+
+        # rewind fp
+        fp.seek(end - len(buf) + (2 if wide else 1), 1)
+
+        # decode string
+        result = buf[:end]
+
+        if wide:
+            result = result.decode("utf-16")
+        elif bytes is not str:
+            result = result.decode("utf-8", "replace")
+        else:
+            try:
+                result.decode("ascii")
+            except:
+                result = result.decode("utf-8", "replace")
+
+        return result
+
+    stack = [mapper()]
+    CURRENT_BIN_END = BIN_END if not alt_format else BIN_END_ALT
+
+    for t in iter(lambda: fp.read(1), b""):
+        if t == CURRENT_BIN_END:
+            if len(stack) > 1:
+                stack.pop()
+                continue
+            break
+
+        key = read_string(fp)
+
+        if t == BIN_NONE:
+            if merge_duplicate_keys and key in stack[-1]:
+                _m = stack[-1][key]
+            else:
+                _m = mapper()
+                stack[-1][key] = _m
+            stack.append(_m)
+        elif t == BIN_STRING:
+            stack[-1][key] = read_string(fp)
+        elif t == BIN_WIDESTRING:
+            stack[-1][key] = read_string(fp, wide=True)
+        elif t in (BIN_INT32, BIN_POINTER, BIN_COLOR):
+            val = int32.unpack(fp.read(int32.size))[0]
+
+            if t == BIN_POINTER:
+                val = POINTER(val)
+            elif t == BIN_COLOR:
+                val = COLOR(val)
+
+            stack[-1][key] = val
+        elif t == BIN_UINT64:
+            stack[-1][key] = UINT_64(uint64.unpack(fp.read(int64.size))[0])
+        elif t == BIN_INT64:
+            stack[-1][key] = INT_64(int64.unpack(fp.read(int64.size))[0])
+        elif t == BIN_FLOAT32:
+            stack[-1][key] = float32.unpack(fp.read(float32.size))[0]
+        else:
+            raise SyntaxError(
+                "Unknown data type at offset %d: %s" % (fp.tell() - 1, repr(t))
+            )
+
+    if len(stack) != 1:
+        raise SyntaxError("Reached EOF, but Binary VDF is incomplete")
+    if raise_on_remaining and fp.read(1) != b"":
+        fp.seek(-1, 1)
+        raise SyntaxError(
+            "Binary VDF ended at offset %d, but there is more data remaining"
+            % (fp.tell() - 1)
+        )
+
+    return stack.pop()
+
+
+def vbkv_loads(s, mapper=dict, merge_duplicate_keys=True):
+    if s[:4] != b"VBKV":
+        raise ValueError("Invalid header")
+
+    (checksum,) = struct.unpack("<i", s[4:8])
+
+    if checksum != crc32(s[8:]):
+        raise ValueError("Invalid checksum")
+
+    # binary_loads wrapped its argument in a BytesIO
+    return binary_load(
+        BytesIO(s[8:]),
+        mapper,
+        merge_duplicate_keys,
+        alt_format=True,
+        raise_on_remaining=True,
+    )
+
+
+def _unescape(text):
+    return re.sub(
+        r"(\\n|\\t|\\v|\\b|\\r|\\f|\\a|\\\\|\\\?|\\\"|\\')",
+        _re_unescape_match,
+        text,
+    )
+
+
+def parse(fp, mapper=dict, merge_duplicate_keys=True, escaped=True):
+    """
+    Deserialize ``s`` (a ``str`` or ``unicode`` instance containing a VDF)
+    to a Python object.
+
+    ``mapper`` specifies the Python object used after deserializetion. ``dict` is
+    used by default. Alternatively, ``collections.OrderedDict`` can be used if you
+    wish to preserve key order. Or any object that acts like a ``dict``.
+
+    ``merge_duplicate_keys`` when ``True`` will merge multiple KeyValue lists with the
+    same key into one instead of overwriting. You can se this to ``False`` if you are
+    using ``VDFDict`` and need to preserve the duplicates.
+    """
+    if not issubclass(mapper, Mapping):
+        raise TypeError("Expected mapper to be subclass of dict, got %s" % type(mapper))
+    if not hasattr(fp, "readline"):
+        raise TypeError(
+            "Expected fp to be a file-like object supporting line iteration"
+        )
+
+    stack = [mapper()]
+    expect_bracket = False
+
+    re_keyvalue = re.compile(
+        r'^("(?P<qkey>(?:\\.|[^\\"])*)"|(?P<key>#?[a-z0-9\-\_\\\?$%<>]+))'
+        r"([ \t]*("
+        r'"(?P<qval>(?:\\.|[^\\"])*)(?P<vq_end>")?'
+        r"|(?P<val>(?:(?<!/)/(?!/)|[a-z0-9\-\_\\\?\*\.$<> ])+)"
+        r"|(?P<sblock>{[ \t]*)(?P<eblock>})?"
+        r"))?",
+        flags=re.I,
+    )
+
+    for lineno, line in enumerate(fp, 1):
+        if lineno == 1:
+            line = strip_bom(line)
+
+        line = line.lstrip()
+
+        # skip empty and comment lines
+        if line == "" or line[0] == "/":
+            continue
+
+        # one level deeper
+        if line[0] == "{":
+            expect_bracket = False
+            continue
+
+        if expect_bracket:
+            raise SyntaxError(
+                "vdf.parse: expected openning bracket",
+                (getattr(fp, "name", "<%s>" % fp.__class__.__name__), lineno, 1, line),
+            )
+
+        # one level back
+        if line[0] == "}":
+            if len(stack) > 1:
+                stack.pop()
+                continue
+
+            raise SyntaxError(
+                "vdf.parse: one too many closing parenthasis",
+                (getattr(fp, "name", "<%s>" % fp.__class__.__name__), lineno, 0, line),
+            )
+
+        # parse keyvalue pairs
+        while True:
+            match = re_keyvalue.match(line)
+
+            if not match:
+                try:
+                    line += next(fp)
+                    continue
+                except StopIteration:
+                    raise SyntaxError(
+                        "vdf.parse: unexpected EOF (open key quote?)",
+                        (
+                            getattr(fp, "name", "<%s>" % fp.__class__.__name__),
+                            lineno,
+                            0,
+                            line,
+                        ),
+                    )
+
+            key = (
+                match.group("key")
+                if match.group("qkey") is None
+                else match.group("qkey")
+            )
+            val = match.group("qval")
+            if val is None:
+                val = match.group("val")
+                if val is not None:
+                    val = val.rstrip()
+                    if val == "":
+                        val = None
+
+            if escaped:
+                key = _unescape(key)
+
+            # we have a key with value in parenthesis, so we make a new dict obj (level deeper)
+            if val is None:
+                if merge_duplicate_keys and key in stack[-1]:
+                    _m = stack[-1][key]
+                    # we've descended a level deeper, if value is str, we have to overwrite it to mapper
+                    if not isinstance(_m, mapper):
+                        _m = stack[-1][key] = mapper()
+                else:
+                    _m = mapper()
+                    stack[-1][key] = _m
+
+                if match.group("eblock") is None:
+                    # only expect a bracket if it's not already closed or on the same line
+                    stack.append(_m)
+                    if match.group("sblock") is None:
+                        expect_bracket = True
+
+            # we've matched a simple keyvalue pair, map it to the last dict obj in the stack
+            else:
+                # if the value is line consume one more line and try to match again,
+                # until we get the KeyValue pair
+                if match.group("vq_end") is None and match.group("qval") is not None:
+                    try:
+                        line += next(fp)
+                        continue
+                    except StopIteration:
+                        raise SyntaxError(
+                            "vdf.parse: unexpected EOF (open quote for value?)",
+                            (
+                                getattr(fp, "name", "<%s>" % fp.__class__.__name__),
+                                lineno,
+                                0,
+                                line,
+                            ),
+                        )
+
+                stack[-1][key] = _unescape(val) if escaped else val
+
+            # exit the loop
+            break
+
+    if len(stack) != 1:
+        raise SyntaxError(
+            "vdf.parse: unclosed parenthasis or quotes (EOF)",
+            (getattr(fp, "name", "<%s>" % fp.__class__.__name__), lineno, 0, line),
+        )
+
+    return stack.pop()
+
+
+def _escape(text):
+    return re.sub(r"[\n\t\v\b\r\f\a\\\?\"']", _re_escape_match, text)
+
+
+def _dump_gen(data, pretty=False, escaped=True, level=0):
+    indent = "\t"
+    line_indent = ""
+
+    if pretty:
+        line_indent = indent * level
+
+    for key, value in data.items():
+        if escaped and isinstance(key, string_type):
+            key = _escape(key)
+
+        if isinstance(value, Mapping):
+            yield '%s"%s"\n%s{\n' % (line_indent, key, line_indent)
+            for chunk in _dump_gen(value, pretty, escaped, level + 1):
+                yield chunk
+            yield "%s}\n" % line_indent
+        else:
+            if escaped and isinstance(value, string_type):
+                value = _escape(value)
+
+            yield '%s"%s" "%s"\n' % (line_indent, key, value)
@@ -0,0 +1,96 @@
+"""
+In-memory cache of the base64 encoded shortcut artwork.
+
+Creating a shortcut asks for several images in a row, and each used to be
+read from disk and base64 encoded from scratch. Encoded payloads are kept
+here keyed by (game, kind) and validated against the file's mtime with a
+single ``stat``, so edits on disk are still picked up. Least recently used
+entries are evicted once the cached payloads pass ``max_bytes``.
+
+``get_set`` hands back several kinds at once, either encoded or (in "path"
+mode) as the on-disk file paths, which skips reading and encoding entirely.
+"""
+
+import base64
+import os
+import threading
+from collections import OrderedDict
+
+KINDS = ("small", "wide", "logo", "hero", "icon")
+MODES = ("base64", "path")
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ArtworkCache:
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        # Expects `<root>/<game>/<kind>.png`
+        self.root = root
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def path(self, game, kind):
+        return os.path.join(self.root, game, "{}.png".format(kind))
+
+    def get_base64(self, game, kind):
+        """
+        Return the artwork as a base64 ``str``, or ``None`` if there is no
+        such file.
+        """
+        if kind not in KINDS:
+            return None
+        path = self.path(game, kind)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+        key = (game, kind)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(key)
+                return entry[1]
+        with open(path, "rb") as image_file:
+            encoded = base64.b64encode(image_file.read()).decode("utf-8")
+        self._put(key, mtime, encoded)
+        return encoded
+
+    def get_set(self, game, kinds=KINDS, mode="base64"):
+        """
+        Return ``{kind: artwork}`` for every requested kind that exists, as
+        base64 strings or, with ``mode="path"``, absolute file paths.
+        """
+        if mode not in MODES:
+            raise ValueError("unknown artwork mode: {}".format(mode))
+        artwork = {}
+        for kind in kinds:
+            if kind not in KINDS:
+                continue
+            if mode == "path":
+                path = self.path(game, kind)
+                value = os.path.abspath(path) if os.path.isfile(path) else None
+            else:
+                value = self.get_base64(game, kind)
+            if value is not None:
+                artwork[kind] = value
+        return artwork
+
+    def preload(self, games, kinds=KINDS):
+        for game in games:
+            for kind in kinds:
+                self.get_base64(game, kind)
+
+    def _put(self, key, mtime, encoded):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous[1])
+            if len(encoded) > self.max_bytes:
+                return
+            self._entries[key] = (mtime, encoded)
+            self._size += len(encoded)
+            while self._size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._size -= len(evicted)
@@ -0,0 +1,267 @@
+"""
+Resumable, multi-connection HTTP downloader used for release assets.
+
+The asset is split into fixed size HTTP Range chunks that are fetched over
+several connections at once and written straight to their offset in a
+``.part`` file. A small JSON sidecar records which chunks are complete, so an
+interrupted download picks up where it stopped instead of from byte zero.
+Servers that don't support ranges fall back to a single sequential stream.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_pool import HTTPPool
+
+MiB = 1024 * 1024
+
+DEFAULT_CONNECTIONS = 4
+DEFAULT_CHUNK_SIZE = 8 * MiB
+READ_SIZE = 256 * 1024
+
+_content_range_re = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise DownloadCancelled()
+
+
+class _ResolvedURL:
+    # Where `url` redirects to, shared by the chunk workers. GitHub redirects
+    # to signed CDN URLs that expire, so a chunk that fails resolves it again
+    # before retrying (just once for all the workers that hit the same URL)
+    def __init__(self, downloader, url, current):
+        self._downloader = downloader
+        self.url = url
+        self.current = current
+        self._lock = threading.Lock()
+
+    def refresh(self, stale):
+        with self._lock:
+            if self.current == stale:
+                self.current = self._downloader.probe(self.url)[0]
+            return self.current
+
+
+class RangedDownloader:
+    def __init__(
+        self,
+        connections=DEFAULT_CONNECTIONS,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        ssl_context=None,
+        timeout=30,
+        retries=3,
+        http=None,
+    ):
+        self.connections = max(1, connections)
+        self.chunk_size = chunk_size
+        self.retries = retries
+        # Share a pool to reuse connections already opened for other requests
+        self.http = http or HTTPPool(
+            ssl_context=ssl_context,
+            timeout=timeout,
+            max_idle_per_host=self.connections,
+        )
+
+    def _open(self, url, headers=None):
+        return self.http.get(url, headers)
+
+    def probe(self, url):
+        # Ask for the first byte only: a 206 tells us ranges are supported and
+        # carries the total size, and `geturl()` gives us the final URL after
+        # any redirects so the chunk requests don't each redo them.
+        with self._open(url, {"Range": "bytes=0-0"}) as resp:
+            if resp.status not in (200, 206):
+                raise DownloadError(
+                    "unexpected status code probing {}: {}".format(url, resp.status)
+                )
+            etag = resp.headers.get("ETag")
+            if resp.status == 206:
+                match = _content_range_re.match(resp.headers.get("Content-Range", ""))
+                if match and match.group(3) != "*":
+                    return resp.geturl(), int(match.group(3)), etag, True
+            length = resp.headers.get("Content-Length")
+            return resp.geturl(), int(length) if length else None, etag, False
+
+    def download(self, url, dest, progress=None, cancel_event=None):
+        """
+        Download ``url`` to ``dest``, resuming a previous partial download of
+        the same resource if one is found next to ``dest``.
+
+        ``progress`` is called as ``progress(bytes_done, bytes_total)`` from
+        the worker threads as data arrives. Setting ``cancel_event`` (a
+        ``threading.Event``) stops the download with ``DownloadCancelled``,
+        leaving the partial file and sidecar behind for a later resume.
+        """
+        resolved_url, size, etag, ranged = self.probe(url)
+        if not ranged or not size:
+            return self._download_single(
+                resolved_url, dest, size, progress, cancel_event
+            )
+
+        part_file = dest + ".part"
+        state_file = dest + ".part.json"
+        chunks = [
+            (offset, min(offset + self.chunk_size, size) - 1)
+            for offset in range(0, size, self.chunk_size)
+        ]
+        done = self._load_state(state_file, part_file, url, size, etag)
+
+        with open(part_file, "ab") as f:
+            f.truncate(size)
+
+        lock = threading.Lock()
+        state = {
+            "url": url,
+            "size": size,
+            "etag": etag,
+            "chunk_size": self.chunk_size,
+            "done": sorted(done),
+        }
+        counter = {"bytes": sum(chunks[i][1] - chunks[i][0] + 1 for i in done)}
+        if progress:
+            progress(counter["bytes"], size)
+
+        def on_bytes(count):
+            with lock:
+                counter["bytes"] += count
+                current = counter["bytes"]
+            if progress:
+                progress(current, size)
+
+        def on_chunk_done(index):
+            with lock:
+                state["done"].append(index)
+                self._save_state(state_file, state)
+
+        source = _ResolvedURL(self, url, resolved_url)
+        fd = os.open(part_file, os.O_WRONLY)
+        try:
+            pool = ThreadPoolExecutor(max_workers=self.connections)
+            try:
+                futures = {
+                    pool.submit(
+                        self._fetch_chunk,
+                        source,
+                        fd,
+                        chunks[i],
+                        on_bytes,
+                        cancel_event,
+                    ): i
+                    for i in range(len(chunks))
+                    if i not in done
+                }
+                for future in as_completed(futures):
+                    future.result()
+                    # The sidecar must never vouch for data that's still only
+                    # in the page cache, or a power loss resumes over zeros
+                    os.fsync(fd)
+                    on_chunk_done(futures[future])
+            finally:
+                # Don't keep fetching the remaining chunks once one has failed,
+                # the sidecar already has everything needed to resume later
+                pool.shutdown(wait=True, cancel_futures=True)
+        finally:
+            os.close(fd)
+
+        os.replace(part_file, dest)
+        if os.path.exists(state_file):
+            os.remove(state_file)
+        return dest
+
+    def _fetch_chunk(self, source, fd, chunk, on_bytes, cancel_event=None):
+        start, end = chunk
+        url = source.current
+        for attempt in range(self.retries + 1):
+            offset = start
+            try:
+                with self._open(
+                    url, {"Range": "bytes={}-{}".format(start, end)}
+                ) as resp:
+                    if resp.status != 206:
+                        raise DownloadError(
+                            "expected 206 for range {}-{}, got {}".format(
+                                start, end, resp.status
+                            )
+                        )
+                    while offset <= end:
+                        _check_cancelled(cancel_event)
+                        data = resp.read(min(READ_SIZE, end - offset + 1))
+                        if not data:
+                            raise DownloadError(
+                                "connection closed at byte {} of chunk {}-{}".format(
+                                    offset, start, end
+                                )
+                            )
+                        os.pwrite(fd, data, offset)
+                        offset += len(data)
+                        on_bytes(len(data))
+                return
+            except Exception as error:
+                # Whatever made it to disk for this chunk is rewritten on retry
+                on_bytes(start - offset)
+                if attempt == self.retries or isinstance(error, DownloadCancelled):
+                    raise
+                time.sleep(min(2**attempt, 10))
+                try:
+                    url = source.refresh(url)
+                except Exception:
+                    # Can't resolve it right now, retry with what we have
+                    pass
+
+    def _download_single(self, url, dest, size, progress, cancel_event=None):
+        part_file = dest + ".part"
+        done = 0
+        with self._open(url) as resp, open(part_file, "wb") as f:
+            if resp.status != 200:
+                raise DownloadError(
+                    "unexpected status code downloading {}: {}".format(url, resp.status)
+                )
+            while True:
+                _check_cancelled(cancel_event)
+                data = resp.read(READ_SIZE)
+                if not data:
+                    break
+                f.write(data)
+                done += len(data)
+                if progress:
+                    progress(done, size)
+        os.replace(part_file, dest)
+        return dest
+
+    def _load_state(self, state_file, part_file, url, size, etag):
+        if not os.path.exists(state_file) or not os.path.exists(part_file):
+            return set()
+        try:
+            with open(state_file, mode="r") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        # Only resume when it's provably the same resource split the same way
+        if (
+            state.get("url") != url
+            or state.get("size") != size
+            or state.get("etag") != etag
+            or state.get("chunk_size") != self.chunk_size
+        ):
+            return set()
+        return set(state.get("done", []))
+
+    def _save_state(self, state_file, state):
+        tmp_file = state_file + ".tmp"
+        with open(tmp_file, mode="w") as f:
+            f.write(json.dumps(state))
+        os.replace(tmp_file, state_file)
@@ -0,0 +1,218 @@
+"""
+Runs the OpenGOAL ``extractor`` and turns its output into live progress.
+
+stdout and stderr are read in chunks through an asyncio subprocess, split
+into lines on ``\n`` and ``\r`` (progress bars redraw with the latter) and
+kept in bounded ring buffers, so a chatty compile can't grow memory without
+limit and an overlong line is truncated instead of stalling the pipe. Each
+line is scanned for phase markers (extract, validate, decompile, compile)
+and percentages. Time spent in every phase is recorded as it goes.
+"""
+
+import asyncio
+import os
+import re
+import signal
+import threading
+import time
+from collections import deque
+
+# Phases in the order the extractor runs them, progress never moves backwards
+PHASES = ("extract", "validate", "decompile", "compile")
+
+# How many lines of each stream are kept for the failure logs
+MAX_BUFFERED_LINES = 500
+
+# Longest line kept from the extractor, anything past it is dropped
+MAX_LINE_LENGTH = 1024 * 1024
+
+# How much of a stream is read at a time
+READ_CHUNK_SIZE = 64 * 1024
+
+# How long a cancel waits for the killed extractor to be reaped
+KILL_TIMEOUT = 5
+
+_phase_markers = (
+    ("decompile", re.compile(r"decompil", re.I)),
+    ("compile", re.compile(r"\bcompil|goalc|\bbuilding\b", re.I)),
+    ("validate", re.compile(r"validat", re.I)),
+    ("extract", re.compile(r"extract", re.I)),
+)
+_percent_re = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+_fraction_re = re.compile(r"\[\s*(\d+)\s*/\s*(\d+)\s*\]")
+_line_end_re = re.compile(rb"[\r\n]")
+
+
+class ExtractorCancelled(Exception):
+    pass
+
+
+class ExtractorRun:
+    def __init__(self, on_update=None):
+        self.stdout = deque(maxlen=MAX_BUFFERED_LINES)
+        self.stderr = deque(maxlen=MAX_BUFFERED_LINES)
+        self.phase = None
+        self.percent = None
+        self.return_code = None
+        self.phase_timings = {}
+        self._phase_started = None
+        self._on_update = on_update
+        self._lock = threading.Lock()
+
+    def feed(self, stream, line):
+        (self.stderr if stream == "stderr" else self.stdout).append(line)
+        changed = False
+        with self._lock:
+            phase = self._match_phase(line)
+            if phase is not None and self._is_later_phase(phase):
+                self._enter_phase(phase)
+                changed = True
+            percent = self._match_percent(line)
+            if percent is not None and percent != self.percent:
+                self.percent = percent
+                changed = True
+        if changed and self._on_update is not None:
+            self._on_update(self)
+
+    def finish(self, return_code):
+        with self._lock:
+            self.return_code = return_code
+            self._close_phase()
+        if self._on_update is not None:
+            self._on_update(self)
+
+    def progress(self):
+        with self._lock:
+            timings = dict(self.phase_timings)
+            if self.phase is not None and self._phase_started is not None:
+                timings[self.phase] = (
+                    timings.get(self.phase, 0) + time.monotonic() - self._phase_started
+                )
+            return {
+                "phase": self.phase,
+                "percent": self.percent,
+                "phase_timings": timings,
+            }
+
+    def logs(self):
+        return "\n".join(self.stderr), "\n".join(self.stdout)
+
+    def _match_phase(self, line):
+        for phase, pattern in _phase_markers:
+            if pattern.search(line):
+                return phase
+        return None
+
+    def _match_percent(self, line):
+        match = _percent_re.search(line)
+        if match:
+            return min(100.0, float(match.group(1)))
+        match = _fraction_re.search(line)
+        if match and int(match.group(2)) > 0:
+            return round(100.0 * int(match.group(1)) / int(match.group(2)), 1)
+        return None
+
+    def _is_later_phase(self, phase):
+        if self.phase is None:
+            return True
+        return PHASES.index(phase) > PHASES.index(self.phase)
+
+    def _enter_phase(self, phase):
+        self._close_phase()
+        self.phase = phase
+        self.percent = None
+        self._phase_started = time.monotonic()
+
+    def _close_phase(self):
+        if self.phase is not None and self._phase_started is not None:
+            self.phase_timings[self.phase] = (
+                self.phase_timings.get(self.phase, 0)
+                + time.monotonic()
+                - self._phase_started
+            )
+            self._phase_started = None
+
+
+def _feed_line(run, name, line, dropped):
+    text = line.decode("utf-8", "replace")
+    if dropped:
+        text += "...<{} more bytes>".format(dropped)
+    run.feed(name, text)
+
+
+async def _pump(stream, name, run):
+    line = bytearray()
+    dropped = 0
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        parts = _line_end_re.split(chunk)
+        for i, part in enumerate(parts):
+            room = MAX_LINE_LENGTH - len(line)
+            line += part[:room]
+            dropped += max(0, len(part) - room)
+            if i == len(parts) - 1:
+                break
+            # Blank lines, including the one between a \r\n pair, are skipped
+            if line:
+                _feed_line(run, name, line, dropped)
+            line = bytearray()
+            dropped = 0
+    if line:
+        _feed_line(run, name, line, dropped)
+
+
+async def run_extractor_async(args, cwd, run, cancel_event=None, poll_interval=1):
+    process = await asyncio.create_subprocess_exec(
+        *args,
+        cwd=cwd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        # Own process group, so cancelling also takes down anything the
+        # extractor spawned
+        start_new_session=True,
+    )
+    pumps = asyncio.gather(
+        _pump(process.stdout, "stdout", run), _pump(process.stderr, "stderr", run)
+    )
+    while True:
+        try:
+            await asyncio.wait_for(asyncio.shield(process.wait()), poll_interval)
+            break
+        except asyncio.TimeoutError:
+            if cancel_event is not None and cancel_event.is_set():
+                await _kill(process, pumps)
+                raise ExtractorCancelled()
+    await pumps
+    run.finish(process.returncode)
+    return process.returncode
+
+
+async def _kill(process, pumps):
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    # wait() also waits for the pipes to close, which never happens if
+    # something that left the process group still holds them, so give up
+    # after a while rather than hang the job
+    try:
+        await asyncio.wait_for(asyncio.shield(process.wait()), KILL_TIMEOUT)
+    except asyncio.TimeoutError:
+        # Asyncio has no public way to drop the pipes of a process
+        process._transport.close()
+    pumps.cancel()
+    try:
+        await pumps
+    except asyncio.CancelledError:
+        pass
+
+
+def run_extractor(args, cwd, run, cancel_event=None):
+    """
+    Run the extractor to completion from a worker thread, feeding its output
+    into ``run`` (an ``ExtractorRun``) and returning the exit status. Raises
+    ``ExtractorCancelled`` if ``cancel_event`` gets set while it's running.
+    """
+    return asyncio.run(run_extractor_async(args, cwd, run, cancel_event))
@@ -0,0 +1,215 @@
+"""
+Keep-alive HTTP(S) client with a small connection pool per host.
+
+``urllib.request.urlopen`` opens a new TCP connection and does a full TLS
+handshake for every request. ``HTTPPool`` keeps finished connections around
+per (scheme, host, port) and reuses them for the next request to the same
+host, including the redirect hops GitHub makes from ``github.com`` to its
+asset CDN. Responses look enough like ``urlopen``'s for the callers here:
+``status``, ``headers``, ``read()``, ``geturl()`` and context manager use.
+Every request carries a ``User-Agent``, which the GitHub API requires.
+Proxies come from the environment (``https_proxy``, ``no_proxy``, ...) like
+they do for ``urlopen``: plain HTTP is sent to the proxy and HTTPS is
+tunnelled through it with ``CONNECT``.
+"""
+
+import base64
+import http.client
+import threading
+import urllib.parse
+import urllib.request
+
+DEFAULT_MAX_IDLE_PER_HOST = 4
+DEFAULT_USER_AGENT = "OpenGOAL-decky-plugin"
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+
+
+class PooledResponse:
+    def __init__(self, pool, key, conn, resp, url):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._resp = resp
+        self.url = url
+        self.status = resp.status
+        self.headers = resp.headers
+
+    def geturl(self):
+        return self.url
+
+    def read(self, amt=None):
+        data = self._resp.read(amt)
+        if self._resp.isclosed():
+            # Body fully consumed, the connection can serve the next request
+            self._release(reusable=not self._resp.will_close)
+        return data
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def close(self):
+        if not self._resp.isclosed() and self._resp.length == 0:
+            # Nothing left to read (e.g. a 304), this marks the response done
+            self._resp.read()
+        # Closing early leaves unread body on the socket, so it can't be reused
+        self._release(reusable=self._resp.isclosed() and not self._resp.will_close)
+
+    def _release(self, reusable):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        self._pool._release(self._key, conn, reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HTTPPool:
+    def __init__(
+        self,
+        ssl_context=None,
+        timeout=30,
+        max_idle_per_host=DEFAULT_MAX_IDLE_PER_HOST,
+        max_redirects=5,
+        user_agent=DEFAULT_USER_AGENT,
+        proxies=None,
+    ):
+        # Either an SSLContext or a callable returning one (created once)
+        self._ssl_context = ssl_context
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.max_redirects = max_redirects
+        self.user_agent = user_agent
+        # {scheme: proxy URL}, read from the environment once like urlopen does
+        self.proxies = urllib.request.getproxies() if proxies is None else proxies
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    @property
+    def ssl_context(self):
+        if callable(self._ssl_context):
+            self._ssl_context = self._ssl_context()
+        return self._ssl_context
+
+    def request(self, method, url, headers=None):
+        headers = dict(headers or {})
+        if not any(name.lower() == "user-agent" for name in headers):
+            headers["User-Agent"] = self.user_agent
+        for _ in range(self.max_redirects + 1):
+            resp = self._send(method, url, headers)
+            if resp.status not in REDIRECT_CODES or not resp.headers.get("Location"):
+                return resp
+            location = urllib.parse.urljoin(url, resp.headers["Location"])
+            # Drain the (tiny) redirect body so its connection goes back to the pool
+            resp.read()
+            resp.close()
+            if resp.status == 303:
+                method = "GET"
+            if (
+                urllib.parse.urlsplit(location).netloc
+                != urllib.parse.urlsplit(url).netloc
+            ):
+                headers.pop("Authorization", None)
+            url = location
+        raise http.client.HTTPException("too many redirects for {}".format(url))
+
+    def get(self, url, headers=None):
+        return self.request("GET", url, headers)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _send(self, method, url, headers):
+        parts = urllib.parse.urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        proxy = self._proxy_for(parts.scheme, parts.hostname)
+        if proxy is not None and parts.scheme == "http":
+            # A plain HTTP proxy takes the absolute URL
+            path = urllib.parse.urlunsplit(parts[:2] + (path, "", ""))
+            headers = dict(headers, **proxy[2])
+        conn, reused = self._acquire(key)
+        try:
+            conn.request(method, path, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection, try a fresh one
+            conn, _ = self._acquire(key, fresh=True)
+            try:
+                conn.request(method, path, headers=headers)
+                resp = conn.getresponse()
+            except Exception:
+                conn.close()
+                raise
+        return PooledResponse(self, key, conn, resp, url)
+
+    def _proxy_for(self, scheme, host):
+        # (host, port, headers) of the proxy to go through, or None
+        proxy = self.proxies.get(scheme)
+        if not proxy or urllib.request.proxy_bypass(host):
+            return None
+        if "://" not in proxy:
+            proxy = "http://" + proxy
+        parts = urllib.parse.urlsplit(proxy)
+        headers = {}
+        if parts.username:
+            credentials = "{}:{}".format(
+                urllib.parse.unquote(parts.username),
+                urllib.parse.unquote(parts.password or ""),
+            )
+            headers["Proxy-Authorization"] = "Basic {}".format(
+                base64.b64encode(credentials.encode("utf-8")).decode("ascii")
+            )
+        return parts.hostname, parts.port or 80, headers
+
+    def _acquire(self, key, fresh=False):
+        if not fresh:
+            with self._lock:
+                idle = self._idle.get(key)
+                if idle:
+                    return idle.pop(), True
+        scheme, host, port = key
+        proxy = self._proxy_for(scheme, host)
+        # Through a proxy the connection is to the proxy, HTTPS tunnels on
+        connect_host, connect_port = (host, port) if proxy is None else proxy[:2]
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(
+                connect_host,
+                connect_port,
+                timeout=self.timeout,
+                context=self.ssl_context,
+            )
+            if proxy is not None:
+                conn.set_tunnel(host, port, headers=proxy[2])
+        else:
+            conn = http.client.HTTPConnection(
+                connect_host, connect_port, timeout=self.timeout
+            )
+        with self._lock:
+            self.connections_opened += 1
+        return conn, False
+
+    def _release(self, key, conn, reusable):
+        if reusable:
+            with self._lock:
+                idle = self._idle.setdefault(key, [])
+                if len(idle) < self.max_idle_per_host:
+                    idle.append(conn)
+                    return
+        conn.close()
@@ -0,0 +1,220 @@
+"""
+Background jobs for long running plugin work (installs, updates, removals).
+
+Work is handed to a thread pool so the decky-loader event loop stays free to
+serve other RPCs. Each job gets an id the frontend can poll for its phase,
+byte progress and ETA, and cancellation is cooperative: the job function is
+expected to call ``job.check_cancelled()`` at convenient points.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+RUNNING = "running"
+QUEUED = "queued"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# How many finished jobs are remembered for status polling
+MAX_FINISHED_JOBS = 32
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobConflict(Exception):
+    # Another kind of job is already queued or running for the same game
+    def __init__(self, job):
+        super().__init__(
+            "{} of {} is already {}".format(job.kind, job.game, job.status)
+        )
+        self.job = job
+
+
+class Job:
+    def __init__(self, kind, game):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.game = game
+        self.status = QUEUED
+        self.phase = None
+        self.bytes_done = 0
+        self.bytes_total = None
+        self.details = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        # (phase, seconds, bytes_done) of every phase that has ended
+        self.phase_history = []
+        self._phase_open = False
+        self._phase_started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def set_phase(self, phase):
+        with self._lock:
+            self._close_phase()
+            self.phase = phase
+            self._phase_open = True
+            self.bytes_done = 0
+            self.bytes_total = None
+            self.details = {}
+            self._phase_started = time.monotonic()
+
+    def end_phase(self):
+        # The current phase stays visible in `to_dict`, it just stops counting
+        with self._lock:
+            self._close_phase()
+
+    def _close_phase(self):
+        if self._phase_open:
+            self.phase_history.append(
+                (self.phase, time.monotonic() - self._phase_started, self.bytes_done)
+            )
+            self._phase_open = False
+
+    def set_progress(self, bytes_done, bytes_total=None):
+        with self._lock:
+            self.bytes_done = bytes_done
+            if bytes_total is not None:
+                self.bytes_total = bytes_total
+
+    def set_details(self, details):
+        # Phase specific structured progress, e.g. the extractor's own phases
+        with self._lock:
+            self.details = details
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def eta(self):
+        # Seconds left in the current phase, based on its average byte rate
+        with self._lock:
+            if not self.bytes_total or not self.bytes_done:
+                return None
+            elapsed = time.monotonic() - self._phase_started
+            rate = self.bytes_done / elapsed if elapsed > 0 else 0
+            if rate <= 0:
+                return None
+            return max(0.0, (self.bytes_total - self.bytes_done) / rate)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "game": self.game,
+            "status": self.status,
+            "phase": self.phase,
+            "bytes_done": self.bytes_done,
+            "bytes_total": self.bytes_total,
+            "eta": self.eta(),
+            "details": self.details,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, max_workers=1, logger=None):
+        # Installs fight over the same disk and CPU, by default run them one
+        # at a time and queue the rest
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="opengoal-job"
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._logger = logger
+
+    def submit(self, kind, game, fn, on_cancel=None):
+        """
+        Run ``fn(job)`` in the background and return the ``Job``. If a job of
+        the same ``kind`` is already queued or running for ``game`` that job is
+        returned instead, a job of any other kind raises ``JobConflict``.
+
+        ``on_cancel(job)`` runs in the worker thread after ``fn`` raised
+        ``JobCancelled``, to clean up whatever was left behind. A job that is
+        cancelled while still queued never started, so it has nothing to
+        clean up and ``on_cancel`` isn't called.
+        """
+        with self._lock:
+            active = self.active_for(game)
+            if active is not None:
+                if active.kind != kind:
+                    raise JobConflict(active)
+                return active
+            job = Job(kind, game)
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, on_cancel)
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is None or job.status not in (QUEUED, RUNNING):
+            return False
+        job.cancel()
+        return True
+
+    def active_for(self, game):
+        for job in list(self._jobs.values()):
+            if job.game == game and job.status in (QUEUED, RUNNING):
+                return job
+        return None
+
+    def shutdown(self):
+        for job in list(self._jobs.values()):
+            job.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job, fn, on_cancel):
+        started = False
+        try:
+            job.check_cancelled()
+            job.status = RUNNING
+            started = True
+            job.result = fn(job)
+            job.status = SUCCEEDED if job.result else FAILED
+        except JobCancelled:
+            # Only flip the status once cleanup is done, so a new job for the
+            # same game can't start while this one is still tidying up
+            if started and on_cancel is not None:
+                try:
+                    on_cancel(job)
+                except Exception:
+                    self._log_error(job, traceback.format_exc())
+            job.status = CANCELLED
+        except Exception:
+            job.status = FAILED
+            job.error = traceback.format_exc()
+            self._log_error(job, job.error)
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        finished = sorted(
+            (j for j in self._jobs.values() if j.finished_at is not None),
+            key=lambda j: j.finished_at,
+        )
+        for job in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job.id]
+
+    def _log_error(self, job, message):
+        if self._logger is not None:
+            self._logger.error(
+                "[job {} {} {}] An exception occurred: {}".format(
+                    job.id, job.kind, job.game, message
+                )
+            )
@@ -0,0 +1,112 @@
+"""
+Call counts, latency histograms and byte counters for the plugin's RPCs and
+install phases.
+
+Each named series is aggregated in place: a ``record`` is a bisect into the
+bucket bounds and a few additions under a lock, nothing is kept per call, so
+it's cheap enough to leave on. ``instrument`` wraps every public coroutine
+method of a class (the ``Plugin`` RPCs) to record under ``rpc.<name>``.
+``snapshot`` is what the ``get_metrics`` RPC returns and ``dump`` writes it
+to a JSON file.
+"""
+
+import bisect
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+
+# Upper bounds of the latency histogram buckets in milliseconds, anything
+# slower lands in a final overflow bucket
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 60000)
+
+
+class _Series:
+    __slots__ = ("calls", "errors", "seconds", "max_seconds", "bytes", "histogram")
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.errors = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.bytes = 0
+        self.histogram = [0] * buckets
+
+
+class Metrics:
+    def __init__(self, buckets_ms=BUCKETS_MS):
+        self.buckets_ms = tuple(buckets_ms)
+        self._bounds = tuple(bound / 1000 for bound in self.buckets_ms)
+        self._series = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def record(self, name, seconds, nbytes=0, error=False):
+        bucket = bisect.bisect_left(self._bounds, seconds)
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = _Series(len(self._bounds) + 1)
+            series.calls += 1
+            series.seconds += seconds
+            if seconds > series.max_seconds:
+                series.max_seconds = seconds
+            series.bytes += nbytes
+            series.histogram[bucket] += 1
+            if error:
+                series.errors += 1
+
+    def instrument(self, cls, prefix="rpc."):
+        """
+        Wrap every public ``async def`` of ``cls`` in place, usable as a class
+        decorator. Methods starting with ``_`` (loader hooks) are left alone.
+        """
+        for name, fn in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.iscoroutinefunction(fn):
+                continue
+            setattr(cls, name, self._wrap_coroutine(prefix + name, fn))
+        return cls
+
+    def _wrap_coroutine(self, name, fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            error = True
+            try:
+                result = await fn(*args, **kwargs)
+                error = False
+                return result
+            finally:
+                self.record(name, time.perf_counter() - started, error=error)
+
+        return wrapper
+
+    def snapshot(self):
+        with self._lock:
+            series = {
+                name: {
+                    "calls": s.calls,
+                    "errors": s.errors,
+                    "total_ms": s.seconds * 1000,
+                    "mean_ms": s.seconds * 1000 / s.calls,
+                    "max_ms": s.max_seconds * 1000,
+                    "bytes": s.bytes,
+                    "histogram": list(s.histogram),
+                }
+                for name, s in self._series.items()
+            }
+        return {
+            "started_at": self.started_at,
+            "uptime": time.time() - self.started_at,
+            "buckets_ms": list(self.buckets_ms),
+            "series": series,
+        }
+
+    def dump(self, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, mode="w") as f:
+            f.write(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
@@ -0,0 +1,90 @@
+"""
+In-memory state snapshot kept warm by a periodic background task.
+
+``PeriodicRefresher`` runs a blocking ``refresh`` function in the default
+executor every ``interval`` seconds from the plugin's ``_main`` task. Failures
+back off exponentially (up to ``max_backoff``) instead of hammering the
+network, and ``trigger()`` asks for an early refresh, e.g. after an install.
+"""
+
+import asyncio
+import threading
+import traceback
+
+DEFAULT_INTERVAL = 60 * 60
+DEFAULT_RETRY_DELAY = 30
+DEFAULT_MAX_BACKOFF = 6 * 60 * 60
+
+
+class Snapshot:
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        return self._values.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._values[key] = value
+
+    def update(self, key, **fields):
+        # Merge into a dict value, creating it if needed
+        with self._lock:
+            value = dict(self._values.get(key) or {})
+            value.update(fields)
+            self._values[key] = value
+
+
+class PeriodicRefresher:
+    def __init__(
+        self,
+        refresh,
+        interval=DEFAULT_INTERVAL,
+        retry_delay=DEFAULT_RETRY_DELAY,
+        max_backoff=DEFAULT_MAX_BACKOFF,
+        logger=None,
+    ):
+        self.refresh = refresh
+        self.interval = interval
+        self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self._logger = logger
+        self._wakeup = None
+        self._loop = None
+        self._stopped = False
+
+    async def run(self):
+        self._wakeup = asyncio.Event()
+        self._loop = loop = asyncio.get_running_loop()
+        while not self._stopped:
+            self._wakeup.clear()
+            try:
+                await loop.run_in_executor(None, self.refresh)
+                self.failures = 0
+                delay = self.interval
+            except Exception:
+                self.failures += 1
+                delay = min(
+                    self.retry_delay * 2 ** (self.failures - 1), self.max_backoff
+                )
+                if self._logger is not None:
+                    self._logger.error(
+                        "[refresh] failed ({} in a row), retrying in {}s: {}".format(
+                            self.failures, delay, traceback.format_exc()
+                        )
+                    )
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def trigger(self):
+        # Safe to call from any thread, a no-op until `run` has started
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    def stop(self):
+        self._stopped = True
+        self.trigger()
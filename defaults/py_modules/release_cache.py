@@ -0,0 +1,167 @@
+"""
+Content-addressed cache for downloaded release assets.
+
+Files are stored once under ``objects/<sha256>`` no matter how many
+(release tag, asset name) keys point at them, and ``index.json`` keeps the
+key -> digest mapping along with the last time each object was used. When the
+cache grows past ``max_bytes`` the least recently used objects are evicted.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+GiB = 1024 * 1024 * 1024
+
+DEFAULT_MAX_BYTES = 1 * GiB
+HASH_READ_SIZE = 1024 * 1024
+
+
+class CacheError(Exception):
+    pass
+
+
+def file_digest(path):
+    sha = hashlib.sha256()
+    with open(path, mode="rb") as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b""):
+            sha.update(block)
+    return "sha256:{}".format(sha.hexdigest())
+
+
+class DigestReader:
+    # Wraps a binary file and hashes whatever is read through it, so a file
+    # that gets read anyway (e.g. to extract it) doesn't need a second pass
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._sha = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self._fileobj.read(size)
+        self._sha.update(data)
+        return data
+
+    def seekable(self):
+        return self._fileobj.seekable()
+
+    def tell(self):
+        return self._fileobj.tell()
+
+    def digest(self):
+        # Whatever the reader stopped short of (e.g. tar padding) still counts
+        for block in iter(lambda: self.read(HASH_READ_SIZE), b""):
+            pass
+        return "sha256:{}".format(self._sha.hexdigest())
+
+
+class ReleaseCache:
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.objects_dir = os.path.join(root, "objects")
+        self.staging_dir = os.path.join(root, "partial")
+        self.index_file = os.path.join(root, "index.json")
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def key(tag, name):
+        return "{}/{}".format(tag, name)
+
+    def staging_path(self, name):
+        # Downloads land here first, partial files survive for resuming
+        os.makedirs(self.staging_dir, exist_ok=True)
+        return os.path.join(self.staging_dir, name)
+
+    def lookup(self, tag, name, digest=None):
+        """
+        Return the cached file for ``tag``/``name`` or ``None``. When
+        ``digest`` (``sha256:<hex>``, as reported by GitHub) is given the entry
+        must also match it.
+        """
+        with self._lock:
+            index = self._read_index()
+            entry = index["entries"].get(self.key(tag, name))
+            if entry is None or (digest and entry["digest"] != digest):
+                return None
+            path = self._object_path(entry["digest"])
+            if not os.path.exists(path):
+                # Deleted from under us, forget about it
+                del index["entries"][self.key(tag, name)]
+                self._write_index(index)
+                return None
+            index["objects"][entry["digest"]]["last_used"] = time.time()
+            self._write_index(index)
+            return path
+
+    def store(self, tag, name, src_path, digest=None, actual_digest=None):
+        """
+        Move ``src_path`` into the cache under ``tag``/``name`` and return the
+        cached path. Raises ``CacheError`` if ``digest`` is given and the file
+        doesn't match it. Pass ``actual_digest`` when the file's digest is
+        already known (see ``DigestReader``) to skip reading it again.
+        """
+        actual = actual_digest or file_digest(src_path)
+        if digest and digest != actual:
+            os.remove(src_path)
+            raise CacheError(
+                "digest mismatch for {}: expected {}, got {}".format(
+                    name, digest, actual
+                )
+            )
+        with self._lock:
+            os.makedirs(self.objects_dir, exist_ok=True)
+            path = self._object_path(actual)
+            if os.path.exists(path):
+                os.remove(src_path)
+            else:
+                os.replace(src_path, path)
+            index = self._read_index()
+            index["entries"][self.key(tag, name)] = {"digest": actual}
+            index["objects"][actual] = {
+                "size": os.path.getsize(path),
+                "last_used": time.time(),
+            }
+            self._evict(index, keep=actual)
+            self._write_index(index)
+            return path
+
+    def _evict(self, index, keep=None):
+        total = sum(o["size"] for o in index["objects"].values())
+        by_age = sorted(index["objects"].items(), key=lambda o: o[1]["last_used"])
+        for digest, obj in by_age:
+            if total <= self.max_bytes:
+                break
+            if digest == keep:
+                continue
+            total -= obj["size"]
+            self._remove_object(index, digest)
+
+    def _remove_object(self, index, digest):
+        path = self._object_path(digest)
+        if os.path.exists(path):
+            os.remove(path)
+        index["objects"].pop(digest, None)
+        for key in [k for k, e in index["entries"].items() if e["digest"] == digest]:
+            del index["entries"][key]
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest.split(":", 1)[-1])
+
+    def _read_index(self):
+        try:
+            with open(self.index_file, mode="r") as f:
+                index = json.load(f)
+            index.setdefault("entries", {})
+            index.setdefault("objects", {})
+            return index
+        except (OSError, ValueError):
+            return {"entries": {}, "objects": {}}
+
+    def _write_index(self, index):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_file = self.index_file + ".tmp"
+        with open(tmp_file, mode="w") as f:
+            f.write(json.dumps(index))
+        os.replace(tmp_file, self.index_file)
@@ -0,0 +1,101 @@
+"""
+Cached client for the GitHub "latest release" endpoint.
+
+The last response is kept in memory and on disk together with its ``ETag``.
+Within ``ttl`` seconds it is served without touching the network, after that
+it is revalidated with ``If-None-Match`` so an unchanged release costs a 304
+(which GitHub doesn't count against the rate limit). Concurrent callers share
+a single in-flight request.
+"""
+
+import http.client
+import json
+import os
+import threading
+import time
+
+from http_pool import HTTPPool
+
+DEFAULT_TTL = 10 * 60
+
+
+class ReleaseClient:
+    def __init__(self, url, cache_file=None, ttl=DEFAULT_TTL, http=None):
+        self.url = url
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.http = http or HTTPPool()
+        self._release = None
+        self._etag = None
+        self._fetched_at = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def latest(self, max_age=None):
+        """
+        Return the latest release JSON, or ``None`` if it isn't available.
+
+        ``max_age`` overrides the TTL for this call, ``0`` always revalidates
+        with GitHub (still a cheap 304 when nothing changed).
+        """
+        max_age = self.ttl if max_age is None else max_age
+        if self._is_fresh(max_age):
+            return self._release
+        with self._lock:
+            # Someone else may have refreshed it while we waited on the lock
+            if self._is_fresh(max_age):
+                return self._release
+            try:
+                self._refresh()
+            except (http.client.HTTPException, OSError, ValueError):
+                # Stale data beats no data, e.g. while offline
+                if self._release is None:
+                    raise
+            return self._release
+
+    def _is_fresh(self, max_age):
+        return self._release is not None and time.time() - self._fetched_at < max_age
+
+    def _refresh(self):
+        headers = {"Accept": "application/vnd.github+json"}
+        if self._etag and self._release is not None:
+            headers["If-None-Match"] = self._etag
+        with self.http.get(self.url, headers) as resp:
+            if resp.status == 200:
+                self._release = json.loads(resp.read().decode("utf-8"))
+                self._etag = resp.headers.get("ETag")
+            elif resp.status != 304:
+                raise http.client.HTTPException(
+                    "unexpected status code from {}: {}".format(self.url, resp.status)
+                )
+        self._fetched_at = time.time()
+        self._save()
+
+    def _load(self):
+        if self.cache_file is None or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, mode="r") as f:
+                cached = json.load(f)
+            self._release = cached["release"]
+            self._etag = cached.get("etag")
+            self._fetched_at = cached.get("fetched_at", 0)
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def _save(self):
+        if self.cache_file is None:
+            return
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        tmp_file = self.cache_file + ".tmp"
+        with open(tmp_file, mode="w") as f:
+            f.write(
+                json.dumps(
+                    {
+                        "etag": self._etag,
+                        "fetched_at": self._fetched_at,
+                        "release": self._release,
+                    }
+                )
+            )
+        os.replace(tmp_file, self.cache_file)
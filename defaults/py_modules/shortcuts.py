@@ -0,0 +1,236 @@
+"""
+Parsed ``shortcuts.vdf`` tables per Steam user, kept until Steam changes them.
+
+Each entry remembers the file's (inode, size, mtime_ns) from before it was
+read, so a lookup costs one ``stat`` until the file is replaced or modified.
+Entries hold the full table and/or just the set of shortcut names, whichever
+was asked for, and ``put`` records what the plugin itself just wrote so its
+own writes don't cause a re-parse. The least recently used users are dropped
+past ``max_entries``.
+
+New shortcuts are added by splicing just their encoded bytes in before the
+file's closing end markers, and every write goes to a temporary file that is
+fsynced and renamed over the original, so a crash never leaves a truncated
+library behind.
+"""
+
+import os
+import stat
+import tempfile
+import threading
+from collections import OrderedDict
+
+from vdf import BIN_END, BIN_NONE, binary_dumps, binary_load, binary_loads, binary_scan
+
+DEFAULT_MAX_ENTRIES = 8
+
+# What a shortcuts.vdf with a single top level "shortcuts" mapping looks like
+_HEADER = BIN_NONE + b"shortcuts" + BIN_NONE
+_TRAILER = BIN_END + BIN_END
+
+
+class ShortcutsChangedError(Exception):
+    pass
+
+
+def _version(st):
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def file_version(path):
+    return _version(os.stat(path))
+
+
+def write_atomic(path, data, expected_version=None, create=False):
+    """
+    Replace ``path`` with ``data`` through a fsynced temporary file. Raises
+    ``ShortcutsChangedError`` instead if the file no longer matches
+    ``expected_version`` (someone else wrote it since it was read), or with
+    ``create`` if it has appeared since it was found missing.
+    """
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=".shortcuts.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if create:
+            os.chmod(tmp_path, 0o644)
+            try:
+                # Unlike a rename, never replaces a file that got there first
+                os.link(tmp_path, path)
+            except FileExistsError:
+                raise ShortcutsChangedError("{} was created concurrently".format(path))
+            os.remove(tmp_path)
+            _fsync_directory(directory)
+            return
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            st = None
+        if st is not None:
+            os.chmod(tmp_path, stat.S_IMODE(st.st_mode))
+        if expected_version is not None and (
+            st is None or _version(st) != expected_version
+        ):
+            raise ShortcutsChangedError("{} was modified concurrently".format(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory):
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def app_names_of(table):
+    return frozenset(
+        shortcut["AppName"]
+        for shortcut in table.get("shortcuts", {}).values()
+        if "AppName" in shortcut
+    )
+
+
+def scan_app_names(path):
+    # Only the names, without building the table
+    with open(path, "rb") as f:
+        return frozenset(
+            value
+            for key_path, key, value in binary_scan(f, "AppName")
+            if len(key_path) == 2 and key_path[0] == "shortcuts"
+        )
+
+
+class _Entry:
+    def __init__(self, path, version, table=None, app_names=None):
+        self.path = path
+        self.version = version
+        self.table = table
+        self.app_names = app_names
+
+
+class ShortcutsCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, owner_id, path):
+        """
+        Return the parsed shortcuts table for ``owner_id``. Shared with other
+        callers, so copy whatever you are going to change.
+        """
+        path = str(path)
+        version = file_version(path)
+        entry = self._valid_entry(owner_id, path, version)
+        if entry is not None and entry.table is not None:
+            return entry.table
+        with open(path, "rb") as f:
+            table = binary_load(f)
+        self._store(owner_id, _Entry(path, version, table=table))
+        return table
+
+    def app_names(self, owner_id, path):
+        """
+        Return the ``AppName`` of every shortcut ``owner_id`` has.
+        """
+        path = str(path)
+        version = file_version(path)
+        entry = self._valid_entry(owner_id, path, version)
+        if entry is not None:
+            if entry.app_names is None:
+                entry.app_names = app_names_of(entry.table)
+            return entry.app_names
+        app_names = scan_app_names(path)
+        self._store(owner_id, _Entry(path, version, app_names=app_names))
+        return app_names
+
+    def add_shortcut(self, owner_id, path, key, shortcut):
+        """
+        Add ``shortcut`` under ``shortcuts/<key>`` and write the file back.
+        """
+        return self.apply(owner_id, path, lambda shortcuts: {key: shortcut})[0]
+
+    def apply(self, owner_id, path, plan):
+        """
+        Change several shortcuts with one read and at most one write.
+
+        ``plan`` gets the current (read-only) ``shortcuts`` mapping and returns
+        ``{key: shortcut}`` changes, where ``None`` removes the key. Returns the
+        new table and the changes. When the changes only add new keys they
+        are spliced into the existing bytes, anything else rewrites the table.
+        A missing file is treated as empty and created.
+        """
+        path = str(path)
+        try:
+            with open(path, "rb") as f:
+                version = _version(os.fstat(f.fileno()))
+                data = f.read()
+        except FileNotFoundError:
+            version, data = None, b""
+        entry = self._valid_entry(owner_id, path, version)
+        if entry is not None and entry.table is not None:
+            table = entry.table
+        else:
+            table = binary_loads(data, raise_on_remaining=False)
+
+        shortcuts = table.get("shortcuts", {})
+        changes = plan(shortcuts)
+        if not changes:
+            return table, changes
+
+        new_table = dict(table)
+        new_table["shortcuts"] = new_shortcuts = dict(shortcuts)
+        for key, shortcut in changes.items():
+            if shortcut is None:
+                new_shortcuts.pop(key, None)
+            else:
+                new_shortcuts[key] = shortcut
+        if (
+            list(table) == ["shortcuts"]
+            and all(
+                shortcut is not None and key not in shortcuts
+                for key, shortcut in changes.items()
+            )
+            and data.startswith(_HEADER)
+            and data.endswith(_TRAILER)
+        ):
+            # The changes encode as their entries followed by the root's end
+            # marker, drop that and splice the entries in before the trailer
+            encoded = binary_dumps(changes)[:-1]
+            data = b"".join((data[: -len(_TRAILER)], encoded, _TRAILER))
+        else:
+            data = binary_dumps(new_table)
+        write_atomic(path, data, expected_version=version, create=version is None)
+        self.put(owner_id, path, new_table)
+        return new_table, changes
+
+    def put(self, owner_id, path, table):
+        # Call right after writing `table` to `path`
+        path = str(path)
+        self._store(owner_id, _Entry(path, file_version(path), table=table))
+
+    def _valid_entry(self, owner_id, path, version):
+        with self._lock:
+            entry = self._entries.get(owner_id)
+            if entry is None or entry.path != path or entry.version != version:
+                return None
+            self._entries.move_to_end(owner_id)
+            return entry
+
+    def _store(self, owner_id, entry):
+        with self._lock:
+            self._entries.pop(owner_id, None)
+            self._entries[owner_id] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
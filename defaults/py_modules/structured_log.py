@@ -0,0 +1,100 @@
+"""
+Level-gated ``event key=value`` logging on top of a standard ``Logger``.
+
+Nothing is formatted unless the level is enabled, and a field given as a
+zero-argument function is only called then. Containers are sampled before
+they're rendered, at most ``max_items`` entries per level and ``max_depth``
+levels deep, and every rendered value is cut off at ``max_chars``, so logging
+a whole shortcuts table costs the same whatever the size of the library.
+"""
+
+import json
+import logging
+from collections.abc import Mapping
+
+DEFAULT_MAX_CHARS = 1000
+DEFAULT_MAX_ITEMS = 10
+DEFAULT_MAX_DEPTH = 3
+
+
+def _is_plain(text):
+    return text != "" and not any(c.isspace() or c in "\"'=" for c in text)
+
+
+class StructuredLogger:
+    def __init__(
+        self,
+        logger,
+        max_chars=DEFAULT_MAX_CHARS,
+        max_items=DEFAULT_MAX_ITEMS,
+        max_depth=DEFAULT_MAX_DEPTH,
+    ):
+        self.logger = logger
+        self.max_chars = max_chars
+        self.max_items = max_items
+        self.max_depth = max_depth
+
+    def debug(self, event, **fields):
+        self.log(logging.DEBUG, event, **fields)
+
+    def info(self, event, **fields):
+        self.log(logging.INFO, event, **fields)
+
+    def warning(self, event, **fields):
+        self.log(logging.WARNING, event, **fields)
+
+    def error(self, event, **fields):
+        self.log(logging.ERROR, event, **fields)
+
+    def log(self, level, event, **fields):
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, self.format(event, fields))
+
+    def format(self, event, fields):
+        parts = [event]
+        for key, value in fields.items():
+            if callable(value) and not isinstance(value, type):
+                value = value()
+            parts.append("{}={}".format(key, self.render(value)))
+        return " ".join(parts)
+
+    def render(self, value):
+        if isinstance(value, str):
+            text = value if _is_plain(value) else json.dumps(value, ensure_ascii=False)
+        elif value is None or isinstance(value, (bool, int, float)):
+            text = str(value)
+        else:
+            text = json.dumps(self._sample(value, 0), ensure_ascii=False, default=str)
+        if len(text) > self.max_chars:
+            text = "{}...<{} more chars>".format(
+                text[: self.max_chars], len(text) - self.max_chars
+            )
+        return text
+
+    def _sample(self, value, depth):
+        # A bounded copy of `value`, with a marker for whatever was left out
+        if isinstance(value, Mapping):
+            if depth >= self.max_depth:
+                return "<{} keys>".format(len(value))
+            sample = {}
+            for i, (key, item) in enumerate(value.items()):
+                if i == self.max_items:
+                    sample["..."] = "{} more".format(len(value) - i)
+                    break
+                sample[str(key)] = self._sample(item, depth + 1)
+            return sample
+        if isinstance(value, (list, tuple, set, frozenset)):
+            if depth >= self.max_depth:
+                return "<{} items>".format(len(value))
+            sample = []
+            for i, item in enumerate(value):
+                if i == self.max_items:
+                    sample.append("... {} more".format(len(value) - i))
+                    break
+                sample.append(self._sample(item, depth + 1))
+            return sample
+        if isinstance(value, str) and len(value) > self.max_chars:
+            return "{}...<{} more chars>".format(
+                value[: self.max_chars], len(value) - self.max_chars
+            )
+        return value
@@ -4,6 +4,7 @@ Module for deserializing/serializing to and from VDF
 __version__ = "3.4"
 __author__ = "Rossen Georgiev"
 
+import mmap
 import re
 import sys
 import struct
@@ -12,9 +13,9 @@ from io import BytesIO
 from io import StringIO as unicodeIO
 
 try:
-    from collections.abc import Mapping
+    from collections.abc import Mapping, MutableMapping
 except:
-    from collections import Mapping
+    from collections import Mapping, MutableMapping
 
 # Py2 & Py3 compatibility
 if sys.version_info[0] >= 3:
@@ -56,13 +57,34 @@ def _re_escape_match(m):
 def _re_unescape_match(m):
     return _unescape_char_map[m.group()]
 
+_re_escape = re.compile(r"[\n\t\v\b\r\f\a\\\?\"']")
+
 def _escape(text):
-    return re.sub(r"[\n\t\v\b\r\f\a\\\?\"']", _re_escape_match, text)
+    # one scan to find out if there is anything to escape at all
+    if _re_escape.search(text) is None:
+        return text
+    return _re_escape.sub(_re_escape_match, text)
+
+_re_unescape = re.compile(r"(\\n|\\t|\\v|\\b|\\r|\\f|\\a|\\\\|\\\?|\\\"|\\')")
 
 def _unescape(text):
-    return re.sub(r"(\\n|\\t|\\v|\\b|\\r|\\f|\\a|\\\\|\\\?|\\\"|\\')", _re_unescape_match, text)
+    # most keys and values have nothing to unescape
+    if '\\' not in text:
+        return text
+    return _re_unescape.sub(_re_unescape_match, text)
 
 # parsing and dumping for KV1
+# leading whitespace, then either a line to skip past or a key with its value
+_re_token = re.compile(r'\s*(?:(?P<skip>[/{}])|'
+                       r'("(?P<qkey>[^\\"]*(?:\\.[^\\"]*)*)"|(?P<key>#?[a-z0-9\-\_\\\?$%<>]+))'
+                       r'([ \t]*('
+                       r'"(?P<qval>[^\\"]*(?:\\.[^\\"]*)*)(?P<vq_end>")?'
+                       r'|(?P<val>(?:(?<!/)/(?!/)|[a-z0-9\-\_\\\?\*\.$<> ])+)'
+                       r'|(?P<sblock>{[ \t]*)(?P<eblock>})?'
+                       r'))?)',
+                       flags=re.I)
+_re_whitespace = re.compile(r'\s*')
+
 def parse(fp, mapper=dict, merge_duplicate_keys=True, escaped=True):
     """
     Deserialize ``s`` (a ``str`` or ``unicode`` instance containing a VDF)
@@ -81,106 +103,101 @@ def parse(fp, mapper=dict, merge_duplicate_keys=True, escaped=True):
     if not hasattr(fp, 'readline'):
         raise TypeError("Expected fp to be a file-like object supporting line iteration")
 
-    stack = [mapper()]
-    expect_bracket = False
-
-    re_keyvalue = re.compile(r'^("(?P<qkey>(?:\\.|[^\\"])*)"|(?P<key>#?[a-z0-9\-\_\\\?$%<>]+))'
-                             r'([ \t]*('
-                             r'"(?P<qval>(?:\\.|[^\\"])*)(?P<vq_end>")?'
-                             r'|(?P<val>(?:(?<!/)/(?!/)|[a-z0-9\-\_\\\?\*\.$<> ])+)'
-                             r'|(?P<sblock>{[ \t]*)(?P<eblock>})?'
-                             r'))?',
-                             flags=re.I)
-
-    for lineno, line in enumerate(fp, 1):
-        if lineno == 1:
-            line = strip_bom(line)
+    text = fp.read() if hasattr(fp, 'read') else ''.join(fp)
+    name = getattr(fp, 'name', '<%s>' % fp.__class__.__name__)
 
-        line = line.lstrip()
+    return _parse_text(text, mapper, merge_duplicate_keys, escaped, name)
 
-        # skip empty and comment lines
-        if line == "" or line[0] == '/':
-            continue
+def _parse_text(text, mapper, merge_duplicate_keys, escaped, name):
+    # Walks the whole text once. Tokens are matched in place, so a quoted
+    # string spanning lines is scanned once instead of being re-matched
+    # every time another line is appended to it. Like the line based parser
+    # this replaced, anything after a token on the same line is ignored.
+    stack = [mapper()]
+    expect_bracket = False
 
-        # one level deeper
-        if line[0] == "{":
-            expect_bracket = False
+    match_token = _re_token.match
+    find = text.find
+    size = len(text)
+
+    pos = 0
+    while pos < size and text[pos] in BOMS:
+        pos += 1
+
+    def error(msg, line_start, offset):
+        lineno = text.count('\n', 0, line_start) + 1
+        end = find('\n', line_start)
+        line = text[line_start:] if end == -1 else text[line_start:end + 1]
+        return SyntaxError(msg, (name, lineno, offset, line))
+
+    while True:
+        match = match_token(text, pos)
+        if match is None:
+            pos = _re_whitespace.match(text, pos).end()
+            if pos >= size:
+                break
+            if expect_bracket:
+                raise error("vdf.parse: expected openning bracket", pos, 1)
+            raise error("vdf.parse: unexpected EOF (open key quote?)", pos, 0)
+
+        skip, _, qkey, key, _, _, val, vq_end, unquoted_val, sblock, eblock = match.groups()
+
+        # skip comment lines, and whatever follows a bracket
+        if skip is not None:
+            if skip == '{':
+                expect_bracket = False
+            elif skip == '}':
+                if expect_bracket:
+                    raise error("vdf.parse: expected openning bracket", match.start('skip'), 1)
+                if len(stack) > 1:
+                    stack.pop()
+                else:
+                    raise error("vdf.parse: one too many closing parenthasis", match.start('skip'), 0)
+            end = find('\n', match.end())
+            pos = size if end == -1 else end
             continue
 
         if expect_bracket:
-            raise SyntaxError("vdf.parse: expected openning bracket",
-                              (getattr(fp, 'name', '<%s>' % fp.__class__.__name__), lineno, 1, line))
+            raise error("vdf.parse: expected openning bracket", match.start(2), 1)
 
-        # one level back
-        if line[0] == "}":
-            if len(stack) > 1:
-                stack.pop()
-                continue
-
-            raise SyntaxError("vdf.parse: one too many closing parenthasis",
-                              (getattr(fp, 'name', '<%s>' % fp.__class__.__name__), lineno, 0, line))
-
-        # parse keyvalue pairs
-        while True:
-            match = re_keyvalue.match(line)
-
-            if not match:
-                try:
-                    line += next(fp)
-                    continue
-                except StopIteration:
-                    raise SyntaxError("vdf.parse: unexpected EOF (open key quote?)",
-                                      (getattr(fp, 'name', '<%s>' % fp.__class__.__name__), lineno, 0, line))
-
-            key = match.group('key') if match.group('qkey') is None else match.group('qkey')
-            val = match.group('qval')
-            if val is None:
-                val = match.group('val')
-                if val is not None:
-                    val = val.rstrip()
-                    if val == "":
-                        val = None
-
-            if escaped:
-                key = _unescape(key)
-
-            # we have a key with value in parenthesis, so we make a new dict obj (level deeper)
-            if val is None:
-                if merge_duplicate_keys and key in stack[-1]:
-                    _m = stack[-1][key]
-                    # we've descended a level deeper, if value is str, we have to overwrite it to mapper
-                    if not isinstance(_m, mapper):
-                        _m = stack[-1][key] = mapper()
-                else:
-                    _m = mapper()
-                    stack[-1][key] = _m
+        if qkey is not None:
+            key = qkey
+        if val is None:
+            if unquoted_val is not None:
+                val = unquoted_val.rstrip() or None
+        elif vq_end is None:
+            raise error("vdf.parse: unexpected EOF (open quote for value?)", match.start(2), 0)
 
-                if match.group('eblock') is None:
-                    # only expect a bracket if it's not already closed or on the same line
-                    stack.append(_m)
-                    if match.group('sblock') is None:
-                        expect_bracket = True
+        if escaped:
+            key = _unescape(key)
 
-            # we've matched a simple keyvalue pair, map it to the last dict obj in the stack
+        # we have a key with value in parenthesis, so we make a new dict obj (level deeper)
+        if val is None:
+            if merge_duplicate_keys and key in stack[-1]:
+                _m = stack[-1][key]
+                # we've descended a level deeper, if value is str, we have to overwrite it to mapper
+                if not isinstance(_m, mapper):
+                    _m = stack[-1][key] = mapper()
             else:
-                # if the value is line consume one more line and try to match again,
-                # until we get the KeyValue pair
-                if match.group('vq_end') is None and match.group('qval') is not None:
-                    try:
-                        line += next(fp)
-                        continue
-                    except StopIteration:
-                        raise SyntaxError("vdf.parse: unexpected EOF (open quote for value?)",
-                                          (getattr(fp, 'name', '<%s>' % fp.__class__.__name__), lineno, 0, line))
-
-                stack[-1][key] = _unescape(val) if escaped else val
-
-            # exit the loop
-            break
+                _m = mapper()
+                stack[-1][key] = _m
+
+            if eblock is None:
+                # only expect a bracket if it's not already closed or on the same line
+                stack.append(_m)
+                if sblock is None:
+                    expect_bracket = True
+
+        # we've matched a simple keyvalue pair, map it to the last dict obj in the stack
+        else:
+            stack[-1][key] = _unescape(val) if escaped else val
+
+        # the rest of the line is ignored
+        end = find('\n', match.end())
+        pos = size if end == -1 else end
 
     if len(stack) != 1:
-        raise SyntaxError("vdf.parse: unclosed parenthasis or quotes (EOF)",
-                           (getattr(fp, 'name', '<%s>' % fp.__class__.__name__), lineno, 0, line))
+        raise error("vdf.parse: unclosed parenthasis or quotes (EOF)", size, 0)
 
     return stack.pop()
 
@@ -220,7 +237,9 @@ def dumps(obj, pretty=False, escaped=True):
     if not isinstance(escaped, bool):
         raise TypeError("Expected escaped to be of type bool")
 
-    return ''.join(_dump_gen(obj, pretty, escaped))
+    parts = []
+    _dump_into(parts, obj, pretty, escaped)
+    return ''.join(parts)
 
 
 def dump(obj, fp, pretty=False, escaped=True):
@@ -237,49 +256,165 @@ def dump(obj, fp, pretty=False, escaped=True):
     if not isinstance(escaped, bool):
         raise TypeError("Expected escaped to be of type bool")
 
-    for chunk in _dump_gen(obj, pretty, escaped):
-        fp.write(chunk)
-
+    # built in memory and handed over in a single write
+    parts = []
+    _dump_into(parts, obj, pretty, escaped)
+    fp.write(''.join(parts))
 
-def _dump_gen(data, pretty=False, escaped=True, level=0):
-    indent = "\t"
-    line_indent = ""
 
-    if pretty:
-        line_indent = indent * level
+def _dump_into(parts, data, pretty=False, escaped=True, level=0):
+    append = parts.append
+    line_indent = "\t" * level if pretty else ""
 
     for key, value in data.items():
         if escaped and isinstance(key, string_type):
             key = _escape(key)
 
         if isinstance(value, Mapping):
-            yield '%s"%s"\n%s{\n' % (line_indent, key, line_indent)
-            for chunk in _dump_gen(value, pretty, escaped, level+1):
-                yield chunk
-            yield "%s}\n" % line_indent
+            append('%s"%s"\n%s{\n' % (line_indent, key, line_indent))
+            _dump_into(parts, value, pretty, escaped, level + 1)
+            append("%s}\n" % line_indent)
         else:
             if escaped and isinstance(value, string_type):
                 value = _escape(value)
 
-            yield '%s"%s" "%s"\n' % (line_indent, key, value)
+            append('%s"%s" "%s"\n' % (line_indent, key, value))
 
 
 # binary VDF
 class BASE_INT(int_type):
+    # no per-instance __dict__, these are just tagged ints
+    __slots__ = ()
+
     def __repr__(self):
         return "%s(%d)" % (self.__class__.__name__, self)
 
 class UINT_64(BASE_INT):
-    pass
+    __slots__ = ()
 
 class INT_64(BASE_INT):
-    pass
+    __slots__ = ()
 
 class POINTER(BASE_INT):
-    pass
+    __slots__ = ()
 
 class COLOR(BASE_INT):
-    pass
+    __slots__ = ()
+
+
+# compact mapper
+COMPACT_MAX_KEYS = 64
+# shapes are shared by every parse and never freed, past this many new key
+# sets get a plain dict instead of growing the tree any further
+COMPACT_MAX_SHAPES = 4096
+
+class _Shape(object):
+    """
+    An ordered tuple of keys shared by every ``CompactMapping`` that was
+    built by adding the same keys in the same order.
+    """
+    __slots__ = ('keys', 'index', 'transitions')
+
+    count = 0
+
+    def __init__(self, keys):
+        self.keys = keys
+        self.index = dict((key, i) for i, key in enumerate(keys))
+        self.transitions = {}
+
+    def add(self, key):
+        """
+        Return the shape with ``key`` appended, or ``None`` once
+        ``COMPACT_MAX_SHAPES`` shapes exist and it would need a new one.
+        """
+        shape = self.transitions.get(key)
+        if shape is None:
+            if _Shape.count >= COMPACT_MAX_SHAPES:
+                return None
+            _Shape.count += 1
+            if type(key) is str:
+                key = sys.intern(key)
+            shape = self.transitions[key] = _Shape(self.keys + (key,))
+        return shape
+
+_EMPTY_SHAPE = _Shape(())
+
+class CompactMapping(MutableMapping):
+    """
+    A memory-lean ``mapper`` for large trees, e.g. ``binary_load(fp, mapper=CompactMapping)``.
+
+    Mappings with the same keys share one interned key table (their "shape"),
+    and each instance only holds a list of values. Mappings that grow past
+    ``COMPACT_MAX_KEYS`` keys (like the list of all shortcuts) fall back to a
+    plain ``dict``, so shapes don't pile up for one-off key sets, and so do
+    new key sets once ``COMPACT_MAX_SHAPES`` shapes have been created.
+    """
+    __slots__ = ('_shape', '_values')
+
+    def __init__(self, *args, **kwargs):
+        self._shape = _EMPTY_SHAPE
+        self._values = []
+        if args or kwargs:
+            self.update(*args, **kwargs)
+
+    def __getitem__(self, key):
+        shape = self._shape
+        if shape is None:
+            return self._values[key]
+        try:
+            return self._values[shape.index[key]]
+        except KeyError:
+            raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        shape = self._shape
+        if shape is None:
+            self._values[key] = value
+            return
+        i = shape.index.get(key)
+        if i is not None:
+            self._values[i] = value
+            return
+        new_shape = shape.add(key) if len(shape.keys) < COMPACT_MAX_KEYS else None
+        if new_shape is None:
+            self._values = dict(zip(shape.keys, self._values))
+            self._values[key] = value
+            self._shape = None
+        else:
+            self._shape = new_shape
+            self._values.append(value)
+
+    def __delitem__(self, key):
+        shape = self._shape
+        if shape is None:
+            del self._values[key]
+            return
+        i = shape.index[key]
+        del self._values[i]
+        keys = shape.keys[:i] + shape.keys[i + 1:]
+        new_shape = _EMPTY_SHAPE
+        for other in keys:
+            new_shape = new_shape.add(other)
+            if new_shape is None:
+                self._values = dict(zip(keys, self._values))
+                break
+        self._shape = new_shape
+
+    def __contains__(self, key):
+        shape = self._shape
+        if shape is None:
+            return key in self._values
+        return key in shape.index
+
+    def __iter__(self):
+        shape = self._shape
+        return iter(self._values if shape is None else shape.keys)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, dict(self.items()))
 
 BIN_NONE        = b'\x00'
 BIN_STRING      = b'\x01'
@@ -308,8 +443,10 @@ def binary_loads(b, mapper=dict, merge_duplicate_keys=True, alt_format=False, ra
     """
     if not isinstance(b, bytes):
         raise TypeError("Expected s to be bytes, got %s" % type(b))
+    if not issubclass(mapper, Mapping):
+        raise TypeError("Expected mapper to be subclass of dict, got %s" % type(mapper))
 
-    return binary_load(BytesIO(b), mapper, merge_duplicate_keys, alt_format, raise_on_remaining)
+    return _binary_parse(b, 0, mapper, merge_duplicate_keys, alt_format, raise_on_remaining)[0]
 
 def binary_load(fp, mapper=dict, merge_duplicate_keys=True, alt_format=False, raise_on_remaining=False):
     """
@@ -329,95 +466,245 @@ def binary_load(fp, mapper=dict, merge_duplicate_keys=True, alt_format=False, ra
     if not issubclass(mapper, Mapping):
         raise TypeError("Expected mapper to be subclass of dict, got %s" % type(mapper))
 
-    # helpers
-    int32 = struct.Struct('<i')
-    uint64 = struct.Struct('<Q')
-    int64 = struct.Struct('<q')
-    float32 = struct.Struct('<f')
-
-    def read_string(fp, wide=False):
-        buf, end = b'', -1
-        offset = fp.tell()
-
-        # locate string end
-        while end == -1:
-            chunk = fp.read(64)
-
-            if chunk == b'':
-                raise SyntaxError("Unterminated cstring (offset: %d)" % offset)
-
-            buf += chunk
-            end = buf.find(b'\x00\x00' if wide else b'\x00')
-
-        if wide:
-            end += end % 2
-
-        # rewind fp
-        fp.seek(end - len(buf) + (2 if wide else 1), 1)
-
-        # decode string
-        result = buf[:end]
-
-        if wide:
-            result = result.decode('utf-16')
-        elif bytes is not str:
-            result = result.decode('utf-8', 'replace')
-        else:
-            try:
-                result.decode('ascii')
-            except:
-                result = result.decode('utf-8', 'replace')
+    # read the rest of the file once and parse it in memory, then leave fp
+    # right after the data that was consumed
+    start = fp.tell()
+    data = fp.read()
+    try:
+        result, end = _binary_parse(data, 0, mapper, merge_duplicate_keys, alt_format,
+                                    raise_on_remaining, base_offset=start)
+    except Exception:
+        fp.seek(start)
+        raise
+    fp.seek(start + end)
+
+    return result
+
+_INT32 = struct.Struct('<i')
+_UINT32 = struct.Struct('<I')
+_UINT64 = struct.Struct('<Q')
+_INT64 = struct.Struct('<q')
+_FLOAT32 = struct.Struct('<f')
+
+def _binary_parse(buf, pos, mapper, merge_duplicate_keys, alt_format, raise_on_remaining, base_offset=0):
+    """
+    Parse binary VDF from ``buf`` (``bytes`` or an ``mmap``) starting
+    at ``pos``. Returns the parsed object and the offset right after it.
 
-        return result
+    The input is walked by offset instead of through file reads, strings are
+    located with ``find`` and numbers read in place with ``unpack_from``.
+    """
+    int32_unpack = _INT32.unpack_from
+    uint64_unpack = _UINT64.unpack_from
+    int64_unpack = _INT64.unpack_from
+    float32_unpack = _FLOAT32.unpack_from
+    find = buf.find
+    size = len(buf)
+
+    t_none = BIN_NONE[0]
+    t_string = BIN_STRING[0]
+    t_widestring = BIN_WIDESTRING[0]
+    t_int32 = BIN_INT32[0]
+    t_pointer = BIN_POINTER[0]
+    t_color = BIN_COLOR[0]
+    t_uint64 = BIN_UINT64[0]
+    t_int64 = BIN_INT64[0]
+    t_float32 = BIN_FLOAT32[0]
+    t_end = (BIN_END if not alt_format else BIN_END_ALT)[0]
 
     stack = [mapper()]
-    CURRENT_BIN_END = BIN_END if not alt_format else BIN_END_ALT
+    current = stack[-1]
 
-    for t in iter(lambda: fp.read(1), b''):
-        if t == CURRENT_BIN_END:
+    while pos < size:
+        t = buf[pos]
+        pos += 1
+
+        if t == t_end:
             if len(stack) > 1:
                 stack.pop()
+                current = stack[-1]
                 continue
             break
 
-        key = read_string(fp)
-
-        if t == BIN_NONE:
-            if merge_duplicate_keys and key in stack[-1]:
-                _m = stack[-1][key]
+        end = find(b'\x00', pos)
+        if end == -1:
+            raise SyntaxError("Unterminated cstring (offset: %d)" % (base_offset + pos))
+        key = buf[pos:end].decode('utf-8', 'replace')
+        pos = end + 1
+
+        if t == t_string:
+            end = find(b'\x00', pos)
+            if end == -1:
+                raise SyntaxError("Unterminated cstring (offset: %d)" % (base_offset + pos))
+            current[key] = buf[pos:end].decode('utf-8', 'replace')
+            pos = end + 1
+        elif t == t_int32:
+            current[key] = int32_unpack(buf, pos)[0]
+            pos += 4
+        elif t == t_none:
+            if merge_duplicate_keys and key in current:
+                _m = current[key]
             else:
                 _m = mapper()
-                stack[-1][key] = _m
+                current[key] = _m
             stack.append(_m)
-        elif t == BIN_STRING:
-            stack[-1][key] = read_string(fp)
-        elif t == BIN_WIDESTRING:
-            stack[-1][key] = read_string(fp, wide=True)
-        elif t in (BIN_INT32, BIN_POINTER, BIN_COLOR):
-            val = int32.unpack(fp.read(int32.size))[0]
-
-            if t == BIN_POINTER:
-                val = POINTER(val)
-            elif t == BIN_COLOR:
-                val = COLOR(val)
-
-            stack[-1][key] = val
-        elif t == BIN_UINT64:
-            stack[-1][key] = UINT_64(uint64.unpack(fp.read(int64.size))[0])
-        elif t == BIN_INT64:
-            stack[-1][key] = INT_64(int64.unpack(fp.read(int64.size))[0])
-        elif t == BIN_FLOAT32:
-            stack[-1][key] = float32.unpack(fp.read(float32.size))[0]
+            current = _m
+        elif t == t_widestring:
+            end = find(b'\x00\x00', pos)
+            if end == -1:
+                raise SyntaxError("Unterminated cstring (offset: %d)" % (base_offset + pos))
+            end += (end - pos) % 2
+            current[key] = buf[pos:end].decode('utf-16')
+            pos = end + 2
+        elif t == t_pointer:
+            current[key] = POINTER(int32_unpack(buf, pos)[0])
+            pos += 4
+        elif t == t_color:
+            current[key] = COLOR(int32_unpack(buf, pos)[0])
+            pos += 4
+        elif t == t_uint64:
+            current[key] = UINT_64(uint64_unpack(buf, pos)[0])
+            pos += 8
+        elif t == t_int64:
+            current[key] = INT_64(int64_unpack(buf, pos)[0])
+            pos += 8
+        elif t == t_float32:
+            current[key] = float32_unpack(buf, pos)[0]
+            pos += 4
         else:
-            raise SyntaxError("Unknown data type at offset %d: %s" % (fp.tell() - 1, repr(t)))
+            raise SyntaxError("Unknown data type at offset %d: %s" % (base_offset + pos - 1, repr(bytes([t]))))
 
     if len(stack) != 1:
         raise SyntaxError("Reached EOF, but Binary VDF is incomplete")
-    if raise_on_remaining and fp.read(1) != b'':
-        fp.seek(-1, 1)
-        raise SyntaxError("Binary VDF ended at offset %d, but there is more data remaining" % (fp.tell() - 1))
+    if raise_on_remaining and pos < size:
+        raise SyntaxError("Binary VDF ended at offset %d, but there is more data remaining" % (base_offset + pos - 1))
 
-    return stack.pop()
+    return stack[0], pos
+
+def binary_iter(fp, alt_format=False):
+    """
+    Iterate over a binary VDF without building any mappings, yielding
+    ``(path, type, key, value)`` events.
+
+    ``fp`` is ``bytes`` or a binary file-like object, which is read from its
+    current position. ``path`` is a tuple of the keys of the enclosing
+    mappings and ``type`` one of the ``BIN_*`` constants. A nested mapping is
+    announced with ``BIN_NONE`` (value ``None``), followed by its contents and
+    a matching ``BIN_END`` event with the same path and key.
+    """
+    return _binary_source_events(fp, alt_format, None)
+
+def binary_scan(fp, keys, alt_format=False):
+    """
+    Yield ``(path, key, value)`` for every field named in ``keys``, skipping
+    over everything else without decoding it. Stop iterating as soon as you
+    have what you need, the rest of the input is never looked at.
+    """
+    if isinstance(keys, string_type):
+        keys = (keys,)
+    wanted = frozenset(key.encode('utf-8') for key in keys)
+
+    for path, t, key, value in _binary_source_events(fp, alt_format, wanted):
+        yield path, key, value
+
+def _binary_source_events(fp, alt_format, wanted):
+    # files are read rather than mapped, Steam rewrites shortcuts.vdf in place
+    # and a mapping of a file that shrinks underneath it dies with SIGBUS
+    buf = fp if isinstance(fp, bytes) else fp.read()
+    return _binary_events(buf, 0, alt_format, wanted)
+
+def _binary_events(buf, pos, alt_format, wanted):
+    # ``wanted`` is a set of encoded keys, when given only those leaf fields
+    # are decoded and yielded
+    int32_unpack = _INT32.unpack_from
+    uint64_unpack = _UINT64.unpack_from
+    int64_unpack = _INT64.unpack_from
+    float32_unpack = _FLOAT32.unpack_from
+    find = buf.find
+    size = len(buf)
+    everything = wanted is None
+
+    t_none = BIN_NONE[0]
+    t_string = BIN_STRING[0]
+    t_widestring = BIN_WIDESTRING[0]
+    t_int32 = BIN_INT32[0]
+    t_pointer = BIN_POINTER[0]
+    t_color = BIN_COLOR[0]
+    t_uint64 = BIN_UINT64[0]
+    t_int64 = BIN_INT64[0]
+    t_float32 = BIN_FLOAT32[0]
+    t_end = (BIN_END if not alt_format else BIN_END_ALT)[0]
+
+    path = ()
+    parents = []
+
+    while pos < size:
+        t = buf[pos]
+        pos += 1
+
+        if t == t_end:
+            if not parents:
+                return
+            parent_path = path
+            path = parents.pop()
+            if everything:
+                yield path, BIN_END, parent_path[-1], None
+            continue
+
+        end = find(b'\x00', pos)
+        if end == -1:
+            raise SyntaxError("Unterminated cstring (offset: %d)" % pos)
+        raw_key = buf[pos:end]
+        pos = end + 1
+
+        if t == t_none:
+            key = raw_key.decode('utf-8', 'replace')
+            if everything:
+                yield path, BIN_NONE, key, None
+            parents.append(path)
+            path = path + (key,)
+            continue
+
+        if t == t_string or t == t_widestring:
+            end = find(b'\x00' if t == t_string else b'\x00\x00', pos)
+            if end == -1:
+                raise SyntaxError("Unterminated cstring (offset: %d)" % pos)
+            if t == t_widestring:
+                end += (end - pos) % 2
+            start, pos = pos, end + (1 if t == t_string else 2)
+            if not everything and raw_key not in wanted:
+                continue
+            if t == t_string:
+                value = buf[start:end].decode('utf-8', 'replace')
+            else:
+                value = buf[start:end].decode('utf-16')
+        elif t == t_int32 or t == t_pointer or t == t_color or t == t_float32:
+            start, pos = pos, pos + 4
+            if not everything and raw_key not in wanted:
+                continue
+            if t == t_float32:
+                value = float32_unpack(buf, start)[0]
+            else:
+                value = int32_unpack(buf, start)[0]
+                if t == t_pointer:
+                    value = POINTER(value)
+                elif t == t_color:
+                    value = COLOR(value)
+        elif t == t_uint64 or t == t_int64:
+            start, pos = pos, pos + 8
+            if not everything and raw_key not in wanted:
+                continue
+            if t == t_uint64:
+                value = UINT_64(uint64_unpack(buf, start)[0])
+            else:
+                value = INT_64(int64_unpack(buf, start)[0])
+        else:
+            raise SyntaxError("Unknown data type at offset %d: %s" % (pos - 1, repr(bytes([t]))))
+
+        yield path, bytes([t]), raw_key.decode('utf-8', 'replace'), value
+
+    if parents:
+        raise SyntaxError("Reached EOF, but Binary VDF is incomplete")
 
 def binary_dumps(obj, alt_format=False):
     """
@@ -491,6 +778,9 @@ def vbkv_loads(s, mapper=dict, merge_duplicate_keys=True):
     """
     Deserialize ``s`` (``bytes`` containing a VBKV to a Python object.
 
+    ``s`` can also be a ``bytearray``, ``memoryview`` or ``mmap``. The checksum
+    and the payload are read in place, without copying the payload out.
+
     ``mapper`` specifies the Python object used after deserializetion. ``dict` is
     used by default. Alternatively, ``collections.OrderedDict`` can be used if you
     wish to preserve key order. Or any object that acts like a ``dict``.
@@ -499,15 +789,49 @@ def vbkv_loads(s, mapper=dict, merge_duplicate_keys=True):
     same key into one instead of overwriting. You can se this to ``False`` if you are
     using ``VDFDict`` and need to preserve the duplicates.
     """
-    if s[:4] != b'VBKV':
+    if not issubclass(mapper, Mapping):
+        raise TypeError("Expected mapper to be subclass of dict, got %s" % type(mapper))
+
+    if isinstance(s, memoryview):
+        # the parser needs find(), which views don't have, so parse the object
+        # they look at when they cover all of it
+        obj = s.obj
+        if isinstance(obj, (bytes, bytearray, mmap.mmap)) and s.contiguous and s.nbytes == len(obj):
+            s = obj
+        else:
+            s = s.tobytes()
+
+    return _vbkv_parse(s, 0, mapper, merge_duplicate_keys)
+
+def vbkv_load(fp, mapper=dict, merge_duplicate_keys=True):
+    """
+    Deserialize ``fp`` (a binary file-like object containing a VBKV) to a
+    Python object. The file is read into memory rather than mapped, so a file
+    truncated by another process while loading fails with ``ValueError``
+    instead of crashing the interpreter with ``SIGBUS``.
+
+    See ``vbkv_loads`` for ``mapper`` and ``merge_duplicate_keys``.
+    """
+    if not hasattr(fp, 'read'):
+        raise TypeError("Expected fp to be a file-like object with read() returning bytes")
+    if not issubclass(mapper, Mapping):
+        raise TypeError("Expected mapper to be subclass of dict, got %s" % type(mapper))
+
+    return _vbkv_parse(fp.read(), 0, mapper, merge_duplicate_keys)
+
+def _vbkv_parse(buf, pos, mapper, merge_duplicate_keys):
+    if buf[pos:pos + 4] != b'VBKV':
         raise ValueError("Invalid header")
 
-    checksum, = struct.unpack('<i', s[4:8])
+    checksum, = _UINT32.unpack_from(buf, pos + 4)
 
-    if checksum != crc32(s[8:]):
-        raise ValueError("Invalid checksum")
+    with memoryview(buf) as view, view[pos + 8:] as payload:
+        if checksum != crc32(payload):
+            raise ValueError("Invalid checksum")
 
-    return binary_loads(s[8:], mapper, merge_duplicate_keys, alt_format=True)
+    # offsets in errors stay relative to the payload
+    return _binary_parse(buf, pos + 8, mapper, merge_duplicate_keys, True, True,
+                         base_offset=-(pos + 8))[0]
 
 def vbkv_dumps(obj):
     """
@@ -516,4 +840,4 @@ def vbkv_dumps(obj):
     data =  b''.join(_binary_dump_gen(obj, alt_format=True))
     checksum = crc32(data)
 
-    return b'VBKV' + struct.pack('<i', checksum) + data
+    return b'VBKV' + _UINT32.pack(checksum) + data
@@ -1,20 +1,35 @@
 import os
+import asyncio
 import hashlib
 import traceback
 import json
-import base64
 import tarfile
-import urllib.request
+import time
 from helpers import get_ssl_context  # type: ignore
 import shutil
-import subprocess
 
 # The decky plugin module is located at decky-loader/plugin
 # For easy intellisense checkout the decky-loader code one directory up
 # or add the `decky-loader/plugin` path to `python.analysis.extraPaths` in `.vscode/settings.json`
 import decky_plugin
 from shutil import copyfile
-from vdf import binary_dump, binary_load
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from artwork import ArtworkCache
+from downloader import DEFAULT_CONNECTIONS, DownloadCancelled, RangedDownloader
+from extractor import ExtractorCancelled, ExtractorRun, run_extractor
+from http_pool import HTTPPool
+from jobs import Job, JobCancelled, JobConflict, JobManager
+from metrics import Metrics
+from structured_log import StructuredLogger
+from release_cache import DigestReader, ReleaseCache
+from refresher import (
+    DEFAULT_INTERVAL,
+    DEFAULT_MAX_BACKOFF,
+    PeriodicRefresher,
+    Snapshot,
+)
+from releases import ReleaseClient
+from shortcuts import ShortcutsCache, app_names_of
 from pathlib import Path
 
 
@@ -30,11 +45,25 @@ def get_userdata_config(steam32):
     return get_steam_userdata() / steam32 / "config"
 
 
+def get_steam_users():
+    # Steam32 ids of every account that has signed in on this device
+    userdata = get_steam_userdata()
+    if not userdata.exists():
+        return []
+    return sorted(
+        user_dir.name
+        for user_dir in userdata.iterdir()
+        if user_dir.name.isdigit()
+        and user_dir.name != "0"
+        and (user_dir / "config").is_dir()
+    )
+
+
 def shortcut_already_exists(shortcuts, name):
     for key, shortcut in shortcuts.items():
-        decky_plugin.logger.info("shortcut: {}".format(json.dumps(shortcut)))
         if "AppName" in shortcut and shortcut["AppName"] == name:
-            decky_plugin.logger.info("found existing shortcut!")
+            log.info("found existing shortcut", key=key, name=name)
+            log.debug("existing shortcut", shortcut=shortcut)
             return True
     return False
 
@@ -48,35 +77,116 @@ def version_supports_game_flag(version):
     return False
 
 
-def _install_game_impl(game):
+# GitHub repository information
+RELEASES_URL = "https://api.github.com/repos/{}/{}/releases/latest".format(
+    "open-goal", "jak-project"
+)
+
+# Keep-alive connections shared by the GitHub API and asset downloads
+http_pool = HTTPPool(
+    ssl_context=get_ssl_context,
+    max_idle_per_host=DEFAULT_CONNECTIONS,
+    user_agent="OpenGOAL-decky-plugin/{}".format(decky_plugin.DECKY_PLUGIN_VERSION),
+)
+
+# Latest release metadata, cached on disk and revalidated with an ETag
+release_client = ReleaseClient(
+    RELEASES_URL,
+    cache_file=os.path.join(
+        decky_plugin.DECKY_PLUGIN_RUNTIME_DIR, "latest_release.json"
+    ),
+    http=http_pool,
+)
+
+# Games this plugin knows how to install
+GAMES = ("jak1", "jak2")
+
+# Name of the Steam shortcut created for each game
+SHORTCUT_NAMES = {"jak1": "OpenGOAL - Jak 1", "jak2": "OpenGOAL - Jak 2"}
+SHORTCUT_OPERATIONS = ("create", "update", "remove")
+# How many users' shortcuts.vdf `provision_all_users` works on at once
+PROVISION_WORKERS = 4
+
+# Release info, installed versions, ISO presence and shortcut state, kept warm
+# by `update_checker` so opening the panel doesn't wait on the network
+state = Snapshot()
+update_checker = PeriodicRefresher(lambda: _refresh_state(), logger=decky_plugin.logger)
+
+# Parsed shortcuts.vdf per Steam user, revalidated against the file on each use
+shortcuts_cache = ShortcutsCache()
+
+# Base64 encoded shortcut artwork, read and encoded once per file version
+artwork_cache = ArtworkCache(os.path.join(decky_plugin.DECKY_PLUGIN_DIR, "img"))
+
+# Downloaded release assets, shared between games and reinstalls
+release_cache = ReleaseCache(
+    os.path.join(decky_plugin.DECKY_USER_HOME, "OpenGOAL", "cache")
+)
+
+# Read size used when streaming a release tarball into extraction
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+# Installs, updates and removals run here so they don't block the event loop
+job_manager = JobManager(logger=decky_plugin.logger)
+
+# Call counts and latencies of every RPC and install phase, see `get_metrics`
+metrics = Metrics()
+METRICS_FILE = os.path.join(decky_plugin.DECKY_PLUGIN_LOG_DIR, "metrics.json")
+
+# Formats only what the logger's level lets through, and keeps it short
+log = StructuredLogger(decky_plugin.logger)
+
+
+def stream_extract_tarball(fileobj, extract_directory, job=None):
+    # Pipes `fileobj` (the downloaded or cached asset, only `read` is needed)
+    # through gzip decompression straight into tar member extraction using
+    # tarfile's stream mode ("r|gz"). The archive is never held in memory as a
+    # whole, so peak memory stays flat regardless of the asset size. Members
+    # go through the "data" filter, so nothing lands outside
+    # `extract_directory`.
+    track_progress = job is not None and fileobj.seekable()
+    with tarfile.open(fileobj=fileobj, mode="r|gz", bufsize=STREAM_CHUNK_SIZE) as tar:
+        for member in tar:
+            if job is not None:
+                job.check_cancelled()
+                if track_progress:
+                    job.set_progress(fileobj.tell())
+            tar.extract(member, extract_directory, filter="data")
+
+
+def _install_game_impl(game, job=None):
+    if job is None:
+        job = Job("install", game)
     try:
         decky_plugin.logger.info("installing game: {}".format(game))
-        # GitHub repository information
-        owner = "open-goal"
-        repo = "jak-project"
+        job.set_phase("resolving")
 
         # Directory where you want to extract the files
         extract_directory = os.path.join(
             decky_plugin.DECKY_USER_HOME, "OpenGOAL", "games", game
         )
 
-        # Reset the directory
-        if os.path.exists(extract_directory):
-            shutil.rmtree(extract_directory)
-        os.makedirs(extract_directory)
+        # Reset the directory. The release is unpacked next to it and only
+        # moved into place once it's verified, so a failed or interrupted
+        # extraction never looks like an installed game
+        unpack_directory = extract_directory + ".unpacking"
+        for directory in (extract_directory, unpack_directory):
+            if os.path.exists(directory):
+                shutil.rmtree(directory)
 
-        # Get the latest release URL using GitHub API
-        release_url = "https://api.github.com/repos/{}/{}/releases/latest".format(
-            owner, repo
-        )
-        release_resp = urllib.request.urlopen(release_url, context=get_ssl_context())
+        # Get the latest release using GitHub API, always revalidated before an
+        # install (a cheap 304 if the cached release is still current)
+        release_info = release_client.latest(max_age=0)
 
-        if release_resp.status == 200:
-            release_info = json.loads(release_resp.read().decode("utf-8"))
+        if release_info is not None:
             use_game_flag = version_supports_game_flag(release_info["tag_name"])
-            decky_plugin.logger.info(
-                "received response from github: {}".format(release_info)
+            log.info(
+                "received release from github",
+                tag=release_info["tag_name"],
+                assets=len(release_info["assets"]),
             )
+            log.debug("release", release=release_info)
 
             # Find the asset with the desired format (opengoal-linux-*.tar.gz)
             asset_to_download = None
@@ -91,26 +201,61 @@ def _install_game_impl(game):
                 # Construct the download URL
                 asset_url = asset_to_download["browser_download_url"]
 
-                # Download the asset
-                asset_file = os.path.join(extract_directory, asset_to_download["name"])
-                asset_resp = urllib.request.urlopen(
-                    asset_url, context=get_ssl_context()
-                )
-                if asset_resp.status == 200:
-                    with open(asset_file, mode="wb") as f:
-                        f.write(asset_resp.read())
-
-                # Extract the downloaded .tar.gz file
-                with tarfile.open(asset_file, "r:gz") as tar:
-                    tar.extractall(extract_directory)
+                # The same release asset is shared by every game, so check the
+                # cache before going to the network
+                tag = release_info["tag_name"]
+                asset_name = asset_to_download["name"]
+                asset_digest = asset_to_download.get("digest")
+                asset_file = release_cache.lookup(tag, asset_name, asset_digest)
+                staging_file = None
+                if asset_file is None:
+                    # Download the asset, partial downloads are kept in the cache
+                    # so an interrupted download can be resumed on the next attempt
+                    job.set_phase("downloading")
+                    staging_file = release_cache.staging_path(asset_name)
+                    try:
+                        RangedDownloader(http=http_pool).download(
+                            asset_url,
+                            staging_file,
+                            progress=job.set_progress,
+                            cancel_event=job.cancel_event,
+                        )
+                    except DownloadCancelled:
+                        raise JobCancelled()
+                    decky_plugin.logger.info("Downloaded: {}".format(asset_url))
+                else:
+                    decky_plugin.logger.info(
+                        "Using cached release asset: {}".format(asset_file)
+                    )
 
-                decky_plugin.logger.info(
-                    "Downloaded and extracted: {}".format(asset_file)
-                )
+                # Extract the downloaded .tar.gz file. Ranged chunks arrive out
+                # of order, so a fresh download can't be extracted as it comes
+                # in: it is written once and read once, and that read also
+                # produces the digest the cache needs. The unpacked files are
+                # only kept once the digest has been checked
+                job.set_phase("extracting")
+                source_file = staging_file or asset_file
+                job.set_progress(0, os.path.getsize(source_file))
+                os.makedirs(unpack_directory)
+                try:
+                    with open(source_file, mode="rb") as f:
+                        reader = DigestReader(f) if staging_file else f
+                        stream_extract_tarball(reader, unpack_directory, job)
+                        actual_digest = reader.digest() if staging_file else None
+                    if staging_file:
+                        asset_file = release_cache.store(
+                            tag,
+                            asset_name,
+                            staging_file,
+                            asset_digest,
+                            actual_digest=actual_digest,
+                        )
+                except:
+                    shutil.rmtree(unpack_directory, ignore_errors=True)
+                    raise
+                os.rename(unpack_directory, extract_directory)
 
-                # Delete the downloaded .tar.gz file
-                os.remove(asset_file)
-                decky_plugin.logger.info("Deleted: {}".format(asset_file))
+                decky_plugin.logger.info("Extracted: {}".format(asset_file))
 
                 # Run the extractor to install the game
                 iso_path = os.path.join(
@@ -130,30 +275,34 @@ def _install_game_impl(game):
                 if use_game_flag:
                     args.append("--game")
                     args.append(game)
-                completed_process = subprocess.run(
-                    args,
-                    cwd=extract_directory,
-                    check=True,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    universal_newlines=True,
+                job.set_phase("compiling")
+                extractor_run = ExtractorRun(
+                    on_update=lambda run: job.set_details(run.progress())
+                )
+                try:
+                    return_code = run_extractor(
+                        args, extract_directory, extractor_run, job.cancel_event
+                    )
+                except ExtractorCancelled:
+                    raise JobCancelled()
+                decky_plugin.logger.info(
+                    "extractor phase timings: {}".format(
+                        extractor_run.progress()["phase_timings"]
+                    )
                 )
-
-                # Retrieve the exit status
-                return_code = completed_process.returncode
 
                 if return_code != 0:
+                    stderr, stdout = extractor_run.logs()
                     decky_plugin.logger.error(
                         "Could not install successfully, status code: {}".format(
                             return_code
                         )
                     )
                     decky_plugin.logger.error(
-                        "Logs: ERROR LOGS:\n{}\n\nSTDOUT:\n{}".format(
-                            completed_process.stderr, completed_process.stdout
-                        )
+                        "Logs: ERROR LOGS:\n{}\n\nSTDOUT:\n{}".format(stderr, stdout)
                     )
                 else:
+                    job.set_phase("cleaning up")
                     # Delete directories that aren't needed after installation to free up space
                     if os.path.exists(
                         os.path.join(extract_directory, "data", "decompiler_out")
@@ -178,12 +327,10 @@ def _install_game_impl(game):
             else:
                 decky_plugin.logger.info("No matching asset found.")
         else:
-            decky_plugin.logger.error(
-                "received unexpected status code from github: {}".format(
-                    release_resp.status
-                )
-            )
+            decky_plugin.logger.error("could not get the latest release from github")
         return None
+    except JobCancelled:
+        raise
     except Exception as error:
         decky_plugin.logger.error(
             "[install_game] An exception occurred: {}".format(traceback.format_exc())
@@ -191,7 +338,30 @@ def _install_game_impl(game):
         return None
 
 
-def _remove_game_impl(game):
+def _cleanup_cancelled(job):
+    # A cancelled install leaves a half extracted game behind, which would
+    # otherwise show up as installed. A job cancelled before its first phase
+    # (e.g. an update that never got to remove the old version) hasn't
+    # touched the game and leaves it alone
+    decky_plugin.logger.info("{} of {} cancelled".format(job.kind, job.game))
+    if job.phase is None:
+        return
+    _remove_game_impl(job.game)
+    _refresh_game_state(job.game)
+
+
+def _update_game_impl(game, job=None):
+    if job is not None:
+        # Last chance to back out with the installed version still in place
+        job.check_cancelled()
+    if _remove_game_impl(game, job):
+        return _install_game_impl(game, job)
+    return None
+
+
+def _remove_game_impl(game, job=None):
+    if job is not None:
+        job.set_phase("removing")
     try:
         if game == "jak1":
             if os.path.exists(
@@ -221,98 +391,363 @@ def _remove_game_impl(game):
         return False
 
 
+def get_settings():
+    # Optional overrides in DECKY_PLUGIN_SETTINGS_DIR/settings.json
+    settings = {
+        "update_check_interval": DEFAULT_INTERVAL,
+        "update_check_max_backoff": DEFAULT_MAX_BACKOFF,
+    }
+    settings_file = os.path.join(
+        decky_plugin.DECKY_PLUGIN_SETTINGS_DIR, "settings.json"
+    )
+    try:
+        if os.path.exists(settings_file):
+            with open(settings_file, mode="r") as f:
+                overrides = json.load(f)
+            for key in settings:
+                if key in overrides:
+                    settings[key] = _positive_seconds(
+                        key, overrides[key], settings[key]
+                    )
+    except:
+        decky_plugin.logger.error(
+            "[get_settings] An exception occurred: {}".format(traceback.format_exc())
+        )
+    return settings
+
+
+def _positive_seconds(key, value, default):
+    # Anything else would make the update checker's wait raise and stop it
+    try:
+        seconds = float(value)
+    except (TypeError, ValueError):
+        seconds = None
+    if isinstance(value, bool) or seconds is None or not 0 < seconds < float("inf"):
+        decky_plugin.logger.error(
+            "[get_settings] Invalid {}: {!r}, using {}".format(key, value, default)
+        )
+        return default
+    return seconds
+
+
+def _is_game_installed_impl(game):
+    game_dir = os.path.join(
+        "{}/OpenGOAL/games".format(decky_plugin.DECKY_USER_HOME), game
+    )
+    return os.path.exists(game_dir) and len(os.listdir(game_dir)) > 0
+
+
+def _does_iso_exist_impl(game):
+    iso_path = os.path.join(
+        "{}/OpenGOAL/isos".format(decky_plugin.DECKY_USER_HOME), "{}.iso".format(game)
+    )
+    return os.path.exists(iso_path)
+
+
+def _installed_version_impl(game):
+    version_file = os.path.join(
+        decky_plugin.DECKY_USER_HOME, "OpenGOAL", "games", game, "version.json"
+    )
+    if not os.path.exists(version_file):
+        return None
+    with open(version_file, mode="r") as f:
+        return json.load(f)["version"]
+
+
+def _shortcut_state_impl(owner_id):
+    # Whether each game's shortcut exists, only re-read once Steam changes the file
+    shortcuts_vdf = get_userdata_config(owner_id) / "shortcuts.vdf"
+    app_names = shortcuts_cache.app_names(owner_id, shortcuts_vdf)
+    return {game: name in app_names for game, name in SHORTCUT_NAMES.items()}
+
+
+def _shortcut_definition(game):
+    # The key and fields of the Steam shortcut the plugin manages for `game`
+    game_dir = os.path.join(decky_plugin.DECKY_USER_HOME, "OpenGOAL", "games", game)
+    exe = os.path.join(game_dir, "gk")
+    app_id = int(hashlib.sha256(exe.encode()).hexdigest(), 16) % 1_000_000_000
+    shortcut = {
+        "appid": app_id * -1,
+        "AppName": SHORTCUT_NAMES[game],
+        "Exe": exe,
+    }
+    if game != "jak1":
+        shortcut["LaunchOptions"] = "--game {}".format(game)
+    shortcut["StartDir"] = game_dir
+    shortcut["icon"] = os.path.join(
+        decky_plugin.DECKY_PLUGIN_DIR, "img", game, "icon.png"
+    )
+    shortcut["AllowOverlay"] = 1
+    return "opengoal-{}".format(game), shortcut
+
+
+def _plan_shortcut_operations(operations, results):
+    # Returns a `plan` for `ShortcutsCache.apply`, filling in `results` with one
+    # {op, game, status, app_id} entry per operation as it goes
+    def plan(shortcuts):
+        view = dict(shortcuts)
+        changes = {}
+        del results[:]
+        for operation in operations:
+            op = operation.get("op")
+            game = operation.get("game")
+            result = {"op": op, "game": game, "status": "invalid", "app_id": None}
+            results.append(result)
+            if op not in SHORTCUT_OPERATIONS or game not in GAMES:
+                continue
+            keys = [
+                key
+                for key, shortcut in view.items()
+                if shortcut.get("AppName") == SHORTCUT_NAMES[game]
+            ]
+            if op == "create":
+                if keys:
+                    result.update(status="exists", app_id=view[keys[0]].get("appid"))
+                    continue
+                key, shortcut = _shortcut_definition(game)
+                changes[key] = view[key] = shortcut
+                result.update(status="created", app_id=shortcut["appid"])
+            elif not keys:
+                result["status"] = "missing"
+            elif op == "update":
+                # Refresh the fields we manage, keep the app id (and with it
+                # the artwork) plus anything Steam or the user added
+                _, definition = _shortcut_definition(game)
+                del definition["appid"]
+                result.update(status="unchanged", app_id=view[keys[0]].get("appid"))
+                for key in keys:
+                    shortcut = dict(view[key], **definition)
+                    if shortcut != view[key]:
+                        changes[key] = view[key] = shortcut
+                        result["status"] = "updated"
+            else:
+                for key in keys:
+                    changes[key] = None
+                    del view[key]
+                result["status"] = "removed"
+        return changes
+
+    return plan
+
+
+def _apply_shortcut_operations_impl(owner_id, operations):
+    shortcuts_vdf = get_userdata_config(owner_id) / "shortcuts.vdf"
+    results = []
+    table, changes = shortcuts_cache.apply(
+        owner_id, shortcuts_vdf, _plan_shortcut_operations(operations, results)
+    )
+    app_names = app_names_of(table)
+    state.set(
+        "shortcuts:{}".format(owner_id),
+        {game: name in app_names for game, name in SHORTCUT_NAMES.items()},
+    )
+    decky_plugin.logger.info(
+        "applied {} shortcut operations for {}, {} entries changed".format(
+            len(results), owner_id, len(changes)
+        )
+    )
+    return results
+
+
+def _provision_user(owner_id, operations):
+    shortcuts_vdf = get_userdata_config(owner_id) / "shortcuts.vdf"
+    wanted = {
+        SHORTCUT_NAMES[operation["game"]]
+        for operation in operations
+        if operation.get("op") == "create" and operation.get("game") in GAMES
+    }
+    if (
+        len(wanted) == len(operations)
+        and shortcuts_vdf.exists()
+        and wanted <= shortcuts_cache.app_names(owner_id, shortcuts_vdf)
+    ):
+        # Everything asked for is already there, don't even load the table
+        return {"status": "up_to_date", "results": []}
+    results = _apply_shortcut_operations_impl(owner_id, operations)
+    changed = any(
+        result["status"] in ("created", "updated", "removed") for result in results
+    )
+    return {"status": "changed" if changed else "up_to_date", "results": results}
+
+
+def _provision_all_users_impl(operations=None):
+    if operations is None:
+        operations = [
+            {"op": "create", "game": game}
+            for game in GAMES
+            if _is_game_installed_impl(game)
+        ]
+    owners = get_steam_users()
+    report = {}
+    if not owners:
+        return report
+    with ThreadPoolExecutor(max_workers=min(PROVISION_WORKERS, len(owners))) as pool:
+        futures = {
+            pool.submit(_provision_user, owner_id, operations): owner_id
+            for owner_id in owners
+        }
+        for future in as_completed(futures):
+            owner_id = futures[future]
+            try:
+                report[owner_id] = future.result()
+            except Exception as e:
+                decky_plugin.logger.error(
+                    "[provision_all_users] {} failed: {}".format(
+                        owner_id, traceback.format_exc()
+                    )
+                )
+                report[owner_id] = {"status": "failed", "error": str(e)}
+    return report
+
+
+def _shortcut_already_created_impl(owner_id, game):
+    return _shortcut_state_impl(owner_id).get(game, False)
+
+
+# Each field of a game's state, how to check it and what to report if that fails
+GAME_STATE_FIELDS = (
+    ("installed", _is_game_installed_impl, False),
+    ("version", _installed_version_impl, None),
+    ("iso_exists", _does_iso_exist_impl, False),
+)
+
+
+def _refresh_game_state(game):
+    # One unreadable file (e.g. an empty version.json) only fails its own field
+    game_state = {}
+    for field, check, default in GAME_STATE_FIELDS:
+        try:
+            game_state[field] = check(game)
+        except:
+            decky_plugin.logger.error(
+                "[refresh_game_state] {} {}: An exception occurred: {}".format(
+                    game, field, traceback.format_exc()
+                )
+            )
+            game_state[field] = default
+    state.update(game, **game_state)
+    return game_state
+
+
+def _refresh_shortcut_state(owner_id):
+    shortcuts = _shortcut_state_impl(owner_id)
+    state.set("shortcuts:{}".format(owner_id), shortcuts)
+    return shortcuts
+
+
+def _latest_version_impl():
+    latest_version = state.get("latest_version")
+    if latest_version is None:
+        release_info = release_client.latest()
+        if release_info is None:
+            return None
+        latest_version = release_info["tag_name"]
+        state.set("latest_version", latest_version)
+    return latest_version
+
+
+def _dashboard_shortcut_state(owner_id):
+    # The cache only costs a stat while Steam hasn't touched shortcuts.vdf, the
+    # (up to an hour old) snapshot is only for when it can't be read at all
+    try:
+        return _refresh_shortcut_state(owner_id)
+    except FileNotFoundError:
+        # An account without any non-Steam games has no shortcuts.vdf yet
+        return {game: False for game in SHORTCUT_NAMES}
+    except:
+        decky_plugin.logger.error(
+            "[get_dashboard_state] An exception occurred: {}".format(
+                traceback.format_exc()
+            )
+        )
+        return state.get("shortcuts:{}".format(owner_id)) or {}
+
+
+def _dashboard_latest_version():
+    try:
+        return _latest_version_impl()
+    except:
+        decky_plugin.logger.error(
+            "[get_dashboard_state] An exception occurred: {}".format(
+                traceback.format_exc()
+            )
+        )
+        return None
+
+
+def _refresh_state():
+    # Local state first, so it's still current if GitHub can't be reached
+    for game in GAMES:
+        _refresh_game_state(game)
+    userdata = get_steam_userdata()
+    if userdata.exists():
+        for user_dir in userdata.iterdir():
+            if not (user_dir / "config" / "shortcuts.vdf").exists():
+                continue
+            try:
+                _refresh_shortcut_state(user_dir.name)
+            except:
+                decky_plugin.logger.error(
+                    "[refresh_state] An exception occurred: {}".format(
+                        traceback.format_exc()
+                    )
+                )
+    release_info = release_client.latest()
+    if release_info is not None:
+        state.set("latest_version", release_info["tag_name"])
+
+
+def _game_job(impl, game):
+    def run(job):
+        started = time.perf_counter()
+        result = None
+        try:
+            result = impl(game, job)
+            return result
+        finally:
+            job.end_phase()
+            for phase, seconds, bytes_done in job.phase_history:
+                metrics.record("{}.{}".format(job.kind, phase), seconds, bytes_done)
+            metrics.record(
+                "job.{}".format(job.kind),
+                time.perf_counter() - started,
+                error=not result,
+            )
+            _refresh_game_state(game)
+
+    return run
+
+
+def _submit_game_job(kind, game, impl, on_cancel=None):
+    # Returns the job id, or None while a different job for the game is active
+    try:
+        return job_manager.submit(kind, game, _game_job(impl, game), on_cancel).id
+    except JobConflict as e:
+        decky_plugin.logger.error("[{}_game] {}".format(kind, e))
+        return None
+
+
+@metrics.instrument
 class Plugin:
     async def create_shortcut(self, owner_id, game):
         try:
-            decky_plugin.logger.info("creating shortcut for game: {}".format(game))
             shortcuts_vdf = get_userdata_config(owner_id) / "shortcuts.vdf"
-            decky_plugin.logger.info("loading file: {}".format(shortcuts_vdf))
-            d = binary_load(open(shortcuts_vdf, "rb"))
-            decky_plugin.logger.info(
-                "existing shortcuts: {}".format(json.dumps(d["shortcuts"]))
+            log.info("creating shortcut", game=game, file=str(shortcuts_vdf))
+            d = shortcuts_cache.load(owner_id, shortcuts_vdf)
+            log.debug(
+                "existing shortcuts",
+                count=len(d["shortcuts"]),
+                shortcuts=d["shortcuts"],
             )
-            if game == "jak1":
-                if not shortcut_already_exists(d["shortcuts"], "OpenGOAL - Jak 1"):
-                    app_id = (
-                        int(
-                            hashlib.sha256(
-                                os.path.join(
-                                    decky_plugin.DECKY_USER_HOME,
-                                    "OpenGOAL",
-                                    "games",
-                                    "jak1",
-                                    "gk",
-                                ).encode()
-                            ).hexdigest(),
-                            16,
-                        )
-                        % 1_000_000_000
-                    ) * -1
-                    d["shortcuts"]["opengoal-jak1"] = {
-                        "appid": app_id,
-                        "AppName": "OpenGOAL - Jak 1",
-                        "Exe": os.path.join(
-                            decky_plugin.DECKY_USER_HOME,
-                            "OpenGOAL",
-                            "games",
-                            "jak1",
-                            "gk",
-                        ),
-                        "StartDir": os.path.join(
-                            decky_plugin.DECKY_USER_HOME, "OpenGOAL", "games", "jak1"
-                        ),
-                        "icon": os.path.join(
-                            decky_plugin.DECKY_PLUGIN_DIR, "img", "jak1", "icon.png"
-                        ),
-                        "AllowOverlay": 1,
-                    }
-                    binary_dump(d, open(shortcuts_vdf, "wb"))
-                    decky_plugin.logger.info(
-                        "Created shortcut with appId: {}".format(app_id)
-                    )
-                    return app_id
-            elif game == "jak2":
-                if not shortcut_already_exists(d["shortcuts"], "OpenGOAL - Jak 2"):
-                    app_id = (
-                        int(
-                            hashlib.sha256(
-                                os.path.join(
-                                    decky_plugin.DECKY_USER_HOME,
-                                    "OpenGOAL",
-                                    "games",
-                                    "jak2",
-                                    "gk",
-                                ).encode()
-                            ).hexdigest(),
-                            16,
-                        )
-                        % 1_000_000_000
-                    ) * -1
-                    d["shortcuts"]["opengoal-jak2"] = {
-                        "appid": app_id,
-                        "AppName": "OpenGOAL - Jak 2",
-                        "Exe": os.path.join(
-                            decky_plugin.DECKY_USER_HOME,
-                            "OpenGOAL",
-                            "games",
-                            "jak2",
-                            "gk",
-                        ),
-                        "LaunchOptions": "--game jak2",
-                        "StartDir": os.path.join(
-                            decky_plugin.DECKY_USER_HOME, "OpenGOAL", "games", "jak2"
-                        ),
-                        "icon": os.path.join(
-                            decky_plugin.DECKY_PLUGIN_DIR, "img", "jak2", "icon.png"
-                        ),
-                        "AllowOverlay": 1,
-                    }
-                    binary_dump(d, open(shortcuts_vdf, "wb"))
-                    decky_plugin.logger.info(
-                        "Created shortcut with appId: {}".format(app_id)
-                    )
-                    return app_id
-            decky_plugin.logger.info("shortcut already created")
+            if game in GAMES and not shortcut_already_exists(
+                d["shortcuts"], SHORTCUT_NAMES[game]
+            ):
+                key, shortcut = _shortcut_definition(game)
+                shortcuts_cache.add_shortcut(owner_id, shortcuts_vdf, key, shortcut)
+                state.update("shortcuts:{}".format(owner_id), **{game: True})
+                log.info("created shortcut", game=game, app_id=shortcut["appid"])
+                return shortcut["appid"]
+            log.info("shortcut already created", game=game)
             return None
         except:
             decky_plugin.logger.error(
@@ -322,19 +757,49 @@ class Plugin:
             )
             return None
 
-    async def shortcut_already_created(self, owner_id, game):
+    # Creates, updates and removes shortcuts with a single read and write of
+    # shortcuts.vdf, e.g. `[{"op": "create", "game": "jak1"}, ...]`. Returns a
+    # result per operation, or None if nothing could be applied
+    async def apply_shortcut_operations(self, owner_id, operations):
         try:
-            shortcuts_vdf = get_userdata_config(owner_id) / "shortcuts.vdf"
-            decky_plugin.logger.info("loading file: {}".format(shortcuts_vdf))
-            d = binary_load(open(shortcuts_vdf, "rb"))
-            decky_plugin.logger.info(
-                "existing shortcuts: {}".format(json.dumps(d["shortcuts"]))
+            return await asyncio.get_running_loop().run_in_executor(
+                None, _apply_shortcut_operations_impl, owner_id, operations
+            )
+        except:
+            decky_plugin.logger.error(
+                "[apply_shortcut_operations] An exception occurred: {}".format(
+                    traceback.format_exc()
+                )
+            )
+            return None
+
+    # Applies the same shortcut operations for every Steam account on the
+    # device (by default, creates shortcuts for the installed games) and
+    # returns a report per account
+    async def provision_all_users(self, operations=None):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, _provision_all_users_impl, operations
             )
-            if game == "jak1":
-                return shortcut_already_exists(d["shortcuts"], "OpenGOAL - Jak 1")
-            elif game == "jak2":
-                return shortcut_already_exists(d["shortcuts"], "OpenGOAL - Jak 2")
-            return False
+        except:
+            decky_plugin.logger.error(
+                "[provision_all_users] An exception occurred: {}".format(
+                    traceback.format_exc()
+                )
+            )
+            return None
+
+    async def shortcut_already_created(self, owner_id, game):
+        try:
+            cached = state.get("shortcuts:{}".format(owner_id))
+            if cached is not None and game in cached:
+                # Served from memory, revalidated in the background in case
+                # the shortcut was changed from within Steam
+                update_checker.trigger()
+                return cached[game]
+            exists = _shortcut_already_created_impl(owner_id, game)
+            state.update("shortcuts:{}".format(owner_id), **{game: exists})
+            return exists
         except:
             decky_plugin.logger.error(
                 "[shortcut_already_created] An exception occurred: {}".format(
@@ -345,22 +810,8 @@ class Plugin:
 
     async def read_small_image_as_base64(self, game):
         try:
-            if game == "jak1":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak1", "small.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
-            elif game == "jak2":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak2", "small.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
+            if game in GAMES:
+                return artwork_cache.get_base64(game, "small")
             return None
         except:
             decky_plugin.logger.error(
@@ -372,22 +823,8 @@ class Plugin:
 
     async def read_wide_image_as_base64(self, game):
         try:
-            if game == "jak1":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak1", "wide.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
-            elif game == "jak2":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak2", "wide.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
+            if game in GAMES:
+                return artwork_cache.get_base64(game, "wide")
             return None
         except:
             decky_plugin.logger.error(
@@ -399,22 +836,8 @@ class Plugin:
 
     async def read_logo_image_as_base64(self, game):
         try:
-            if game == "jak1":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak1", "logo.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
-            elif game == "jak2":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak2", "logo.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
+            if game in GAMES:
+                return artwork_cache.get_base64(game, "logo")
             return None
         except:
             decky_plugin.logger.error(
@@ -426,22 +849,8 @@ class Plugin:
 
     async def read_hero_image_as_base64(self, game):
         try:
-            if game == "jak1":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak1", "hero.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
-            elif game == "jak2":
-                with open(
-                    os.path.join(
-                        decky_plugin.DECKY_PLUGIN_DIR, "img", "jak2", "hero.png"
-                    ),
-                    "rb",
-                ) as image_file:
-                    return base64.b64encode(image_file.read()).decode("utf-8")
+            if game in GAMES:
+                return artwork_cache.get_base64(game, "hero")
             return None
         except:
             decky_plugin.logger.error(
@@ -451,12 +860,28 @@ class Plugin:
             )
             return None
 
+    # Several artwork kinds in one round trip, `kinds` defaults to everything
+    # a shortcut needs and `mode="path"` returns file paths instead of data
+    async def get_artwork_set(self, game, kinds=None, mode="base64"):
+        try:
+            if game not in GAMES:
+                return None
+            return artwork_cache.get_set(
+                game, kinds or ("small", "wide", "hero", "logo"), mode
+            )
+        except:
+            decky_plugin.logger.error(
+                "[get_artwork_set] An exception occurred: {}".format(
+                    traceback.format_exc()
+                )
+            )
+            return None
+
     async def is_game_installed(self, game):
         try:
-            game_dir = os.path.join("{}/OpenGOAL/games".format(decky_plugin.DECKY_USER_HOME), game)
-            if os.path.exists(game_dir) and len(os.listdir(game_dir)) > 0:
-                return True
-            return False
+            installed = _is_game_installed_impl(game)
+            state.update(game, installed=installed)
+            return installed
         except:
             decky_plugin.logger.error(
                 "[is_game_installed] An exception occurred: {}".format(
@@ -468,35 +893,61 @@ class Plugin:
     async def get_users_home_dir(self):
         return decky_plugin.DECKY_USER_HOME
 
-    async def is_game_out_of_date(self, game):
+    # Everything the panel shows on open, for every game, in one round trip
+    async def get_dashboard_state(self, owner_id):
         try:
-            # Get the saved version info from the file
-            extract_directory = os.path.join(
-                decky_plugin.DECKY_USER_HOME, "OpenGOAL", "games", game
+            loop = asyncio.get_running_loop()
+            latest_version, shortcuts, *game_states = await asyncio.gather(
+                loop.run_in_executor(None, _dashboard_latest_version),
+                loop.run_in_executor(None, _dashboard_shortcut_state, owner_id),
+                *(
+                    loop.run_in_executor(None, _refresh_game_state, game)
+                    for game in GAMES
+                ),
             )
-            if os.path.exists(os.path.join(extract_directory, "version.json")):
-                with open(
-                    os.path.join(extract_directory, "version.json"), mode="r"
-                ) as f:
-                    current_info = json.load(f)
-                # GitHub repository information
-                owner = "open-goal"
-                repo = "jak-project"
-
-                # Get the latest release URL using GitHub API
-                release_url = (
-                    "https://api.github.com/repos/{}/{}/releases/latest".format(
-                        owner, repo
-                    )
-                )
-                release_resp = urllib.request.urlopen(
-                    release_url, context=get_ssl_context()
+            update_checker.trigger()
+            games = {}
+            for game, game_state in zip(GAMES, game_states):
+                games[game] = {
+                    "installed": game_state["installed"],
+                    "iso_exists": game_state["iso_exists"],
+                    "version": game_state["version"],
+                    "out_of_date": latest_version is not None
+                    and game_state["version"] is not None
+                    and latest_version != game_state["version"],
+                    "shortcut_exists": shortcuts.get(game, False),
+                }
+            return {
+                "home_dir": decky_plugin.DECKY_USER_HOME,
+                "latest_version": latest_version,
+                "games": games,
+            }
+        except:
+            decky_plugin.logger.error(
+                "[get_dashboard_state] An exception occurred: {}".format(
+                    traceback.format_exc()
                 )
+            )
+            return None
 
-                if release_resp.status == 200:
-                    release_info = json.loads(release_resp.read().decode("utf-8"))
-                    return release_info["tag_name"] != current_info["version"]
-                return False
+    async def is_game_out_of_date(self, game):
+        try:
+            # Get the saved version info from the file
+            current_version = _installed_version_impl(game)
+            state.update(game, version=current_version)
+            if current_version is not None:
+                # Normally kept warm by the background update checker, ask it
+                # to revalidate so the next panel open sees any new release.
+                # Otherwise the lookup is shared by every game and caller, so
+                # usually served from the cache or a 304. Run it off the event
+                # loop regardless.
+                update_checker.trigger()
+                latest_version = await asyncio.get_running_loop().run_in_executor(
+                    None, _latest_version_impl
+                )
+                if latest_version is None:
+                    return False
+                return latest_version != current_version
             return False
         except:
             decky_plugin.logger.error(
@@ -508,10 +959,9 @@ class Plugin:
 
     async def does_iso_exist_for_installation(self, game):
         try:
-            iso_path = os.path.join("{}/OpenGOAL/isos".format(decky_plugin.DECKY_USER_HOME), "{}.iso".format(game))
-            if os.path.exists(iso_path):
-                return True
-            return False
+            iso_exists = _does_iso_exist_impl(game)
+            state.update(game, iso_exists=iso_exists)
+            return iso_exists
         except:
             decky_plugin.logger.error(
                 "[is_game_installed] An exception occurred: {}".format(
@@ -520,31 +970,74 @@ class Plugin:
             )
             return False
 
+    # Installs, updates and removals run as background jobs, these return the
+    # job id straight away and progress is polled through `get_job_status`
     async def install_game(self, game):
-        return _install_game_impl(game)
+        return _submit_game_job("install", game, _install_game_impl, _cleanup_cancelled)
 
     async def remove_game(self, game):
-        return _remove_game_impl(game)
+        return _submit_game_job("remove", game, _remove_game_impl)
 
     async def update_game(self, game):
-        try:
-            if _remove_game_impl(game):
-                return _install_game_impl(game)
+        return _submit_game_job("update", game, _update_game_impl, _cleanup_cancelled)
+
+    async def get_job_status(self, job_id):
+        job = job_manager.get(job_id)
+        if job is None:
             return None
+        return job.to_dict()
+
+    async def cancel_job(self, job_id):
+        return job_manager.cancel(job_id)
+
+    # Counts and latency histograms per RPC (`rpc.<name>`) and per install,
+    # update and removal phase (`<kind>.<phase>`, with the bytes it moved).
+    # With `dump` they are also written to METRICS_FILE
+    async def get_metrics(self, dump=False):
+        try:
+            if dump:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, metrics.dump, METRICS_FILE
+                )
+            return metrics.snapshot()
         except:
             decky_plugin.logger.error(
-                "[shortcut_already_created] An exception occurred: {}".format(
-                    traceback.format_exc()
-                )
+                "[get_metrics] An exception occurred: {}".format(traceback.format_exc())
             )
             return None
 
     # Asyncio-compatible long-running code, executed in a task when the plugin is loaded
     async def _main(self):
         decky_plugin.logger.info("OpenGOAL Loaded!")
+        settings = get_settings()
+        update_checker.interval = settings["update_check_interval"]
+        update_checker.max_backoff = settings["update_check_max_backoff"]
+        try:
+            await asyncio.get_running_loop().run_in_executor(
+                None, artwork_cache.preload, GAMES
+            )
+        except:
+            decky_plugin.logger.error(
+                "[preload_artwork] An exception occurred: {}".format(
+                    traceback.format_exc()
+                )
+            )
+        # Keeps `state` warm in the background for as long as the plugin is loaded
+        await update_checker.run()
 
     # Function called first during the unload process, utilize this to handle your plugin being removed
     async def _unload(self):
+        update_checker.stop()
+        job_manager.shutdown()
+        http_pool.close()
+        try:
+            metrics.dump(METRICS_FILE)
+        except:
+            decky_plugin.logger.error(
+                "[dump_metrics] An exception occurred: {}".format(
+                    traceback.format_exc()
+                )
+            )
         decky_plugin.logger.info("OpenGOAL Unloaded!")
         pass
 
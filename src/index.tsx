@@ -49,6 +49,64 @@ const showRestartConfirm = () => {
   );
 };
 
+type JobStatus = {
+  id: string;
+  kind: string;
+  game: string;
+  status: "queued" | "running" | "succeeded" | "failed" | "cancelled";
+  phase: string | null;
+  bytes_done: number;
+  bytes_total: number | null;
+  eta: number | null;
+  details: {
+    phase?: string | null;
+    percent?: number | null;
+    phase_timings?: Record<string, number>;
+  };
+  result: unknown;
+  error: string | null;
+};
+
+type GameState = {
+  installed: boolean;
+  iso_exists: boolean;
+  version: string | null;
+  out_of_date: boolean;
+  shortcut_exists: boolean;
+};
+
+type DashboardState = {
+  home_dir: string;
+  latest_version: string | null;
+  games: { jak1: GameState; jak2: GameState };
+};
+
+const JOB_POLL_INTERVAL_MS = 1000;
+
+// Steam's asset type for each artwork kind the backend hands out
+const ARTWORK_ASSET_TYPES: Record<string, number> = {
+  small: 0,
+  hero: 1,
+  logo: 2,
+  wide: 3,
+};
+
+const describeJob = (job: JobStatus): string => {
+  let text = job.phase ?? job.status;
+  if (job.details.phase) {
+    text += ` - ${job.details.phase}`;
+  }
+  if (job.details.percent !== null && job.details.percent !== undefined) {
+    text += ` ${Math.floor(job.details.percent)}%`;
+  } else if (job.bytes_total) {
+    text += ` ${Math.floor((job.bytes_done / job.bytes_total) * 100)}%`;
+  }
+  if (job.eta !== null) {
+    text += ` (${Math.ceil(job.eta)}s left)`;
+  }
+  return text;
+};
+
 const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
   const [componentLoaded, setComponentLoaded] = useState(false);
   const [usersHomeDir, setUsersHomeDir] = useState("/home/deck");
@@ -56,84 +114,92 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
   const [jak1ISOExists, setJak1ISOExists] = useState(false);
   const [jak1Installing, setJak1Installing] = useState(false);
   const [jak1OutOfDate, setJak1OutOfDate] = useState(false);
+  const [jak1Progress, setJak1Progress] = useState("");
   const [jak1ShortcutAlreadyExists, setJak1ShortcutAlreadyExists] =
     useState(false);
   const [jak2Installed, setJak2Installed] = useState(false);
   const [jak2ISOExists, setJak2ISOExists] = useState(false);
   const [jak2Installing, setJak2Installing] = useState(false);
   const [jak2OutOfDate, setJak2OutOfDate] = useState(false);
+  const [jak2Progress, setJak2Progress] = useState("");
   const [jak2ShortcutAlreadyExists, setJak2ShortcutAlreadyExists] =
     useState(false);
 
+  // Fetches every artwork kind for the game in one call and applies it
+  const setShortcutArtwork = async (appId: number, game: string) => {
+    const response = await serverAPI.callPluginMethod<
+      { game: string; kinds: string[] },
+      Record<string, string> | null
+    >("get_artwork_set", { game, kinds: Object.keys(ARTWORK_ASSET_TYPES) });
+    const artwork = response.success ? response.result : null;
+    if (!artwork) {
+      return;
+    }
+    for (const [kind, data] of Object.entries(artwork)) {
+      await SteamClient.Apps.SetCustomArtworkForApp(
+        appId,
+        data,
+        "png",
+        ARTWORK_ASSET_TYPES[kind]
+      );
+    }
+  };
+
+  // Installs, updates and removals run as background jobs on the backend,
+  // poll until they finish and resolve with the job's result
+  const runJob = async (
+    method: string,
+    game: string,
+    onProgress: (text: string) => void
+  ) => {
+    const jobId = (await serverAPI.callPluginMethod(method, { game })).result;
+    if (typeof jobId !== "string") {
+      return null;
+    }
+    while (true) {
+      await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+      const response = await serverAPI.callPluginMethod<
+        { job_id: string },
+        JobStatus | null
+      >("get_job_status", { job_id: jobId });
+      const job = response.success ? response.result : null;
+      if (!job) {
+        onProgress("");
+        return null;
+      }
+      if (job.status === "queued" || job.status === "running") {
+        onProgress(describeJob(job));
+        continue;
+      }
+      onProgress("");
+      return job.status === "succeeded" ? job.result : null;
+    }
+  };
+
   useEffect(() => {
     async function loadDefaults() {
-      const homeDir = (
-        await serverAPI.callPluginMethod("get_users_home_dir", {})
-      ).result;
-      if (typeof homeDir === "string") {
-        setUsersHomeDir(homeDir);
+      // Everything is fetched in a single round trip
+      const response = await serverAPI.callPluginMethod<
+        { owner_id: string },
+        DashboardState | null
+      >("get_dashboard_state", {
+        owner_id: getCurrentSteamUserId(),
+      });
+      const dashboard = response.success ? response.result : null;
+      window.console.log("OpenGOAL dashboard state:", dashboard);
+      if (dashboard) {
+        setUsersHomeDir(dashboard.home_dir);
+        // Jak 1
+        setJak1Installed(dashboard.games.jak1.installed);
+        setJak1ISOExists(dashboard.games.jak1.iso_exists);
+        setJak1OutOfDate(dashboard.games.jak1.out_of_date);
+        setJak1ShortcutAlreadyExists(dashboard.games.jak1.shortcut_exists);
+        // Jak 2
+        setJak2Installed(dashboard.games.jak2.installed);
+        setJak2ISOExists(dashboard.games.jak2.iso_exists);
+        setJak2OutOfDate(dashboard.games.jak2.out_of_date);
+        setJak2ShortcutAlreadyExists(dashboard.games.jak2.shortcut_exists);
       }
-      // Jak 1
-      const isJak1Installed = (
-        await serverAPI.callPluginMethod("is_game_installed", { game: "jak1" })
-      ).result;
-      window.console.log(`Jak 1 Installed?: ${isJak1Installed}`);
-      setJak1Installed(!!isJak1Installed);
-      const jak1IsoExists = (
-        await serverAPI.callPluginMethod("does_iso_exist_for_installation", {
-          game: "jak1",
-        })
-      ).result;
-      window.console.log(`Jak 1 ISO Exists?: ${jak1IsoExists}`);
-      setJak1ISOExists(!!jak1IsoExists);
-      const jak1OutOfDate = (
-        await serverAPI.callPluginMethod("is_game_out_of_date", {
-          game: "jak1",
-        })
-      ).result;
-      window.console.log(`Jak 1 outOfDate?: ${jak1OutOfDate}`);
-      setJak1OutOfDate(!!jak1OutOfDate);
-      const jak1ShortcutAlreadyExists = (
-        await serverAPI.callPluginMethod("shortcut_already_created", {
-          owner_id: getCurrentSteamUserId(),
-          game: "jak1",
-        })
-      ).result;
-      window.console.log(
-        `Jak 1 shortcutAlreadyExists?: ${jak1ShortcutAlreadyExists}`
-      );
-      setJak1ShortcutAlreadyExists(!!jak1ShortcutAlreadyExists);
-
-      // Jak 2
-      const isJak2Installed = (
-        await serverAPI.callPluginMethod("is_game_installed", { game: "jak2" })
-      ).result;
-      window.console.log(`Jak 2 Installed?: ${isJak2Installed}`);
-      setJak2Installed(!!isJak2Installed);
-      const jak2IsoExists = (
-        await serverAPI.callPluginMethod("does_iso_exist_for_installation", {
-          game: "jak2",
-        })
-      ).result;
-      window.console.log(`Jak 2 ISO Exists?: ${jak2IsoExists}`);
-      setJak2ISOExists(!!jak2IsoExists);
-      const jak2OutOfDate = (
-        await serverAPI.callPluginMethod("is_game_out_of_date", {
-          game: "jak2",
-        })
-      ).result;
-      window.console.log(`Jak 2 outOfDate?: ${jak2OutOfDate}`);
-      setJak2OutOfDate(!!jak2OutOfDate);
-      const jak2ShortcutAlreadyExists = (
-        await serverAPI.callPluginMethod("shortcut_already_created", {
-          owner_id: getCurrentSteamUserId(),
-          game: "jak2",
-        })
-      ).result;
-      window.console.log(
-        `Jak 2 shortcutAlreadyExists?: ${jak2ShortcutAlreadyExists}`
-      );
-      setJak2ShortcutAlreadyExists(!!jak2ShortcutAlreadyExists);
       setComponentLoaded(true);
     }
     loadDefaults();
@@ -147,11 +213,7 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
         strOKButtonText={"Delete"}
         strDescription={"Are you sure you want to delete Jak 1?"}
         onOK={async () => {
-          const success = (
-            await serverAPI.callPluginMethod("remove_game", {
-              game: "jak1",
-            })
-          ).result;
+          const success = await runJob("remove_game", "jak1", () => {});
           if (success) {
             setJak1Installed(false);
           }
@@ -168,11 +230,7 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
         strOKButtonText={"Delete"}
         strDescription={"Are you sure you want to delete Jak 2?"}
         onOK={async () => {
-          const success = (
-            await serverAPI.callPluginMethod("remove_game", {
-              game: "jak2",
-            })
-          ).result;
+          const success = await runJob("remove_game", "jak2", () => {});
           if (success) {
             setJak1Installed(false);
           }
@@ -182,6 +240,9 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
   };
 
   const jak1InstallationHelperText = () => {
+    if (jak1Installing && jak1Progress) {
+      return `Jak 1: ${jak1Progress}`;
+    }
     if (jak1Installed) {
       if (jak1OutOfDate) {
         return `${usersHomeDir}/OpenGOAL/games/jak1 is out of date!`;
@@ -207,6 +268,9 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
   };
 
   const jak2InstallationHelperText = () => {
+    if (jak2Installing && jak2Progress) {
+      return `Jak 2: ${jak2Progress}`;
+    }
     if (jak2Installed) {
       if (jak2OutOfDate) {
         return `${usersHomeDir}/OpenGOAL/games/jak2 is out of date!`;
@@ -257,11 +321,11 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
                   onClick={async () => {
                     if (jak1OutOfDate) {
                       setJak1Installing(true);
-                      const success = (
-                        await serverAPI.callPluginMethod("update_game", {
-                          game: "jak1",
-                        })
-                      ).result;
+                      const success = await runJob(
+                        "update_game",
+                        "jak1",
+                        setJak1Progress
+                      );
                       setJak1Installing(false);
                       if (
                         success !== null &&
@@ -273,11 +337,11 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
                       }
                     } else {
                       setJak1Installing(true);
-                      const success = (
-                        await serverAPI.callPluginMethod("install_game", {
-                          game: "jak1",
-                        })
-                      ).result;
+                      const success = await runJob(
+                        "install_game",
+                        "jak1",
+                        setJak1Progress
+                      );
                       setJak1Installing(false);
                       if (
                         success !== null &&
@@ -336,11 +400,11 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
                   onClick={async () => {
                     if (jak2OutOfDate) {
                       setJak2Installing(true);
-                      const success = (
-                        await serverAPI.callPluginMethod("update_game", {
-                          game: "jak2",
-                        })
-                      ).result;
+                      const success = await runJob(
+                        "update_game",
+                        "jak2",
+                        setJak2Progress
+                      );
                       setJak2Installing(false);
                       if (
                         success !== null &&
@@ -352,11 +416,11 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
                       }
                     } else {
                       setJak2Installing(true);
-                      const success = (
-                        await serverAPI.callPluginMethod("install_game", {
-                          game: "jak2",
-                        })
-                      ).result;
+                      const success = await runJob(
+                        "install_game",
+                        "jak2",
+                        setJak2Progress
+                      );
                       setJak2Installing(false);
                       if (
                         success !== null &&
@@ -414,70 +478,8 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
                     })
                   ).result;
                   window.console.log(appId);
-                  if (appId !== null && appId !== undefined) {
-                    // Set small capsule
-                    const smallImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_small_image_as_base64",
-                        { game: "jak1" }
-                      )
-                    ).result;
-                    if (
-                      smallImageData !== null &&
-                      smallImageData !== undefined
-                    ) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        smallImageData,
-                        "png",
-                        0
-                      );
-                    }
-                    // Set wide capsule
-                    const wideImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_wide_image_as_base64",
-                        { game: "jak1" }
-                      )
-                    ).result;
-                    if (wideImageData !== null && wideImageData !== undefined) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        wideImageData,
-                        "png",
-                        3
-                      );
-                    }
-                    // Set hero
-                    const heroImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_hero_image_as_base64",
-                        { game: "jak1" }
-                      )
-                    ).result;
-                    if (heroImageData !== null && heroImageData !== undefined) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        heroImageData,
-                        "png",
-                        1
-                      );
-                    }
-                    // Set logo
-                    const logoImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_logo_image_as_base64",
-                        { game: "jak1" }
-                      )
-                    ).result;
-                    if (logoImageData !== null && logoImageData !== undefined) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        logoImageData,
-                        "png",
-                        2
-                      );
-                    }
+                  if (typeof appId === "number") {
+                    await setShortcutArtwork(appId, "jak1");
                     // NOTE - icon is set in the shortcut!
                     showRestartConfirm();
                   }
@@ -506,70 +508,8 @@ const Content: VFC<{ serverAPI: ServerAPI }> = ({ serverAPI }) => {
                     })
                   ).result;
                   window.console.log(appId);
-                  if (appId !== null && appId !== undefined) {
-                    // Set small capsule
-                    const smallImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_small_image_as_base64",
-                        { game: "jak2" }
-                      )
-                    ).result;
-                    if (
-                      smallImageData !== null &&
-                      smallImageData !== undefined
-                    ) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        smallImageData,
-                        "png",
-                        0
-                      );
-                    }
-                    // Set wide capsule
-                    const wideImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_wide_image_as_base64",
-                        { game: "jak2" }
-                      )
-                    ).result;
-                    if (wideImageData !== null && wideImageData !== undefined) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        wideImageData,
-                        "png",
-                        3
-                      );
-                    }
-                    // Set hero
-                    const heroImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_hero_image_as_base64",
-                        { game: "jak2" }
-                      )
-                    ).result;
-                    if (heroImageData !== null && heroImageData !== undefined) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        heroImageData,
-                        "png",
-                        1
-                      );
-                    }
-                    // Set logo
-                    const logoImageData = (
-                      await serverAPI.callPluginMethod(
-                        "read_logo_image_as_base64",
-                        { game: "jak2" }
-                      )
-                    ).result;
-                    if (logoImageData !== null && logoImageData !== undefined) {
-                      await SteamClient.Apps.SetCustomArtworkForApp(
-                        appId,
-                        logoImageData,
-                        "png",
-                        2
-                      );
-                    }
+                  if (typeof appId === "number") {
+                    await setShortcutArtwork(appId, "jak2");
                     // NOTE - icon is set in the shortcut!
                     showRestartConfirm();
                   }
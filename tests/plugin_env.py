@@ -0,0 +1,23 @@
+"""
+Points the `decky_plugin` stand-in at a temporary home before `main` is
+imported, so every test module shares the one `main` and home directory.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+# The decky_plugin and helpers stand-ins
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "benchmarks"))
+
+home = tempfile.mkdtemp(prefix="opengoal-tests-")
+os.environ["DECKY_USER_HOME"] = home
+os.environ["DECKY_HOME"] = os.path.join(home, "homebrew")
+os.environ["DECKY_PLUGIN_LOG"] = os.path.join(home, "plugin.log")
+atexit.register(shutil.rmtree, home, ignore_errors=True)
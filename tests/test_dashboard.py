@@ -0,0 +1,80 @@
+"""
+The panel's `get_dashboard_state` round trip, in `main`.
+
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import shutil
+import unittest
+from unittest import mock
+
+import plugin_env
+import main  # noqa: E402
+import vdf  # noqa: E402
+
+
+class DashboardTest(unittest.TestCase):
+    def setUp(self):
+        self.games_dir = os.path.join(plugin_env.home, "OpenGOAL", "games")
+        for game in main.GAMES:
+            os.makedirs(os.path.join(self.games_dir, game), exist_ok=True)
+        self.addCleanup(shutil.rmtree, self.games_dir)
+        patcher = mock.patch.object(main, "_latest_version_impl", lambda: "v0.2.0")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def dashboard(self):
+        return asyncio.run(main.Plugin().get_dashboard_state("123"))
+
+    def test_unreadable_version_only_fails_that_field(self):
+        with open(os.path.join(self.games_dir, "jak1", "version.json"), "w") as f:
+            f.write('{"version": "v0.1.0"}')
+        # Empty, as if the game's install was interrupted
+        open(os.path.join(self.games_dir, "jak2", "version.json"), "w").close()
+        games = self.dashboard()["games"]
+        self.assertEqual(games["jak1"]["version"], "v0.1.0")
+        self.assertTrue(games["jak1"]["out_of_date"])
+        self.assertIsNone(games["jak2"]["version"])
+        self.assertTrue(games["jak2"]["installed"])
+        self.assertFalse(games["jak2"]["out_of_date"])
+
+    def test_shortcuts_are_read_live(self):
+        shortcut = {"AppName": main.SHORTCUT_NAMES["jak2"]}
+        self.write_shortcuts(vdf.binary_dumps({"shortcuts": {"0": shortcut}}))
+        # Stale: the user has since swapped one shortcut for the other in Steam
+        main.state.set("shortcuts:123", {"jak1": True, "jak2": False})
+        self.addCleanup(main.state.set, "shortcuts:123", None)
+        games = self.dashboard()["games"]
+        self.assertFalse(games["jak1"]["shortcut_exists"])
+        self.assertTrue(games["jak2"]["shortcut_exists"])
+
+    def write_shortcuts(self, data):
+        config = main.get_userdata_config("123")
+        os.makedirs(config, exist_ok=True)
+        self.addCleanup(shutil.rmtree, main.get_steam_userdata())
+        with open(config / "shortcuts.vdf", "wb") as f:
+            f.write(data)
+
+    def test_shortcuts_fall_back_to_snapshot(self):
+        # shortcuts.vdf can't be parsed, so only the snapshot can answer
+        self.write_shortcuts(b"\x00shortcuts\x00\x00")
+        main.state.set("shortcuts:123", {"jak1": True, "jak2": False})
+        self.addCleanup(main.state.set, "shortcuts:123", None)
+        with self.assertLogs(main.decky_plugin.logger, "ERROR"):
+            games = self.dashboard()["games"]
+        self.assertTrue(games["jak1"]["shortcut_exists"])
+        self.assertFalse(games["jak2"]["shortcut_exists"])
+
+    def test_no_shortcuts_file_means_no_shortcuts(self):
+        main.state.set("shortcuts:123", {"jak1": True, "jak2": True})
+        self.addCleanup(main.state.set, "shortcuts:123", None)
+        with self.assertNoLogs(main.decky_plugin.logger, "ERROR"):
+            games = self.dashboard()["games"]
+        self.assertFalse(games["jak1"]["shortcut_exists"])
+        self.assertFalse(games["jak2"]["shortcut_exists"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Ranged downloads, resuming them and re-resolving expired redirects, in
+`downloader.RangedDownloader`, against the local Range stand-in.
+
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import plugin_env  # noqa: F401 (module paths)
+import range_server  # noqa: E402
+from downloader import RangedDownloader  # noqa: E402
+
+CHUNK_SIZE = 64 * 1024
+PAYLOAD = os.urandom(4 * CHUNK_SIZE + 123)
+
+
+class RecordingHandler(range_server.RangeRequestHandler):
+    # Remembers the Range of every request for the payload
+    requests = None
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("Range")))
+        super().do_GET()
+
+
+class ExpiringHandler(RecordingHandler):
+    # Like GitHub's signed CDN URLs, each redirect target stops working after
+    # a while, here after the probe and two chunks
+    uses = None
+
+    def do_GET(self):
+        if self.path == "/asset":
+            token = len(self.uses)
+            self.uses.append(0)
+            self.send_response(302)
+            self.send_header("Location", "/signed/{}".format(token))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        token = int(self.path.rsplit("/", 1)[1])
+        self.uses[token] += 1
+        if self.uses[token] > 3:
+            self.send_error(403, "Request has expired")
+            return
+        self.path = "/asset"
+        super().do_GET()
+
+
+class DownloaderTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.dest = os.path.join(self.tmp, "asset.tar.gz")
+        self.requests = []
+        self.uses = []
+        # No need to actually wait between retries
+        patcher = mock.patch("downloader.time.sleep")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def serve(self, handler):
+        handler = type(
+            "Handler", (handler,), {"requests": self.requests, "uses": self.uses}
+        )
+        server = range_server.serve({"/asset": PAYLOAD}, handler=handler)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return range_server.base_url(server) + "/asset"
+
+    def download(self, url):
+        downloader = RangedDownloader(chunk_size=CHUNK_SIZE)
+        self.addCleanup(downloader.http.close)
+        return downloader.download(url, self.dest)
+
+    def read_dest(self):
+        with open(self.dest, mode="rb") as f:
+            return f.read()
+
+    def test_download(self):
+        self.download(self.serve(RecordingHandler))
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        self.assertFalse(os.path.exists(self.dest + ".part.json"))
+
+    def test_resume_skips_finished_chunks(self):
+        url = self.serve(RecordingHandler)
+        with open(self.dest + ".part", mode="wb") as f:
+            f.write(PAYLOAD[:CHUNK_SIZE])
+        with open(self.dest + ".part.json", mode="w") as f:
+            state = {
+                "url": url,
+                "size": len(PAYLOAD),
+                "etag": '"{}"'.format(len(PAYLOAD)),
+                "chunk_size": CHUNK_SIZE,
+                "done": [0],
+            }
+            f.write(json.dumps(state))
+        self.download(url)
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        ranges = [r for _, r in self.requests[1:]]
+        self.assertNotIn("bytes=0-{}".format(CHUNK_SIZE - 1), ranges)
+        self.assertEqual(len(ranges), 4)
+
+    def test_resume_ignores_a_different_resource(self):
+        url = self.serve(RecordingHandler)
+        with open(self.dest + ".part", mode="wb") as f:
+            f.write(b"\0" * len(PAYLOAD))
+        with open(self.dest + ".part.json", mode="w") as f:
+            state = {"url": url, "size": len(PAYLOAD), "etag": '"stale"'}
+            f.write(json.dumps(dict(state, chunk_size=CHUNK_SIZE, done=[0, 1])))
+        self.download(url)
+        self.assertEqual(self.read_dest(), PAYLOAD)
+
+    def test_expired_redirect_is_resolved_again(self):
+        self.download(self.serve(ExpiringHandler))
+        self.assertEqual(self.read_dest(), PAYLOAD)
+        self.assertGreater(len(self.uses), 1)
+
+    def test_chunk_data_is_synced_before_it_is_recorded(self):
+        events = []
+        fsync = os.fsync
+        save_state = RangedDownloader._save_state
+
+        def record_fsync(fd):
+            events.append("fsync")
+            fsync(fd)
+
+        def record_save(downloader, state_file, state):
+            events.append("save")
+            save_state(downloader, state_file, state)
+
+        with mock.patch("downloader.os.fsync", record_fsync), mock.patch.object(
+            RangedDownloader, "_save_state", record_save
+        ):
+            self.download(self.serve(RecordingHandler))
+        self.assertEqual(events, ["fsync", "save"] * 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
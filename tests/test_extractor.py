@@ -0,0 +1,61 @@
+"""
+Reading the extractor's output and cancelling it, in `extractor`.
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), "..", "defaults", "py_modules")
+)
+
+import extractor  # noqa: E402
+from extractor import ExtractorCancelled, ExtractorRun, run_extractor  # noqa: E402
+
+
+def shell(script, run, cancel_event=None):
+    return run_extractor(["sh", "-c", script], tempfile.gettempdir(), run, cancel_event)
+
+
+class ExtractorTest(unittest.TestCase):
+    def test_overlong_line_is_truncated(self):
+        run = ExtractorRun()
+        size = extractor.MAX_LINE_LENGTH + 4096
+        code = shell(
+            "head -c {} /dev/zero | tr '\\0' a; echo; echo done".format(size), run
+        )
+        self.assertEqual(code, 0)
+        first, last = run.stdout
+        self.assertTrue(first.endswith("...<4096 more bytes>"))
+        self.assertEqual(
+            len(first), extractor.MAX_LINE_LENGTH + len("...<4096 more bytes>")
+        )
+        self.assertEqual(last, "done")
+
+    def test_carriage_returns_split_lines(self):
+        run = ExtractorRun()
+        shell("printf 'Extracting 10%%\\rExtracting 50%%\\r\\n'; echo oops >&2", run)
+        self.assertEqual(list(run.stdout), ["Extracting 10%", "Extracting 50%"])
+        self.assertEqual(list(run.stderr), ["oops"])
+        self.assertEqual((run.phase, run.percent), ("extract", 50.0))
+
+    def test_cancel_does_not_wait_for_escaped_pipe_holders(self):
+        kill_timeout, extractor.KILL_TIMEOUT = extractor.KILL_TIMEOUT, 0.5
+        self.addCleanup(setattr, extractor, "KILL_TIMEOUT", kill_timeout)
+        cancel_event = threading.Event()
+        threading.Timer(0.5, cancel_event.set).start()
+        started = time.monotonic()
+        # The setsid'd sleep leaves the process group but keeps stdout open
+        with self.assertRaises(ExtractorCancelled):
+            shell("setsid sleep 3 & sleep 30", ExtractorRun(), cancel_event)
+        self.assertLess(time.monotonic() - started, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Installing a game from a release served by the local Range stand-in, in
+`main._install_game_impl`.
+
+    python -m unittest discover tests
+"""
+
+import hashlib
+import io
+import json
+import os
+import tarfile
+import unittest
+from unittest import mock
+
+import plugin_env
+import main  # noqa: E402
+import range_server  # noqa: E402
+
+RELEASE_PATH = "/repos/open-goal/jak-project/releases/latest"
+
+
+def tarball(members):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as tar:
+        for name, data, mode in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = mode
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+GOOD_ASSET = (
+    ("extractor", b"#!/bin/sh\nexit 0\n", 0o755),
+    ("gk", b"#!/bin/sh\n", 0o755),
+)
+
+
+class InstallTest(unittest.TestCase):
+    def setUp(self):
+        self.files = {}
+        self.server = range_server.serve(self.files)
+        self.addCleanup(self.server.shutdown)
+        patcher = mock.patch.object(
+            main.release_client,
+            "url",
+            range_server.base_url(self.server) + RELEASE_PATH,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.game_dir = os.path.join(plugin_env.home, "OpenGOAL", "games", "jak1")
+
+    def publish(self, tag, data, digest=None):
+        name = "opengoal-linux-{}.tar.gz".format(tag)
+        path = "/download/{}/{}".format(tag, name)
+        self.files[path] = data
+        asset = {
+            "name": name,
+            "size": len(data),
+            "browser_download_url": range_server.base_url(self.server) + path,
+            "digest": digest or "sha256:" + hashlib.sha256(data).hexdigest(),
+        }
+        release = {"tag_name": tag, "assets": [asset]}
+        self.files[RELEASE_PATH] = json.dumps(release).encode("utf-8")
+
+    def assert_not_installed(self):
+        self.assertFalse(main._is_game_installed_impl("jak1"))
+        self.assertFalse(os.path.exists(self.game_dir + ".unpacking"))
+
+    def test_install(self):
+        self.publish("v0.9.1", tarball(GOOD_ASSET))
+        self.assertTrue(main._install_game_impl("jak1"))
+        self.assertEqual(main._installed_version_impl("jak1"), "v0.9.1")
+        self.assertTrue(os.access(os.path.join(self.game_dir, "gk"), os.X_OK))
+
+    def test_digest_mismatch_leaves_nothing_installed(self):
+        self.publish("v0.9.2", tarball(GOOD_ASSET), digest="sha256:" + "0" * 64)
+        self.assertIsNone(main._install_game_impl("jak1"))
+        self.assert_not_installed()
+
+    def test_members_outside_the_game_directory_are_refused(self):
+        self.publish("v0.9.3", tarball(GOOD_ASSET + (("../evil", b"", 0o644),)))
+        self.assertIsNone(main._install_game_impl("jak1"))
+        self.assert_not_installed()
+        self.assertFalse(os.path.exists(os.path.join(self.game_dir, "..", "evil")))
+
+
+if __name__ == "__main__":
+    unittest.main()
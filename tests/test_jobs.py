@@ -0,0 +1,145 @@
+"""
+Cancellation and queueing of background jobs, in `jobs.JobManager` and in how
+`main` wires installs, updates and removals to it.
+
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import threading
+import unittest
+
+import plugin_env
+import main  # noqa: E402
+from jobs import (  # noqa: E402
+    CANCELLED,
+    SUCCEEDED,
+    Job,
+    JobCancelled,
+    JobConflict,
+    JobManager,
+)
+
+TIMEOUT = 10
+
+
+def blocking_job(release):
+    def run(job):
+        release.wait(TIMEOUT)
+        return True
+
+    return run
+
+
+def wait_finished(job):
+    for _ in range(TIMEOUT * 100):
+        if job.finished_at is not None:
+            return
+        threading.Event().wait(0.01)
+    raise AssertionError("{} of {} never finished".format(job.kind, job.game))
+
+
+class JobManagerTest(unittest.TestCase):
+    def setUp(self):
+        self.manager = JobManager()
+        self.release = threading.Event()
+        self.addCleanup(self.manager.shutdown)
+        self.addCleanup(self.release.set)
+
+    def test_cancelled_while_queued_skips_cleanup(self):
+        calls = []
+        blocker = self.manager.submit("install", "jak1", blocking_job(self.release))
+        queued = self.manager.submit(
+            "update",
+            "jak2",
+            lambda job: calls.append("run"),
+            lambda job: calls.append("cleanup"),
+        )
+        self.assertTrue(self.manager.cancel(queued.id))
+        self.release.set()
+        wait_finished(blocker)
+        wait_finished(queued)
+        self.assertEqual(queued.status, CANCELLED)
+        self.assertEqual(calls, [])
+
+    def test_cancelled_while_running_cleans_up(self):
+        calls = []
+        started = threading.Event()
+
+        def run(job):
+            started.set()
+            job.cancel_event.wait(TIMEOUT)
+            job.check_cancelled()
+
+        job = self.manager.submit(
+            "install", "jak1", run, lambda job: calls.append("cleanup")
+        )
+        self.assertTrue(started.wait(TIMEOUT))
+        self.manager.cancel(job.id)
+        wait_finished(job)
+        self.assertEqual(job.status, CANCELLED)
+        self.assertEqual(calls, ["cleanup"])
+
+    def test_same_kind_reuses_active_job(self):
+        job = self.manager.submit("install", "jak1", blocking_job(self.release))
+        self.assertIs(self.manager.submit("install", "jak1", lambda job: True), job)
+
+    def test_other_kind_conflicts_with_active_job(self):
+        job = self.manager.submit("remove", "jak1", blocking_job(self.release))
+        with self.assertRaises(JobConflict) as raised:
+            self.manager.submit("install", "jak1", lambda job: True)
+        self.assertIs(raised.exception.job, job)
+
+    def test_other_game_is_queued(self):
+        self.manager.submit("remove", "jak1", blocking_job(self.release))
+        job = self.manager.submit("install", "jak2", lambda job: True)
+        self.release.set()
+        wait_finished(job)
+        self.assertEqual(job.status, SUCCEEDED)
+
+
+class GameJobTest(unittest.TestCase):
+    def setUp(self):
+        self.game_dir = os.path.join(plugin_env.home, "OpenGOAL", "games", "jak2")
+        os.makedirs(self.game_dir, exist_ok=True)
+        with open(os.path.join(self.game_dir, "version.json"), mode="w") as f:
+            f.write('{"version": "v0.1.0"}')
+        self.release = threading.Event()
+        self.manager = JobManager()
+        self.addCleanup(self.manager.shutdown)
+        self.addCleanup(self.release.set)
+
+    def test_queued_update_cancel_keeps_installed_game(self):
+        self.manager.submit("install", "jak1", blocking_job(self.release))
+        update = self.manager.submit(
+            "update",
+            "jak2",
+            main._game_job(main._update_game_impl, "jak2"),
+            main._cleanup_cancelled,
+        )
+        self.manager.cancel(update.id)
+        self.release.set()
+        wait_finished(update)
+        self.assertEqual(update.status, CANCELLED)
+        self.assertTrue(os.path.exists(os.path.join(self.game_dir, "version.json")))
+
+    def test_update_cancelled_before_removing_keeps_installed_game(self):
+        job = Job("update", "jak2")
+        job.cancel()
+        with self.assertRaises(JobCancelled):
+            main._update_game_impl("jak2", job)
+        main._cleanup_cancelled(job)
+        self.assertTrue(os.path.exists(os.path.join(self.game_dir, "version.json")))
+
+    def test_install_during_remove_is_refused(self):
+        manager, main.job_manager = main.job_manager, self.manager
+        self.addCleanup(setattr, main, "job_manager", manager)
+        remove = self.manager.submit("remove", "jak2", blocking_job(self.release))
+        plugin = main.Plugin()
+        self.assertIsNone(asyncio.run(plugin.install_game("jak2")))
+        self.assertEqual(asyncio.run(plugin.remove_game("jak2")), remove.id)
+
+
+if __name__ == "__main__":
+    unittest.main()
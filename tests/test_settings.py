@@ -0,0 +1,55 @@
+"""
+Reading the optional settings.json, in `main.get_settings`.
+
+    python -m unittest discover tests
+"""
+
+import json
+import os
+import unittest
+
+import plugin_env  # noqa: F401 (sets up `main`'s home)
+import main  # noqa: E402
+from refresher import DEFAULT_INTERVAL, DEFAULT_MAX_BACKOFF  # noqa: E402
+
+
+class SettingsTest(unittest.TestCase):
+    def setUp(self):
+        os.makedirs(main.decky_plugin.DECKY_PLUGIN_SETTINGS_DIR, exist_ok=True)
+        self.settings_file = os.path.join(
+            main.decky_plugin.DECKY_PLUGIN_SETTINGS_DIR, "settings.json"
+        )
+        self.addCleanup(os.remove, self.settings_file)
+
+    def write(self, settings):
+        with open(self.settings_file, mode="w") as f:
+            f.write(json.dumps(settings))
+
+    def test_overrides_are_converted_to_seconds(self):
+        self.write({"update_check_interval": "600", "update_check_max_backoff": 60})
+        self.assertEqual(
+            main.get_settings(),
+            {"update_check_interval": 600.0, "update_check_max_backoff": 60.0},
+        )
+
+    def test_invalid_overrides_fall_back_to_defaults(self):
+        for value in (None, "hourly", 0, -5, True, [60]):
+            self.write({"update_check_interval": value, "update_check_max_backoff": 1})
+            with self.assertLogs(main.decky_plugin.logger, "ERROR"):
+                settings = main.get_settings()
+            self.assertEqual(settings["update_check_interval"], DEFAULT_INTERVAL)
+            self.assertEqual(settings["update_check_max_backoff"], 1.0)
+
+    def test_not_an_object(self):
+        self.write(["update_check_interval"])
+        self.assertEqual(
+            main.get_settings(),
+            {
+                "update_check_interval": DEFAULT_INTERVAL,
+                "update_check_max_backoff": DEFAULT_MAX_BACKOFF,
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+"""
+Batched shortcut changes, in `main._plan_shortcut_operations` and the
+`apply_shortcut_operations` RPC, against a temporary `shortcuts.vdf`.
+
+    python -m unittest discover tests
+"""
+
+import asyncio
+import os
+import shutil
+import unittest
+from unittest import mock
+
+import plugin_env  # noqa: F401 (sets up `main`'s home)
+import main  # noqa: E402
+import vdf  # noqa: E402
+
+OWNER = "456"
+STEAM_SHORTCUT = {"appid": -1, "AppName": "Celeste", "Exe": '"/celeste"'}
+
+
+def statuses(results):
+    return [(r["op"], r["game"], r["status"]) for r in results]
+
+
+class ShortcutOperationsTest(unittest.TestCase):
+    def setUp(self):
+        config = main.get_userdata_config(OWNER)
+        os.makedirs(config, exist_ok=True)
+        self.addCleanup(shutil.rmtree, main.get_steam_userdata())
+        self.path = config / "shortcuts.vdf"
+        self.write({"0": STEAM_SHORTCUT})
+
+    def write(self, shortcuts):
+        with open(self.path, mode="wb") as f:
+            f.write(vdf.binary_dumps({"shortcuts": shortcuts}))
+
+    def shortcuts(self):
+        with open(self.path, mode="rb") as f:
+            return vdf.binary_load(f)["shortcuts"]
+
+    def apply(self, *operations):
+        return main._apply_shortcut_operations_impl(
+            OWNER, [dict(zip(("op", "game"), op)) for op in operations]
+        )
+
+    def test_create(self):
+        key, jak1 = main._shortcut_definition("jak1")
+        results = self.apply(("create", "jak1"))
+        self.assertEqual(statuses(results), [("create", "jak1", "created")])
+        self.assertEqual(results[0]["app_id"], jak1["appid"])
+        self.assertEqual(self.shortcuts(), {"0": STEAM_SHORTCUT, key: jak1})
+        self.assertEqual(
+            main.state.get("shortcuts:" + OWNER), {"jak1": True, "jak2": False}
+        )
+
+    def test_create_existing(self):
+        self.write(
+            {
+                "0": STEAM_SHORTCUT,
+                "7": {"appid": -7, "AppName": main.SHORTCUT_NAMES["jak1"]},
+            }
+        )
+        results = self.apply(("create", "jak1"))
+        self.assertEqual(statuses(results), [("create", "jak1", "exists")])
+        self.assertEqual(results[0]["app_id"], -7)
+
+    def test_update(self):
+        _, jak1 = main._shortcut_definition("jak1")
+        stale = dict(jak1, appid=-7, Exe="/old/gk", LastPlayTime=99)
+        self.write({"0": STEAM_SHORTCUT, "7": stale})
+        results = self.apply(("update", "jak1"))
+        self.assertEqual(statuses(results), [("update", "jak1", "updated")])
+        # Managed fields are refreshed, the app id and Steam's own are kept
+        self.assertEqual(self.shortcuts()["7"], dict(jak1, appid=-7, LastPlayTime=99))
+        results = self.apply(("update", "jak1"))
+        self.assertEqual(statuses(results), [("update", "jak1", "unchanged")])
+        self.assertEqual(results[0]["app_id"], -7)
+
+    def test_remove(self):
+        self.apply(("create", "jak1"))
+        results = self.apply(("remove", "jak1"))
+        self.assertEqual(statuses(results), [("remove", "jak1", "removed")])
+        self.assertEqual(self.shortcuts(), {"0": STEAM_SHORTCUT})
+
+    def test_missing(self):
+        results = self.apply(("update", "jak2"), ("remove", "jak2"))
+        self.assertEqual(
+            statuses(results),
+            [("update", "jak2", "missing"), ("remove", "jak2", "missing")],
+        )
+
+    def test_invalid(self):
+        results = self.apply(("rename", "jak1"), ("create", "jak3"), ("create",))
+        self.assertEqual(
+            statuses(results),
+            [
+                ("rename", "jak1", "invalid"),
+                ("create", "jak3", "invalid"),
+                ("create", None, "invalid"),
+            ],
+        )
+        self.assertEqual(self.shortcuts(), {"0": STEAM_SHORTCUT})
+
+    def test_batch_sees_its_own_changes(self):
+        results = self.apply(("create", "jak2"), ("create", "jak2"), ("remove", "jak2"))
+        self.assertEqual(
+            [r["status"] for r in results], ["created", "exists", "removed"]
+        )
+        self.assertEqual(self.shortcuts(), {"0": STEAM_SHORTCUT})
+
+    def test_nothing_is_applied_if_the_write_fails(self):
+        main.state.set("shortcuts:" + OWNER, {"jak1": False, "jak2": False})
+        self.addCleanup(main.state.set, "shortcuts:" + OWNER, None)
+        with mock.patch("shortcuts.write_atomic", side_effect=OSError("disk full")):
+            result = asyncio.run(
+                main.Plugin().apply_shortcut_operations(
+                    OWNER, [{"op": "create", "game": "jak1"}]
+                )
+            )
+        self.assertIsNone(result)
+        self.assertEqual(self.shortcuts(), {"0": STEAM_SHORTCUT})
+        self.assertEqual(
+            main.state.get("shortcuts:" + OWNER), {"jak1": False, "jak2": False}
+        )
+        self.assertEqual(
+            main.shortcuts_cache.load(OWNER, self.path),
+            {"shortcuts": {"0": STEAM_SHORTCUT}},
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
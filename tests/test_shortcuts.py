@@ -0,0 +1,139 @@
+"""
+Writing the user's Steam `shortcuts.vdf`, in `shortcuts.write_atomic` and
+`shortcuts.ShortcutsCache.apply`.
+
+    python -m unittest discover tests
+"""
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+import plugin_env  # noqa: F401 (module paths)
+import vdf  # noqa: E402
+from shortcuts import ShortcutsCache, ShortcutsChangedError, write_atomic  # noqa: E402
+
+
+def steam_shortcut(name):
+    # The fields Steam writes, ending in the (empty) tags mapping
+    return {
+        "appid": -123456,
+        "AppName": name,
+        "Exe": '"/home/deck/{}"'.format(name),
+        "StartDir": '"/home/deck/"',
+        "IsHidden": 0,
+        "LastPlayTime": 0,
+        "tags": {},
+    }
+
+
+class ShortcutsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.path = os.path.join(self.tmp, "shortcuts.vdf")
+        self.cache = ShortcutsCache()
+
+    def write(self, table):
+        data = vdf.binary_dumps(table)
+        with open(self.path, mode="wb") as f:
+            f.write(data)
+        return data
+
+    def read(self):
+        with open(self.path, mode="rb") as f:
+            return f.read()
+
+    def test_new_shortcut_is_spliced_into_a_steam_file(self):
+        original = self.write({"shortcuts": {"0": steam_shortcut("Celeste")}})
+        self.assertTrue(original.endswith(b"\x08\x08\x08\x08"))
+        added = steam_shortcut("Jak 1")
+        with mock.patch("shortcuts.binary_dumps", wraps=vdf.binary_dumps) as dumps:
+            self.cache.add_shortcut("123", self.path, "1", added)
+        # Only the new entry was encoded
+        dumps.assert_called_once_with({"1": added})
+        data = self.read()
+        # Steam's bytes are kept as they were, the new entry goes before the
+        # end markers of "shortcuts" and the root
+        self.assertEqual(
+            data,
+            original[:-2] + vdf.binary_dumps({"1": added})[:-1] + b"\x08\x08",
+        )
+        self.assertEqual(
+            vdf.binary_loads(data),
+            {"shortcuts": {"0": steam_shortcut("Celeste"), "1": added}},
+        )
+        self.assertEqual(self.cache.load("123", self.path), vdf.binary_loads(data))
+
+    def test_replacing_an_existing_key_rewrites_the_table(self):
+        self.write({"shortcuts": {"0": steam_shortcut("Old")}})
+        self.cache.add_shortcut("123", self.path, "0", steam_shortcut("New"))
+        self.assertEqual(
+            self.read(), vdf.binary_dumps({"shortcuts": {"0": steam_shortcut("New")}})
+        )
+
+    def test_extra_top_level_keys_rewrite_the_table(self):
+        self.write({"shortcuts": {}, "other": {"a": "b"}})
+        self.cache.add_shortcut("123", self.path, "0", steam_shortcut("Jak 1"))
+        self.assertEqual(
+            vdf.binary_loads(self.read()),
+            {"shortcuts": {"0": steam_shortcut("Jak 1")}, "other": {"a": "b"}},
+        )
+
+    def test_removal_rewrites_the_table(self):
+        self.write({"shortcuts": {"0": steam_shortcut("A"), "1": steam_shortcut("B")}})
+        self.cache.apply("123", self.path, lambda shortcuts: {"0": None})
+        self.assertEqual(
+            vdf.binary_loads(self.read()), {"shortcuts": {"1": steam_shortcut("B")}}
+        )
+
+    def test_concurrent_change_is_not_overwritten(self):
+        self.write({"shortcuts": {}})
+        steam = vdf.binary_dumps({"shortcuts": {"0": steam_shortcut("By Steam")}})
+
+        def plan(shortcuts):
+            # Steam saves its own change between our read and our write
+            with open(self.path, mode="wb") as f:
+                f.write(steam)
+            return {"1": steam_shortcut("Jak 1")}
+
+        with self.assertRaises(ShortcutsChangedError):
+            self.cache.apply("123", self.path, plan)
+        self.assertEqual(self.read(), steam)
+        self.assertEqual(os.listdir(self.tmp), ["shortcuts.vdf"])
+
+    def test_missing_file_is_created(self):
+        self.cache.add_shortcut("123", self.path, "0", steam_shortcut("Jak 1"))
+        self.assertEqual(
+            vdf.binary_loads(self.read()), {"shortcuts": {"0": steam_shortcut("Jak 1")}}
+        )
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+    def test_create_does_not_clobber_a_file_that_appeared(self):
+        steam = vdf.binary_dumps({"shortcuts": {"0": steam_shortcut("By Steam")}})
+
+        def plan(shortcuts):
+            with open(self.path, mode="wb") as f:
+                f.write(steam)
+            return {"0": steam_shortcut("Jak 1")}
+
+        with self.assertRaises(ShortcutsChangedError):
+            self.cache.apply("123", self.path, plan)
+        self.assertEqual(self.read(), steam)
+        with self.assertRaises(ShortcutsChangedError):
+            write_atomic(self.path, b"", create=True)
+        self.assertEqual(self.read(), steam)
+        self.assertEqual(os.listdir(self.tmp), ["shortcuts.vdf"])
+
+    def test_file_mode_is_kept(self):
+        self.write({"shortcuts": {}})
+        os.chmod(self.path, 0o600)
+        self.cache.add_shortcut("123", self.path, "0", steam_shortcut("Jak 1"))
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+"""
+Differential tests of the rewritten `vdf` parsers against the original ones
+kept in `benchmarks/vdf_reference.py`, on generated fixtures and on
+truncated, corrupted and fuzzed copies of them.
+
+    python -m unittest discover tests
+"""
+
+import io
+import random
+import tempfile
+import unittest
+
+import plugin_env  # noqa: F401 (module paths)
+import vdf  # noqa: E402
+import vdf_reference  # noqa: E402
+from bench_vdf import make_shortcuts  # noqa: E402
+from bench_vdf_text import make_localconfig, make_multiline_value  # noqa: E402
+
+TEXT_SAMPLES = (
+    make_localconfig(3),
+    make_multiline_value(5),
+    '// comment\n"a" { "b" "c" }\n"d"\n{\n"e" "f\\\\g\\"h"\n}\nkey val // x\n',
+)
+
+FUZZ_CHARS = '"{}/\\ \t\nab#$\r\ufeff'
+
+ESCAPE_CHARS = "\n\t\v\b\r\f\a\\?\"'ab {}"
+
+
+def typed_sample():
+    # Every binary type, including a hand-encoded wide string
+    data = vdf.binary_dumps(
+        {
+            "root": {
+                "u64": vdf.UINT_64(2**63 + 5),
+                "i64": vdf.INT_64(-(2**62)),
+                "float": 0.5,
+                "pointer": vdf.POINTER(7),
+                "color": vdf.COLOR(-1),
+                "nested": {"deeper": {"value": "x"}},
+            }
+        }
+    )
+    wide = (
+        vdf.BIN_WIDESTRING
+        + b"wide"
+        + vdf.BIN_NONE
+        + "wïde".encode("utf-16")
+        + vdf.BIN_NONE * 2
+    )
+    return wide + data
+
+
+def binary_load_both(data, **kwargs):
+    # What each parser returns (and where it leaves the file), or what it raises
+    results = []
+    for load in (vdf_reference.binary_load, vdf.binary_load):
+        fp = io.BytesIO(data)
+        try:
+            results.append((load(fp, **kwargs), fp.tell()))
+        except Exception as e:
+            results.append(type(e))
+    return results
+
+
+def text_load_both(text, **kwargs):
+    results = []
+    for parse in (vdf_reference.parse, vdf.parse):
+        try:
+            results.append(parse(io.StringIO(text), **kwargs))
+        except SyntaxError as e:
+            results.append(("SyntaxError", e.msg))
+    return results
+
+
+def random_tree(rng, depth=0):
+    tree = {}
+    for _ in range(rng.randint(0, 6)):
+        key = "".join(rng.choice(ESCAPE_CHARS) for _ in range(rng.randint(0, 5)))
+        roll = rng.random()
+        if roll < 0.25 and depth < 3:
+            tree[key] = random_tree(rng, depth + 1)
+        elif roll < 0.35:
+            tree[key] = rng.choice([0, -7, 1.5, vdf.UINT_64(2**40), vdf.COLOR(5)])
+        else:
+            tree[key] = "".join(
+                rng.choice(ESCAPE_CHARS) for _ in range(rng.randint(0, 12))
+            )
+    if rng.random() < 0.2:
+        tree[rng.randint(0, 99)] = "int key"
+    return tree
+
+
+class BinaryParserTest(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = random.Random(1)
+        for data in (typed_sample(), vdf.binary_dumps(make_shortcuts(20))):
+            variants = [data, data + b"trailing"]
+            # Truncated and corrupted copies must fail (or succeed) the same way
+            for _ in range(200):
+                variants.append(data[: rng.randint(0, len(data))])
+                corrupted = bytearray(data)
+                corrupted[rng.randrange(len(data))] = rng.randrange(256)
+                variants.append(bytes(corrupted))
+            for variant in variants:
+                for kwargs in ({}, {"raise_on_remaining": True}, {"alt_format": True}):
+                    reference, fast = binary_load_both(variant, **kwargs)
+                    self.assertEqual(reference, fast, (variant, kwargs))
+
+    def test_large_file_matches_reference(self):
+        data = vdf.binary_dumps(make_shortcuts(500))
+        self.assertEqual(
+            vdf_reference.binary_load(io.BytesIO(data)),
+            vdf.binary_load(io.BytesIO(data)),
+        )
+
+
+class TextParserTest(unittest.TestCase):
+    def test_matches_reference(self):
+        rng = random.Random(1)
+        for text in TEXT_SAMPLES:
+            variants = [text]
+            for _ in range(300):
+                mutated = list(text)
+                for _ in range(rng.randint(1, 3)):
+                    i = rng.randrange(len(mutated) + 1)
+                    if rng.random() < 0.5 and i < len(mutated):
+                        del mutated[i]
+                    else:
+                        mutated.insert(i, rng.choice(FUZZ_CHARS))
+                variants.append("".join(mutated))
+            for variant in variants:
+                for kwargs in ({}, {"escaped": False}, {"merge_duplicate_keys": False}):
+                    reference, fast = text_load_both(variant, **kwargs)
+                    self.assertEqual(reference, fast, (variant, kwargs))
+
+    def test_large_file_matches_reference(self):
+        for text in (make_localconfig(200), make_multiline_value(200)):
+            self.assertEqual(vdf_reference.parse(io.StringIO(text)), vdf.loads(text))
+
+
+class TextSerializerTest(unittest.TestCase):
+    def assert_dumps_match(self, tree):
+        for pretty in (False, True):
+            for escaped in (True, False):
+                reference = "".join(vdf_reference._dump_gen(tree, pretty, escaped))
+                fp = io.StringIO()
+                vdf.dump(tree, fp, pretty=pretty, escaped=escaped)
+                args = (tree, pretty, escaped)
+                self.assertEqual(
+                    vdf.dumps(tree, pretty=pretty, escaped=escaped), reference, args
+                )
+                self.assertEqual(fp.getvalue(), reference, args)
+
+    def test_matches_reference(self):
+        rng = random.Random(1)
+        trees = [vdf.loads(text) for text in TEXT_SAMPLES[:2]]
+        trees += [random_tree(rng) for _ in range(2000)]
+        for tree in trees:
+            self.assert_dumps_match(tree)
+            if all(isinstance(key, str) for key in tree):
+                # Round trip through the text format, with everything as strings
+                text = vdf.dumps(tree)
+                self.assertEqual(
+                    vdf.loads(text), vdf_reference.parse(io.StringIO(text))
+                )
+
+    def test_large_file_matches_reference(self):
+        self.assert_dumps_match(vdf.loads(make_localconfig(200)))
+
+
+class VbkvTest(unittest.TestCase):
+    def test_load_matches_reference(self):
+        data = vdf.binary_loads(vdf.binary_dumps(make_shortcuts(20)))
+        encoded = vdf.vbkv_dumps(data)
+        with tempfile.TemporaryFile() as f:
+            f.write(b"junk" + encoded)
+            f.seek(4)
+            self.assertEqual(vdf.vbkv_load(f), vdf_reference.vbkv_loads(encoded))
+
+    def test_truncated_file_raises(self):
+        encoded = vdf.vbkv_dumps(vdf.binary_loads(vdf.binary_dumps(make_shortcuts(20))))
+        with tempfile.TemporaryFile() as f:
+            f.write(encoded[: len(encoded) // 2])
+            f.seek(0)
+            with self.assertRaises(ValueError):
+                vdf.vbkv_load(f)
+
+
+if __name__ == "__main__":
+    unittest.main()